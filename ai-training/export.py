@@ -0,0 +1,187 @@
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+import torch
+
+from inference import (
+    MODEL_PATH,
+    _build_model,
+    _file_sha256,
+    _load_checkpoint,
+    export_metadata_path,
+    export_paths,
+    load_torchscript,
+    onnxruntime,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Export model.pt as frozen TorchScript and ONNX, then check parity and latency against eager."
+    )
+    parser.add_argument("--model-path", type=Path, default=MODEL_PATH)
+    parser.add_argument("--formats", type=str, default="torchscript,onnx")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--batch-sizes", type=str, default="1,8")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--atol", type=float, default=1e-4, help="max allowed probability difference vs eager")
+    parser.add_argument("--skip-check", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def load_eager_model(model_path):
+    checkpoint = _load_checkpoint(model_path)
+    if isinstance(checkpoint, dict) and "state_dict" in checkpoint:
+        class_names = checkpoint.get("class_names") or ["Benign_lesion", "Suspicious_lesion"]
+        image_size = int(checkpoint.get("image_size", 224))
+        state_dict = checkpoint["state_dict"]
+    else:
+        class_names = ["Non-Cancer", "Cancer"]
+        image_size = 224
+        state_dict = checkpoint
+
+    model = _build_model(len(class_names))
+    model.load_state_dict(state_dict)
+    model.eval()
+    return model, image_size, list(class_names)
+
+
+def write_metadata(export_path, runtime, checkpoint_sha256, image_size, extra=None):
+    metadata = {
+        "runtime": runtime,
+        "checkpoint_sha256": checkpoint_sha256,
+        "image_size": image_size,
+        "torch_version": torch.__version__,
+        **(extra or {}),
+    }
+    export_metadata_path(export_path).write_text(json.dumps(metadata, indent=2) + "\n", encoding="utf-8")
+
+
+def export_torchscript(model, example, export_path):
+    # Saved frozen only: optimize_for_inference rewrites the graph for the host CPU (oneDNN
+    # layouts) and does not round-trip through save/load, so inference.py applies it on load.
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example)
+        frozen = torch.jit.freeze(traced.eval())
+    frozen.save(str(export_path))
+
+
+def export_onnx(model, example, export_path, opset):
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            example,
+            str(export_path),
+            input_names=["input"],
+            output_names=["logits"],
+            dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=opset,
+        )
+
+
+def load_runners(model, paths, formats):
+    runners = {"eager": model}
+    if "torchscript" in formats and paths["torchscript"].exists():
+        runners["torchscript"] = load_torchscript(paths["torchscript"])
+    if "onnx" in formats and paths["onnx"].exists():
+        if onnxruntime is None:
+            print("onnxruntime is not installed; skipping the ONNX parity and latency check.")
+        else:
+            session = onnxruntime.InferenceSession(str(paths["onnx"]), providers=["CPUExecutionProvider"])
+            input_name = session.get_inputs()[0].name
+            runners["onnx"] = lambda batch: torch.from_numpy(session.run(None, {input_name: batch.numpy()})[0])
+    return runners
+
+
+def check_parity(runners, image_size, batch_sizes, atol, seed):
+    generator = torch.Generator().manual_seed(seed)
+    failures = []
+    print("Parity against eager (softmax probabilities)")
+    for batch_size in batch_sizes:
+        batch = torch.randn(batch_size, 3, image_size, image_size, generator=generator)
+        with torch.no_grad():
+            reference = torch.softmax(runners["eager"](batch), dim=1)
+            for runtime, runner in runners.items():
+                if runtime == "eager":
+                    continue
+                probabilities = torch.softmax(runner(batch), dim=1)
+                max_diff = float((probabilities - reference).abs().max())
+                same_top = bool(torch.equal(probabilities.argmax(dim=1), reference.argmax(dim=1)))
+                status = "ok" if max_diff <= atol and same_top else "FAIL"
+                print(f"  {runtime:<12} batch={batch_size:<3} max_abs_diff={max_diff:.2e} same_top_label={same_top} {status}")
+                if status != "ok":
+                    failures.append(f"{runtime} batch={batch_size}")
+    return failures
+
+
+def measure_latency(runners, image_size, batch_sizes, runs):
+    results = []
+    print("Latency per backend (ms per batch)")
+    print(f"  {'runtime':<12}{'batch':>6}{'p50':>10}{'p95':>10}{'img/s':>10}")
+    for batch_size in batch_sizes:
+        batch = torch.randn(batch_size, 3, image_size, image_size)
+        for runtime, runner in runners.items():
+            timings = []
+            with torch.no_grad():
+                for index in range(runs + 3):
+                    started = time.perf_counter()
+                    runner(batch)
+                    if index >= 3:
+                        timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p50 = statistics.median(timings)
+            p95 = timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+            print(f"  {runtime:<12}{batch_size:>6}{p50:>10.2f}{p95:>10.2f}{batch_size * 1000 / p50:>10.1f}")
+            results.append(
+                {
+                    "runtime": runtime,
+                    "batch_size": batch_size,
+                    "p50_ms": round(p50, 3),
+                    "p95_ms": round(p95, 3),
+                    "images_per_second": round(batch_size * 1000 / p50, 2),
+                }
+            )
+    return results
+
+
+def main():
+    args = parse_args()
+    model_path = args.model_path.resolve()
+    formats = [name.strip() for name in args.formats.split(",") if name.strip()]
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size.strip()]
+
+    model, image_size, _ = load_eager_model(model_path)
+    checkpoint_sha256 = _file_sha256(model_path)
+    example = torch.randn(1, 3, image_size, image_size)
+    paths = export_paths(model_path)
+
+    if "torchscript" in formats:
+        export_torchscript(model, example, paths["torchscript"])
+        write_metadata(paths["torchscript"], "torchscript", checkpoint_sha256, image_size)
+        print(f"TorchScript saved to: {paths['torchscript']}")
+    if "onnx" in formats:
+        try:
+            export_onnx(model, example, paths["onnx"], args.opset)
+        except Exception as exc:
+            print(f"ONNX export failed ({exc}); it needs the `onnx` and `onnxscript` packages.")
+            formats.remove("onnx")
+        else:
+            write_metadata(paths["onnx"], "onnx", checkpoint_sha256, image_size, {"opset": args.opset})
+            print(f"ONNX graph saved to: {paths['onnx']}")
+
+    if args.skip_check:
+        return
+
+    runners = load_runners(model, paths, formats)
+    failures = check_parity(runners, image_size, batch_sizes, args.atol, args.seed)
+    measure_latency(runners, image_size, batch_sizes, args.runs)
+    if failures:
+        raise SystemExit(f"Parity check failed for: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 import base64
 import hashlib
+import json
+import os
+import threading
+import warnings
 from io import BytesIO
 from pathlib import Path
 
@@ -15,16 +19,15 @@ except Exception:
     transforms = None
 
 try:
-    from pytorch_grad_cam import GradCAM
-    from pytorch_grad_cam.utils.image import show_cam_on_image
-    from pytorch_grad_cam.utils.model_targets import ClassifierOutputTarget
+    import onnxruntime
 except Exception:
-    GradCAM = None
-    show_cam_on_image = None
-    ClassifierOutputTarget = None
+    onnxruntime = None
 
 BASE_DIR = Path(__file__).resolve().parent
-MODEL_PATH = BASE_DIR / "model.pt"
+MODEL_PATH = Path(os.getenv("MODEL_PATH") or BASE_DIR / "model.pt")
+# eager, torchscript, onnx, or auto (the fastest export that is present and current). The INT8
+# tiers written by quantize.py, int8_static and int8_dynamic, are only used when named explicitly.
+MODEL_RUNTIME = os.getenv("MODEL_RUNTIME", "eager").strip().lower()
 DEVICE = "cpu"
 DISCLAIMER = "This tool is for screening only and does not replace medical diagnosis."
 DEFAULT_LABEL_RISK = {
@@ -42,9 +45,81 @@ DEFAULT_LABEL_RISK = {
 
 _MODEL = None
 _TRANSFORM = None
+_IMAGE_SIZE = 224
 _MODEL_READY = None
 _CLASS_NAMES = []
 _LABEL_RISK = {}
+_CHECKPOINT_SHA256 = None
+_CAM_ENGINE = None
+_RUNNER = None
+_RUNTIME = None
+_ARTIFACT_SHA256 = None
+
+
+def _jet_colormap():
+    levels = np.linspace(0.0, 1.0, 256, dtype=np.float32)
+    channels = [np.clip(1.5 - np.abs(4.0 * levels - offset), 0.0, 1.0) for offset in (3.0, 2.0, 1.0)]
+    return np.stack(channels, axis=1)
+
+
+_JET = _jet_colormap()
+
+
+class GradCamEngine:
+    # Attached to the loaded model once: the forward hook stays registered for the
+    # model's lifetime and only records activations while gradients are enabled, so
+    # ordinary no_grad predictions pass straight through it.
+    def __init__(self, model, target_layer):
+        self._model = model
+        self._lock = threading.Lock()
+        self._activations = None
+        self._gradients = None
+        self._handle = target_layer.register_forward_hook(self._capture)
+
+    def _capture(self, module, inputs, output):
+        if not torch.is_grad_enabled():
+            return
+        self._activations = output
+        output.register_hook(self._capture_gradient)
+
+    def _capture_gradient(self, gradient):
+        self._gradients = gradient
+
+    def cams(self, input_batch, class_indices):
+        # One forward and one backward pass for the whole batch: each image only
+        # contributes its own target logit, so the summed backward keeps them independent.
+        with self._lock:
+            self._model.zero_grad(set_to_none=True)
+            try:
+                with torch.enable_grad():
+                    output = self._model(input_batch)
+                    targets = torch.as_tensor(class_indices, dtype=torch.long).view(-1, 1)
+                    output.gather(1, targets).sum().backward()
+                activations = self._activations.detach()
+                gradients = self._gradients.detach()
+            finally:
+                self._activations = None
+                self._gradients = None
+                self._model.zero_grad(set_to_none=True)
+
+        weights = gradients.mean(dim=(2, 3), keepdim=True)
+        cams = torch.relu((weights * activations).sum(dim=1, keepdim=True))
+        flat = cams.flatten(1)
+        minimum = flat.min(dim=1).values.view(-1, 1, 1, 1)
+        maximum = flat.max(dim=1).values.view(-1, 1, 1, 1)
+        cams = (cams - minimum) / (maximum - minimum + 1e-7)
+        cams = torch.nn.functional.interpolate(cams, size=input_batch.shape[-2:], mode="bilinear", align_corners=False)
+        return cams.squeeze(1).numpy()
+
+    def overlays(self, model_images, cams, image_weight=0.5):
+        images = np.stack([np.asarray(image, dtype=np.float32) for image in model_images]) / 255.0
+        heatmaps = _JET[np.clip(cams * 255.0, 0, 255).astype(np.uint8)]
+        blended = (1.0 - image_weight) * heatmaps + image_weight * images
+        blended /= blended.reshape(len(blended), -1).max(axis=1).reshape(-1, 1, 1, 1)
+        return (blended * 255.0).astype(np.uint8)
+
+    def close(self):
+        self._handle.remove()
 
 
 def _load_checkpoint(model_path):
@@ -54,14 +129,14 @@ def _load_checkpoint(model_path):
         return torch.load(model_path, map_location=DEVICE)
 
 
-def _build_transform(image_size=224, normalization=None):
+def _build_transform(normalization=None):
+    # Resizing happens once in _prepare_image so the heatmap can reuse the same model-sized image.
     normalization = normalization or {
         "mean": [0.485, 0.456, 0.406],
         "std": [0.229, 0.224, 0.225],
     }
     return transforms.Compose(
         [
-            transforms.Resize((image_size, image_size)),
             transforms.ToTensor(),
             transforms.Normalize(mean=normalization["mean"], std=normalization["std"]),
         ]
@@ -74,6 +149,99 @@ def _build_model(num_classes):
     return model
 
 
+def export_paths(model_path):
+    return {
+        "torchscript": model_path.with_suffix(".torchscript.pt"),
+        "onnx": model_path.with_suffix(".onnx"),
+        "int8_static": model_path.with_suffix(".int8-static.pt"),
+        "int8_dynamic": model_path.with_suffix(".int8-dynamic.pt"),
+    }
+
+
+def export_metadata_path(export_path):
+    return export_path.with_name(export_path.name + ".json")
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _export_metadata(export_path):
+    try:
+        return json.loads(export_metadata_path(export_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _export_is_current(export_path):
+    # An export is only used if it was produced from the model.pt being served.
+    metadata = _export_metadata(export_path)
+    return bool(metadata) and export_path.exists() and metadata.get("checkpoint_sha256") == _checkpoint_sha256()
+
+
+def load_torchscript(path):
+    # TorchScript is deprecated upstream but remains the fastest CPU path for this model.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        module = torch.jit.load(str(path), map_location=DEVICE)
+        module.eval()
+        try:
+            return torch.jit.optimize_for_inference(module)
+        except Exception:
+            return module
+
+
+def _load_torchscript_runner(path):
+    if not _export_is_current(path):
+        return None
+    return load_torchscript(path)
+
+
+def _load_quantized_runner(path):
+    # Quantized tiers must also have passed quantize.py's recall check against the float model.
+    if not _export_is_current(path) or not _export_metadata(path).get("accuracy_check_passed"):
+        return None
+    return load_torchscript(path)
+
+
+def _load_onnx_runner(path):
+    if onnxruntime is None or not _export_is_current(path):
+        return None
+    session = onnxruntime.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+    input_name = session.get_inputs()[0].name
+
+    def run(input_batch):
+        return torch.from_numpy(session.run(None, {input_name: input_batch.numpy()})[0])
+
+    return run
+
+
+def _load_runtime(model, requested):
+    # Anything requested but missing, stale or not installed falls back to the eager model.
+    candidates = ["onnx", "torchscript"] if requested == "auto" else [requested]
+    paths = export_paths(MODEL_PATH)
+    loaders = {
+        "torchscript": _load_torchscript_runner,
+        "onnx": _load_onnx_runner,
+        "int8_static": _load_quantized_runner,
+        "int8_dynamic": _load_quantized_runner,
+    }
+    for runtime in candidates:
+        if runtime not in loaders:
+            continue
+        try:
+            runner = loaders[runtime](paths[runtime])
+        except Exception:
+            runner = None
+        if runner is not None:
+            return runner, runtime, paths[runtime]
+    return model, "eager", None
+
+
 def _default_label_risk(class_names):
     label_risk = {}
     for label in class_names:
@@ -82,7 +250,8 @@ def _default_label_risk(class_names):
 
 
 def _ensure_model_ready():
-    global _MODEL, _TRANSFORM, _MODEL_READY, _CLASS_NAMES, _LABEL_RISK
+    global _MODEL, _TRANSFORM, _IMAGE_SIZE, _MODEL_READY, _CLASS_NAMES, _LABEL_RISK, _CAM_ENGINE, _RUNNER, _RUNTIME
+    global _ARTIFACT_SHA256
     if _MODEL_READY is not None:
         return _MODEL_READY
 
@@ -114,9 +283,14 @@ def _ensure_model_ready():
         model.eval()
 
         _MODEL = model
+        # Grad-CAM needs gradients, so heatmaps always use the eager model.
+        _CAM_ENGINE = GradCamEngine(model, model.features[-1])
+        _RUNNER, _RUNTIME, artifact_path = _load_runtime(model, MODEL_RUNTIME)
+        _ARTIFACT_SHA256 = _file_sha256(artifact_path) if artifact_path is not None else None
         _CLASS_NAMES = list(class_names)
         _LABEL_RISK = dict(label_risk)
-        _TRANSFORM = _build_transform(image_size=image_size, normalization=normalization)
+        _TRANSFORM = _build_transform(normalization=normalization)
+        _IMAGE_SIZE = image_size
         _MODEL_READY = True
     except Exception:
         _MODEL_READY = False
@@ -169,27 +343,33 @@ def _fallback_predict(image_bytes, symptoms=None):
         "heatmap": None,
         "top_label": top_label,
         "predicted_class": top_label,
+        "engine": "fallback",
     }
 
 
-def _build_heatmap(image, input_tensor, predicted_class):
-    if GradCAM is None or show_cam_on_image is None or ClassifierOutputTarget is None:
-        return None
+def _prepare_image(image):
+    image = image.convert("RGB") if image.mode != "RGB" else image
+    if image.size != (_IMAGE_SIZE, _IMAGE_SIZE):
+        image = image.resize((_IMAGE_SIZE, _IMAGE_SIZE), Image.BILINEAR)
+    return image
+
+
+def _build_heatmaps(model_images, input_batch, class_indices):
+    if _CAM_ENGINE is None:
+        return [None] * len(model_images)
 
     try:
-        target_layers = [_MODEL.features[-1]]
-        cam = GradCAM(model=_MODEL, target_layers=target_layers)
-        targets = [ClassifierOutputTarget(predicted_class)]
-        grayscale_cam = cam(input_tensor=input_tensor, targets=targets)[0, :]
-        rgb_img = np.array(image.resize((224, 224))) / 255.0
-        visualization = show_cam_on_image(rgb_img, grayscale_cam, use_rgb=True)
-
-        pil_img = Image.fromarray(visualization)
-        buffer = BytesIO()
-        pil_img.save(buffer, format="PNG")
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        cams = _CAM_ENGINE.cams(input_batch, class_indices)
+        overlays = _CAM_ENGINE.overlays(model_images, cams)
     except Exception:
-        return None
+        return [None] * len(model_images)
+
+    heatmaps = []
+    for overlay in overlays:
+        buffer = BytesIO()
+        Image.fromarray(overlay).save(buffer, format="PNG")
+        heatmaps.append(base64.b64encode(buffer.getvalue()).decode("utf-8"))
+    return heatmaps
 
 
 def _risk_from_probabilities(probabilities):
@@ -228,25 +408,7 @@ def _decision_for_label(top_label, risk_level):
     return "Moderate-risk pattern detected. Clinical follow-up is advised."
 
 
-def predict(image_path, symptoms=None):
-    image_path = Path(image_path)
-    if not image_path.is_absolute():
-        image_path = BASE_DIR / image_path
-    if not image_path.exists():
-        raise FileNotFoundError(f"Image file not found: {image_path}")
-
-    image_bytes = image_path.read_bytes()
-    if not _ensure_model_ready():
-        return _fallback_predict(image_bytes, symptoms=symptoms)
-
-    image = Image.open(image_path).convert("RGB")
-    input_tensor = _TRANSFORM(image).unsqueeze(0)
-
-    with torch.no_grad():
-        output = _MODEL(input_tensor)
-        probabilities = torch.softmax(output, dim=1)[0]
-        confidence_tensor, predicted = torch.max(probabilities, 0)
-
+def _build_result(probabilities, confidence_tensor, predicted, symptoms, heatmap_base64=None):
     top_label = _CLASS_NAMES[predicted.item()]
     confidence = float(confidence_tensor.item())
     risk_score, suspicious_probability, class_probabilities = _risk_from_probabilities(probabilities)
@@ -270,8 +432,6 @@ def predict(image_path, symptoms=None):
         risk_level = "Low"
         decision = _decision_for_label(top_label, risk_level)
 
-    heatmap_base64 = _build_heatmap(image, input_tensor, predicted.item())
-
     return {
         "cancer_probability": round(float(suspicious_probability), 4),
         "model_confidence": round(float(confidence), 4),
@@ -283,4 +443,102 @@ def predict(image_path, symptoms=None):
         "top_label": top_label,
         "predicted_class": top_label,
         "class_probabilities": class_probabilities,
+        "engine": "checkpoint",
+        "runtime": _RUNTIME,
     }
+
+
+def model_input_size():
+    _ensure_model_ready()
+    return _IMAGE_SIZE
+
+
+def _checkpoint_sha256():
+    global _CHECKPOINT_SHA256
+    if _CHECKPOINT_SHA256 is None and torch is not None and MODEL_PATH.exists():
+        _CHECKPOINT_SHA256 = _file_sha256(MODEL_PATH)
+    return _CHECKPOINT_SHA256
+
+
+def model_fingerprint():
+    # Identifies what actually scores an image: the checkpoint, the runtime serving it and, for
+    # an export or INT8 tier, that artifact's own hash. Cached predictions are dropped when any
+    # of them changes, so switching MODEL_RUNTIME never replays another runtime's outputs.
+    if not _ensure_model_ready():
+        return "fallback"
+    parts = [_checkpoint_sha256(), _RUNTIME]
+    if _ARTIFACT_SHA256 is not None:
+        parts.append(_ARTIFACT_SHA256)
+    return ":".join(parts)
+
+
+def model_runtime():
+    return _RUNTIME if _ensure_model_ready() else "fallback"
+
+
+def predict(image_path, symptoms=None, explain=False):
+    image_path = Path(image_path)
+    if not image_path.is_absolute():
+        image_path = BASE_DIR / image_path
+    if not image_path.exists():
+        raise FileNotFoundError(f"Image file not found: {image_path}")
+
+    return predict_bytes(image_path.read_bytes(), symptoms=symptoms, explain=explain)
+
+
+def predict_bytes(image_bytes, symptoms=None, explain=False):
+    if not _ensure_model_ready():
+        return _fallback_predict(image_bytes, symptoms=symptoms)
+    return predict_image(Image.open(BytesIO(image_bytes)), symptoms=symptoms, image_bytes=image_bytes, explain=explain)
+
+
+def predict_image(image, symptoms=None, image_bytes=None, explain=False):
+    return predict_images([image], symptoms=symptoms, image_bytes=[image_bytes], explain=explain)[0]
+
+
+def explain_images(images):
+    # Grad-CAM needs a backward pass, so it is only run when a heatmap is asked for.
+    images = [Image.fromarray(image) if isinstance(image, np.ndarray) else image for image in images]
+    if not _ensure_model_ready():
+        return [None] * len(images)
+
+    model_images = [_prepare_image(image) for image in images]
+    input_batch = torch.stack([_TRANSFORM(model_image) for model_image in model_images])
+    with torch.no_grad():
+        predictions = torch.argmax(_MODEL(input_batch), dim=1)
+
+    return _build_heatmaps(model_images, input_batch, predictions.tolist())
+
+
+def predict_images(images, symptoms=None, image_bytes=None, explain=False):
+    images = [Image.fromarray(image) if isinstance(image, np.ndarray) else image for image in images]
+    image_bytes = list(image_bytes) if image_bytes is not None else [None] * len(images)
+
+    if not _ensure_model_ready():
+        return [
+            _fallback_predict(raw if raw is not None else image.tobytes(), symptoms=symptoms)
+            for image, raw in zip(images, image_bytes)
+        ]
+
+    model_images = [_prepare_image(image) for image in images]
+    input_batch = torch.stack([_TRANSFORM(model_image) for model_image in model_images])
+
+    with torch.no_grad():
+        output = _RUNNER(input_batch)
+        probabilities = torch.softmax(output, dim=1)
+        confidences, predictions = torch.max(probabilities, 1)
+
+    heatmaps = [None] * len(model_images)
+    if explain:
+        heatmaps = _build_heatmaps(model_images, input_batch, predictions.tolist())
+
+    return [
+        _build_result(
+            probabilities[index],
+            confidences[index],
+            predictions[index],
+            symptoms,
+            heatmap_base64=heatmaps[index],
+        )
+        for index in range(len(model_images))
+    ]
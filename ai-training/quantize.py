@@ -0,0 +1,230 @@
+import argparse
+import json
+import random
+import warnings
+from pathlib import Path
+
+import torch
+from sklearn.metrics import accuracy_score, classification_report, f1_score
+from sklearn.model_selection import train_test_split
+from torch.utils.data import DataLoader, Subset
+
+from dataset import SkinLesionCSVDataset
+from export import export_torchscript, load_eager_model, measure_latency, write_metadata
+from inference import MODEL_PATH, _file_sha256, export_paths, load_torchscript
+from train import DEFAULT_CSV_PATH, build_transforms
+
+MODES = ("int8_static", "int8_dynamic")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Quantize model.pt to INT8 and compare per-class recall and latency against the float model."
+    )
+    parser.add_argument("--csv-path", type=Path, default=DEFAULT_CSV_PATH)
+    parser.add_argument("--model-path", type=Path, default=MODEL_PATH)
+    parser.add_argument("--modes", type=str, default=",".join(MODES))
+    parser.add_argument("--calibration-samples", type=int, default=256)
+    parser.add_argument("--qengine", type=str, default="x86")
+    # Must match the train.py run that produced model.pt so the report uses its validation split.
+    parser.add_argument("--val-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--num-workers", type=int, default=0)
+    parser.add_argument("--focus-label", type=str, default="Suspicious_lesion")
+    parser.add_argument("--max-focus-recall-drop", type=float, default=0.01)
+    parser.add_argument("--max-recall-drop", type=float, default=0.05)
+    parser.add_argument("--latency-batch-sizes", type=str, default="1,8")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--report-path", type=Path, default=None)
+    return parser.parse_args()
+
+
+def split_dataset(dataset, val_size, seed, calibration_samples):
+    # Same split as train.py; calibration images come from the training side only.
+    labels = [label for _, label in dataset.samples]
+    train_indices, val_indices = train_test_split(
+        list(range(len(labels))),
+        test_size=val_size,
+        random_state=seed,
+        stratify=labels,
+    )
+    calibration_indices = random.Random(seed).sample(train_indices, min(calibration_samples, len(train_indices)))
+    return calibration_indices, val_indices
+
+
+def quantize_static(model, calibration_loader, qengine, example):
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    prepared = prepare_fx(model, get_default_qconfig_mapping(qengine), example_inputs=(example,))
+    with torch.no_grad():
+        for images, _ in calibration_loader:
+            prepared(images)
+    return convert_fx(prepared)
+
+
+def quantize_dynamic(model):
+    # Only the classifier is a Linear layer, so this tier mostly shrinks the head; the
+    # convolutional backbone stays in float.
+    from torch.ao.quantization import quantize_dynamic as ao_quantize_dynamic
+
+    return ao_quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def predict_labels(runner, data_loader):
+    predictions = []
+    targets = []
+    with torch.no_grad():
+        for images, labels in data_loader:
+            predictions.extend(runner(images).argmax(dim=1).tolist())
+            targets.extend(labels.tolist())
+    return predictions, targets
+
+
+def summarize_predictions(predictions, targets, class_names):
+    report = classification_report(
+        targets,
+        predictions,
+        labels=list(range(len(class_names))),
+        target_names=class_names,
+        zero_division=0,
+        output_dict=True,
+    )
+    return {
+        "accuracy": round(float(accuracy_score(targets, predictions)), 6),
+        "macro_f1": round(float(f1_score(targets, predictions, average="macro", zero_division=0)), 6),
+        "recall": {label: round(float(report[label]["recall"]), 6) for label in class_names},
+        "support": {label: int(report[label]["support"]) for label in class_names},
+    }
+
+
+def compare_to_float(float_summary, summary, float_predictions, predictions, focus_label, args):
+    recall_drop = {
+        label: round(float_summary["recall"][label] - recall, 6) for label, recall in summary["recall"].items()
+    }
+    failures = []
+    for label, drop in recall_drop.items():
+        limit = args.max_focus_recall_drop if label == focus_label else args.max_recall_drop
+        if drop > limit:
+            failures.append(f"{label} recall dropped {drop:.4f} (limit {limit:.4f})")
+    agreement = sum(left == right for left, right in zip(float_predictions, predictions)) / max(len(predictions), 1)
+    return {
+        **summary,
+        "recall_drop": recall_drop,
+        "top_label_agreement": round(agreement, 6),
+        "failures": failures,
+        "passed": not failures,
+    }
+
+
+def print_recall_table(results, class_names, focus_label):
+    runtimes = list(results)
+    print("Validation recall per class")
+    print(f"  {'label':<24}" + "".join(f"{runtime:>14}" for runtime in runtimes))
+    for label in class_names:
+        marker = " *" if label == focus_label else ""
+        print(f"  {label + marker:<24}" + "".join(f"{results[runtime]['recall'][label]:>14.4f}" for runtime in runtimes))
+    for metric in ("accuracy", "macro_f1"):
+        print(f"  {metric:<24}" + "".join(f"{results[runtime][metric]:>14.4f}" for runtime in runtimes))
+
+
+def main():
+    args = parse_args()
+    model_path = args.model_path.resolve()
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = sorted(set(modes) - set(MODES))
+    if unknown:
+        raise SystemExit(f"Unknown quantization modes: {unknown}; choose from {list(MODES)}")
+    torch.manual_seed(args.seed)
+    torch.backends.quantized.engine = args.qengine
+
+    model, image_size, class_names = load_eager_model(model_path)
+    _, eval_transform = build_transforms(image_size)
+    dataset = SkinLesionCSVDataset(args.csv_path.resolve(), transform=eval_transform)
+    if dataset.class_names != class_names:
+        raise SystemExit(f"Dataset classes {dataset.class_names} do not match the checkpoint classes {class_names}")
+
+    calibration_indices, val_indices = split_dataset(dataset, args.val_size, args.seed, args.calibration_samples)
+    calibration_loader = DataLoader(
+        Subset(dataset, calibration_indices), batch_size=args.batch_size, num_workers=args.num_workers
+    )
+    val_loader = DataLoader(Subset(dataset, val_indices), batch_size=args.batch_size, num_workers=args.num_workers)
+    example = torch.randn(1, 3, image_size, image_size)
+    checkpoint_sha256 = _file_sha256(model_path)
+    paths = export_paths(model_path)
+
+    print(f"Calibration samples: {len(calibration_indices)}")
+    print(f"Validation samples: {len(val_indices)}")
+    print(f"Focus label: {args.focus_label}")
+
+    runners = {"float": model}
+    with warnings.catch_warnings():
+        # torch.ao.quantization warns that it is moving to torchao; it is still the only
+        # quantization path that ships with torch itself.
+        warnings.simplefilter("ignore")
+        for mode in modes:
+            if mode == "int8_static":
+                quantized = quantize_static(model, calibration_loader, args.qengine, example)
+            else:
+                quantized = quantize_dynamic(model)
+            export_torchscript(quantized, example, paths[mode])
+            # Evaluate exactly what serving will load.
+            runners[mode] = load_torchscript(paths[mode])
+            print(f"{mode} saved to: {paths[mode]}")
+
+    float_predictions, targets = predict_labels(model, val_loader)
+    float_summary = summarize_predictions(float_predictions, targets, class_names)
+    results = {"float": float_summary}
+    for mode in modes:
+        predictions, _ = predict_labels(runners[mode], val_loader)
+        summary = summarize_predictions(predictions, targets, class_names)
+        results[mode] = compare_to_float(float_summary, summary, float_predictions, predictions, args.focus_label, args)
+
+    print_recall_table(results, class_names, args.focus_label)
+    latency = measure_latency(
+        runners,
+        image_size,
+        [int(size) for size in args.latency_batch_sizes.split(",") if size.strip()],
+        args.runs,
+    )
+
+    for mode in modes:
+        write_metadata(
+            paths[mode],
+            mode,
+            checkpoint_sha256,
+            image_size,
+            {
+                "qengine": args.qengine,
+                "focus_label": args.focus_label,
+                "focus_recall": results[mode]["recall"].get(args.focus_label),
+                "float_focus_recall": float_summary["recall"].get(args.focus_label),
+                "accuracy_check_passed": results[mode]["passed"],
+            },
+        )
+
+    report_path = (args.report_path or model_path.with_suffix(".quantization.json")).resolve()
+    report = {
+        "model_path": str(model_path),
+        "checkpoint_sha256": checkpoint_sha256,
+        "csv_path": str(dataset.csv_path),
+        "focus_label": args.focus_label,
+        "calibration_samples": len(calibration_indices),
+        "validation_samples": len(val_indices),
+        "limits": {"max_focus_recall_drop": args.max_focus_recall_drop, "max_recall_drop": args.max_recall_drop},
+        "results": results,
+        "latency": latency,
+    }
+    report_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"Report saved to: {report_path}")
+
+    failed = [mode for mode in modes if not results[mode]["passed"]]
+    for mode in failed:
+        print(f"{mode} is not servable: {'; '.join(results[mode]['failures'])}")
+    if failed:
+        raise SystemExit(f"Recall regression in: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import sys
+from unittest import mock
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+import export
+from export import load_eager_model, load_runners
+from inference import _build_model, _export_metadata, _file_sha256, export_paths
+
+# Same bound export.py enforces by default (--atol).
+ATOL = 1e-4
+BATCH_SIZES = (1, 8)
+# Small inputs keep the fixture export fast; the architecture is the one model.pt uses.
+IMAGE_SIZE = 64
+CLASS_NAMES = ["Benign_lesion", "Suspicious_lesion", "Fungal_infection"]
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    # A random-weight checkpoint exported through export.py, so parity is checked in a clean checkout.
+    torch.manual_seed(0)
+    model = _build_model(len(CLASS_NAMES)).eval()
+    model_path = tmp_path_factory.mktemp("export") / "model.pt"
+    torch.save(
+        {"state_dict": model.state_dict(), "class_names": CLASS_NAMES, "image_size": IMAGE_SIZE},
+        model_path,
+    )
+    with mock.patch.object(sys, "argv", ["export.py", "--model-path", str(model_path), "--skip-check"]):
+        export.main()
+    return model_path
+
+
+@pytest.fixture(scope="module")
+def eager(exported):
+    return load_eager_model(exported)
+
+
+def _runner(model, model_path, runtime):
+    path = export_paths(model_path)[runtime]
+    if not path.exists():
+        pytest.skip(f"export.py could not write {path.name} here")
+    runner = load_runners(model, export_paths(model_path), [runtime]).get(runtime)
+    if runner is None:
+        pytest.skip(f"no runtime installed for {runtime}")
+    return runner
+
+
+def test_export_records_its_checkpoint(exported):
+    path = export_paths(exported)["torchscript"]
+    metadata = _export_metadata(path)
+    assert metadata["runtime"] == "torchscript"
+    assert metadata["checkpoint_sha256"] == _file_sha256(exported)
+    assert metadata["image_size"] == IMAGE_SIZE
+
+
+@pytest.mark.parametrize("runtime", ["torchscript", "onnx"])
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+def test_export_matches_eager(exported, eager, runtime, batch_size):
+    model, image_size, _ = eager
+    runner = _runner(model, exported, runtime)
+    generator = torch.Generator().manual_seed(batch_size)
+    batch = torch.randn(batch_size, 3, image_size, image_size, generator=generator)
+
+    with torch.no_grad():
+        reference = torch.softmax(model(batch), dim=1)
+        probabilities = torch.softmax(runner(batch), dim=1)
+
+    assert probabilities.shape == reference.shape
+    assert float((probabilities - reference).abs().max()) <= ATOL
+    assert torch.equal(probabilities.argmax(dim=1), reference.argmax(dim=1))
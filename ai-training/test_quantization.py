@@ -0,0 +1,117 @@
+import json
+import sys
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("sklearn")
+
+import inference
+import quantize
+from inference import _build_model, _export_metadata, _file_sha256, export_paths, load_torchscript
+from quantize import MODES, compare_to_float
+
+LIMITS = SimpleNamespace(max_focus_recall_drop=0.01, max_recall_drop=0.05)
+FOCUS = "Suspicious_lesion"
+IMAGE_SIZE = 64
+
+
+def _summary(recall):
+    return {"accuracy": 0.9, "macro_f1": 0.9, "recall": recall, "support": {label: 10 for label in recall}}
+
+
+def _compare(float_recall, recall):
+    predictions = [0, 1, 1]
+    return compare_to_float(_summary(float_recall), _summary(recall), predictions, predictions, FOCUS, LIMITS)
+
+
+def test_recall_within_limits_passes():
+    result = _compare({FOCUS: 0.9, "Benign_lesion": 0.8}, {FOCUS: 0.895, "Benign_lesion": 0.76})
+    assert result["passed"]
+    assert result["failures"] == []
+    assert result["top_label_agreement"] == 1.0
+
+
+def test_focus_label_recall_drop_fails():
+    result = _compare({FOCUS: 0.9, "Benign_lesion": 0.8}, {FOCUS: 0.88, "Benign_lesion": 0.8})
+    assert not result["passed"]
+    assert result["failures"] == [f"{FOCUS} recall dropped 0.0200 (limit 0.0100)"]
+
+
+def test_other_label_uses_the_looser_limit():
+    assert _compare({FOCUS: 0.9, "Benign_lesion": 0.8}, {FOCUS: 0.9, "Benign_lesion": 0.77})["passed"]
+    assert not _compare({FOCUS: 0.9, "Benign_lesion": 0.8}, {FOCUS: 0.9, "Benign_lesion": 0.74})["passed"]
+
+
+def _write_fixture(root):
+    # A random-weight checkpoint plus a tiny two-class image set, so quantize.py runs end to end.
+    from PIL import Image
+
+    class_names = ["Benign_lesion", FOCUS]
+    rows = ["image_path,label"]
+    (root / "images").mkdir()
+    for index in range(12):
+        label = class_names[index % 2]
+        shade = 40 + 15 * index if label == FOCUS else 200 - 10 * index
+        Image.new("RGB", (IMAGE_SIZE, IMAGE_SIZE), (shade, 90, 255 - shade)).save(root / "images" / f"{index}.png")
+        rows.append(f"images/{index}.png,{label}")
+    csv_path = root / "dataset.csv"
+    csv_path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+    torch.manual_seed(0)
+    model_path = root / "model.pt"
+    state_dict = _build_model(len(class_names)).eval().state_dict()
+    torch.save({"state_dict": state_dict, "class_names": class_names, "image_size": IMAGE_SIZE}, model_path)
+    return csv_path, model_path
+
+
+def _run_quantize(csv_path, model_path, modes, recall_limit):
+    argv = [
+        "quantize.py",
+        "--csv-path", str(csv_path),
+        "--model-path", str(model_path),
+        "--modes", ",".join(modes),
+        "--calibration-samples", "4",
+        "--val-size", "0.5",
+        "--max-focus-recall-drop", str(recall_limit),
+        "--max-recall-drop", str(recall_limit),
+        "--latency-batch-sizes", "1",
+        "--runs", "1",
+    ]
+    with mock.patch.object(sys, "argv", argv):
+        quantize.main()
+    return json.loads(model_path.with_suffix(".quantization.json").read_text(encoding="utf-8"))
+
+
+def test_quantized_exports_within_limits_are_marked_servable(tmp_path):
+    csv_path, model_path = _write_fixture(tmp_path)
+    # Recall can drop at most 1.0, so a limit of 1.0 always passes the gate.
+    report = _run_quantize(csv_path, model_path, MODES, 1.0)
+
+    assert report["checkpoint_sha256"] == _file_sha256(model_path)
+    for mode in MODES:
+        result = report["results"][mode]
+        assert set(result["recall_drop"]) == {"Benign_lesion", FOCUS}
+        assert result["passed"] and result["failures"] == []
+        path = export_paths(model_path)[mode]
+        metadata = _export_metadata(path)
+        assert metadata["checkpoint_sha256"] == report["checkpoint_sha256"]
+        assert metadata["accuracy_check_passed"] is True
+        assert load_torchscript(path) is not None
+
+
+def test_recall_regression_fails_the_run_and_blocks_serving(tmp_path, monkeypatch):
+    csv_path, model_path = _write_fixture(tmp_path)
+    # Any recall change is above a limit of -1.0, so the gate must reject the export.
+    with pytest.raises(SystemExit, match="Recall regression in: int8_dynamic"):
+        _run_quantize(csv_path, model_path, ["int8_dynamic"], -1.0)
+
+    report = json.loads(model_path.with_suffix(".quantization.json").read_text(encoding="utf-8"))
+    assert not report["results"]["int8_dynamic"]["passed"]
+    path = export_paths(model_path)["int8_dynamic"]
+    assert _export_metadata(path)["accuracy_check_passed"] is False
+    monkeypatch.setattr(inference, "MODEL_PATH", model_path)
+    monkeypatch.setattr(inference, "_CHECKPOINT_SHA256", None)
+    assert inference._load_quantized_runner(path) is None
@@ -4,15 +4,17 @@ import base64
 import hashlib
 import importlib.util
 import io
-import tempfile
 from pathlib import Path
 from threading import Lock
-from typing import Any, Callable
+from types import ModuleType
+from typing import Any
 
-from PIL import Image, ImageFilter, ImageOps, ImageStat
+from PIL import Image, ImageFilter, ImageOps
+
+from .imaging import DecodedImage, try_decode_image
 
 _LOCK = Lock()
-_PREDICT_FUNC: Callable[[str, dict[str, Any] | None], dict[str, Any]] | None = None
+_INFERENCE_MODULE: ModuleType | None = None
 _LOAD_ERROR: str | None = None
 
 
@@ -51,7 +53,7 @@ def _inference_file_path() -> Path:
     return Path(__file__).resolve().parents[2] / "ai-training" / "inference.py"
 
 
-def _load_predict_func() -> Callable[[str, dict[str, Any] | None], dict[str, Any]]:
+def _load_inference_module() -> ModuleType:
     path = _inference_file_path()
     if not path.exists():
         raise FileNotFoundError(f"AI inference file not found: {path}")
@@ -62,45 +64,74 @@ def _load_predict_func() -> Callable[[str, dict[str, Any] | None], dict[str, Any
 
     module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(module)
-    predict_func = getattr(module, "predict", None)
-    if not callable(predict_func):
-        raise RuntimeError("ai-training/inference.py must expose callable `predict`.")
-    return predict_func
+    if not callable(getattr(module, "predict_image", None)):
+        raise RuntimeError("ai-training/inference.py must expose callable `predict_image`.")
+    return module
 
 
-def _get_predict_func() -> Callable[[str, dict[str, Any] | None], dict[str, Any]] | None:
-    global _PREDICT_FUNC, _LOAD_ERROR
-    if _PREDICT_FUNC is not None:
-        return _PREDICT_FUNC
+def _get_inference_module() -> ModuleType | None:
+    global _INFERENCE_MODULE, _LOAD_ERROR
+    if _INFERENCE_MODULE is not None:
+        return _INFERENCE_MODULE
     if _LOAD_ERROR is not None:
         return None
 
     with _LOCK:
-        if _PREDICT_FUNC is not None:
-            return _PREDICT_FUNC
+        if _INFERENCE_MODULE is not None:
+            return _INFERENCE_MODULE
         if _LOAD_ERROR is not None:
             return None
         try:
-            _PREDICT_FUNC = _load_predict_func()
-            return _PREDICT_FUNC
+            _INFERENCE_MODULE = _load_inference_module()
+            return _INFERENCE_MODULE
         except Exception as exc:
             _LOAD_ERROR = str(exc)
             return None
 
 
-def _fallback_prediction(image_bytes: bytes, error_message: str | None = None) -> dict[str, Any]:
-    digest = hashlib.sha256(image_bytes).hexdigest()
+def load_model() -> bool:
+    module = _get_inference_module()
+    if module is None:
+        return False
+    ensure_ready = getattr(module, "_ensure_model_ready", None)
+    return bool(ensure_ready()) if callable(ensure_ready) else True
+
+
+def model_input_size() -> int:
+    module = _get_inference_module()
+    input_size = getattr(module, "model_input_size", None) if module is not None else None
+    return int(input_size()) if callable(input_size) else 224
+
+
+def model_fingerprint() -> str:
+    module = _get_inference_module()
+    fingerprint = getattr(module, "model_fingerprint", None) if module is not None else None
+    return str(fingerprint()) if callable(fingerprint) else "heuristic"
+
+
+def _model_input(module: ModuleType, decoded: DecodedImage) -> Image.Image:
+    input_size = getattr(module, "model_input_size", None)
+    if not callable(input_size):
+        return decoded.rgb
+    return decoded.resized(int(input_size()))
+
+
+def _fallback_prediction(
+    image_bytes: bytes,
+    error_message: str | None = None,
+    decoded: DecodedImage | None = None,
+) -> dict[str, Any]:
+    digest = decoded.digest if decoded is not None else hashlib.sha256(image_bytes).hexdigest()
     deterministic_jitter = int(digest[:8], 16) / 0xFFFFFFFF
-    visual_pattern = _estimate_visual_pattern(image_bytes)
+    visual_pattern = _estimate_visual_pattern(decoded)
     base_score = float(visual_pattern["base_risk"])
     risk_score = max(0.0, min(1.0, base_score + ((deterministic_jitter - 0.5) * 0.04)))
     top_label = str(visual_pattern["label"])
-    heatmap = _build_fallback_heatmap(image_bytes)
     explainability = {
         "source": "fallback_visual_pattern",
         "reason": error_message or _LOAD_ERROR or "ai-training model unavailable",
         "visual_pattern": visual_pattern,
-        "heatmap": heatmap,
+        "heatmap": None,
     }
     return {
         "risk_score": risk_score,
@@ -108,16 +139,15 @@ def _fallback_prediction(image_bytes: bytes, error_message: str | None = None) -
         "explainability": explainability,
         "model_confidence": None,
         "class_probabilities": _fallback_class_probabilities(top_label),
+        "engine": "heuristic",
     }
 
 
-def _build_fallback_heatmap(image_bytes: bytes) -> str | None:
-    try:
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGB").resize((224, 224))
-    except Exception:
+def _build_fallback_heatmap(decoded: DecodedImage | None) -> str | None:
+    if decoded is None:
         return None
 
-    gray = image.convert("L")
+    gray = decoded.resized(224).convert("L")
     edges = gray.filter(ImageFilter.FIND_EDGES)
     edges = ImageOps.autocontrast(edges)
     boosted = ImageOps.equalize(edges)
@@ -132,20 +162,14 @@ def _build_fallback_heatmap(image_bytes: bytes) -> str | None:
     return base64.b64encode(buffer.getvalue()).decode("utf-8")
 
 
-def _estimate_visual_pattern(image_bytes: bytes) -> dict[str, Any]:
-    try:
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    except Exception:
+def _estimate_visual_pattern(decoded: DecodedImage | None) -> dict[str, Any]:
+    if decoded is None:
         return {"label": "benign_like", "base_risk": 0.28, "reason": "image_decode_failed"}
 
-    red, green, blue = image.split()
-    r_mean = float(ImageStat.Stat(red).mean[0])
-    g_mean = float(ImageStat.Stat(green).mean[0])
-    b_mean = float(ImageStat.Stat(blue).mean[0])
-    gray = image.convert("L")
-    brightness = float(ImageStat.Stat(gray).mean[0])
-    edges = gray.filter(ImageFilter.FIND_EDGES)
-    edge_intensity = float(ImageStat.Stat(edges).mean[0])
+    stats = decoded.pattern_stats
+    r_mean, g_mean, b_mean = stats["r_mean"], stats["g_mean"], stats["b_mean"]
+    brightness = stats["brightness_mean"]
+    edge_intensity = stats["edge_intensity"]
 
     redness = r_mean - max(g_mean, b_mean)
     darkness = 255.0 - brightness
@@ -185,76 +209,138 @@ def _estimate_visual_pattern(image_bytes: bytes) -> dict[str, Any]:
     }
 
 
-def predict_image_bytes(image_bytes: bytes) -> dict[str, Any]:
-    predict_func = _get_predict_func()
-    if predict_func is None:
-        return _fallback_prediction(image_bytes)
+def _model_prediction(result: dict[str, Any], decoded: DecodedImage) -> dict[str, Any]:
+    risk_score_raw = result.get("final_risk_score", result.get("cancer_probability", 0.0))
+    risk_score = max(0.0, min(1.0, float(risk_score_raw)))
 
-    temp_path: Path | None = None
+    risk_level = str(result.get("risk_level", "")).lower()
+    model_confidence_raw = result.get("model_confidence")
     try:
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_file:
-            temp_file.write(image_bytes)
-            temp_path = Path(temp_file.name)
+        model_confidence = float(model_confidence_raw) if model_confidence_raw is not None else None
+    except (TypeError, ValueError):
+        model_confidence = None
+
+    visual_pattern = _estimate_visual_pattern(decoded)
+    pattern_label = str(visual_pattern["label"])
+    pattern_is_non_cancer = pattern_label in {
+        "possible_fungal_infection",
+        "possible_inflammatory_rash",
+        "possible_bacterial_infection",
+    }
 
-        result = predict_func(str(temp_path), None)
-        risk_score_raw = result.get("final_risk_score", result.get("cancer_probability", 0.0))
-        risk_score = max(0.0, min(1.0, float(risk_score_raw)))
+    top_label = result.get("top_label")
+    if not top_label:
+        top_label = "suspicious_lesion" if risk_level in {"high", "medium"} else "benign_like"
 
-        risk_level = str(result.get("risk_level", "")).lower()
-        model_confidence_raw = result.get("model_confidence")
-        try:
-            model_confidence = float(model_confidence_raw) if model_confidence_raw is not None else None
-        except (TypeError, ValueError):
-            model_confidence = None
-
-        visual_pattern = _estimate_visual_pattern(image_bytes)
-        pattern_label = str(visual_pattern["label"])
-        pattern_is_non_cancer = pattern_label in {
-            "possible_fungal_infection",
-            "possible_inflammatory_rash",
-            "possible_bacterial_infection",
-        }
+    if pattern_is_non_cancer:
+        # Visual heuristics should calibrate uncertain outputs, not hard-override stable model outputs.
+        low_model_confidence = model_confidence is None or model_confidence < 0.72
+        weak_or_generic_label = str(top_label).lower() in {"unknown", "benign_like", "suspicious_lesion"}
 
-        top_label = result.get("top_label")
-        if not top_label:
-            top_label = "suspicious_lesion" if risk_level in {"high", "medium"} else "benign_like"
-
-        if pattern_is_non_cancer:
-            # Visual heuristics should calibrate uncertain outputs, not hard-override stable model outputs.
-            low_model_confidence = model_confidence is None or model_confidence < 0.72
-            weak_or_generic_label = str(top_label).lower() in {"unknown", "benign_like", "suspicious_lesion"}
-
-            if low_model_confidence and risk_score < 0.78:
-                non_cancer_cap = 0.66 if (model_confidence is not None and model_confidence >= 0.65) else 0.62
-                if risk_score > non_cancer_cap:
-                    risk_score = round(non_cancer_cap, 4)
-
-            if weak_or_generic_label and low_model_confidence:
-                top_label = pattern_label
-
-        heatmap = result.get("heatmap") or _build_fallback_heatmap(image_bytes)
-        explainability = {
-            "source": "ai-training",
-            "risk_level": result.get("risk_level"),
-            "model_confidence": model_confidence,
-            "decision": result.get("decision"),
-            "heatmap": heatmap,
-            "visual_pattern": visual_pattern,
-        }
+        if low_model_confidence and risk_score < 0.78:
+            non_cancer_cap = 0.66 if (model_confidence is not None and model_confidence >= 0.65) else 0.62
+            if risk_score > non_cancer_cap:
+                risk_score = round(non_cancer_cap, 4)
 
-        return {
-            "risk_score": risk_score,
-            "top_label": str(top_label),
-            "explainability": explainability,
-            "model_confidence": model_confidence,
-            "class_probabilities": result.get("class_probabilities")
-            or _fallback_class_probabilities(str(top_label)),
-        }
+        if weak_or_generic_label and low_model_confidence:
+            top_label = pattern_label
+
+    heatmap = result.get("heatmap")
+    explainability = {
+        "source": "ai-training",
+        "risk_level": result.get("risk_level"),
+        "model_confidence": model_confidence,
+        "decision": result.get("decision"),
+        "runtime": result.get("runtime"),
+        "heatmap": heatmap,
+        "visual_pattern": visual_pattern,
+    }
+
+    return {
+        "risk_score": risk_score,
+        "top_label": str(top_label),
+        "explainability": explainability,
+        "model_confidence": model_confidence,
+        "class_probabilities": result.get("class_probabilities")
+        or _fallback_class_probabilities(str(top_label)),
+        # "checkpoint" for the trained model, "fallback" for inference.py's hash-based scores.
+        "engine": str(result.get("engine") or "checkpoint"),
+    }
+
+
+def predict_image_bytes(image_bytes: bytes, decoded: DecodedImage | None = None) -> dict[str, Any]:
+    if decoded is None:
+        decoded = try_decode_image(image_bytes)
+
+    module = _get_inference_module()
+    if module is None:
+        return _fallback_prediction(image_bytes, decoded=decoded)
+    if decoded is None:
+        return _fallback_prediction(image_bytes, "image_decode_failed")
+
+    try:
+        result = module.predict_image(_model_input(module, decoded), None, image_bytes=image_bytes)
+        return _model_prediction(result, decoded)
     except Exception as exc:
-        return _fallback_prediction(image_bytes, str(exc))
-    finally:
-        if temp_path and temp_path.exists():
-            try:
-                temp_path.unlink()
-            except OSError:
-                pass
+        return _fallback_prediction(image_bytes, str(exc), decoded=decoded)
+
+
+def explain_image_bytes(image_bytes: bytes, decoded: DecodedImage | None = None) -> str | None:
+    # Heatmaps are a separate, on-demand artifact; predictions never compute them.
+    if decoded is None:
+        decoded = try_decode_image(image_bytes)
+    if decoded is None:
+        return None
+
+    module = _get_inference_module()
+    explain_images = getattr(module, "explain_images", None) if module is not None else None
+    if callable(explain_images):
+        try:
+            heatmap = explain_images([_model_input(module, decoded)])[0]
+        except Exception:
+            heatmap = None
+        if heatmap:
+            return heatmap
+    return _build_fallback_heatmap(decoded)
+
+
+def predict_image_batch(
+    images: list[bytes],
+    decoded: list[DecodedImage | None] | None = None,
+) -> list[dict[str, Any]]:
+    decoded_images = list(decoded) if decoded is not None else [None] * len(images)
+    decoded_images = [
+        item if item is not None else try_decode_image(image_bytes)
+        for image_bytes, item in zip(images, decoded_images)
+    ]
+
+    module = _get_inference_module()
+    predict_images = getattr(module, "predict_images", None) if module is not None else None
+    if not callable(predict_images):
+        return [
+            predict_image_bytes(image_bytes, decoded=item)
+            for image_bytes, item in zip(images, decoded_images)
+        ]
+
+    results: list[dict[str, Any] | None] = [None] * len(images)
+    batch_indices: list[int] = []
+    for index, (image_bytes, item) in enumerate(zip(images, decoded_images)):
+        if item is None:
+            results[index] = _fallback_prediction(image_bytes, "image_decode_failed")
+        else:
+            batch_indices.append(index)
+
+    if batch_indices:
+        try:
+            raw_results = predict_images(
+                [_model_input(module, decoded_images[index]) for index in batch_indices],
+                None,
+                image_bytes=[images[index] or None for index in batch_indices],
+            )
+            for index, result in zip(batch_indices, raw_results):
+                results[index] = _model_prediction(result, decoded_images[index])
+        except Exception as exc:
+            for index in batch_indices:
+                results[index] = _fallback_prediction(images[index], str(exc), decoded=decoded_images[index])
+
+    return [result for result in results if result is not None]
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable
+
+from .inference_pool import InferencePool
+
+
+@dataclass
+class BatchStats:
+    batches: int = 0
+    items: int = 0
+    failed_batches: int = 0
+    skipped_items: int = 0
+    last_batch_size: int = 0
+    last_batch_seconds: float = 0.0
+    total_batch_seconds: float = 0.0
+    total_queue_wait_seconds: float = 0.0
+    size_counts: Counter = field(default_factory=Counter)
+
+    def record(self, size: int, seconds: float, queue_wait_seconds: float, failed: bool) -> None:
+        self.batches += 1
+        self.items += size
+        self.last_batch_size = size
+        self.last_batch_seconds = seconds
+        self.total_batch_seconds += seconds
+        self.total_queue_wait_seconds += queue_wait_seconds
+        self.size_counts[size] += 1
+        if failed:
+            self.failed_batches += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "failed_batches": self.failed_batches,
+            "skipped_items": self.skipped_items,
+            "average_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            "average_batch_seconds": round(self.total_batch_seconds / self.batches, 6) if self.batches else 0.0,
+            "average_queue_wait_seconds": round(self.total_queue_wait_seconds / self.items, 6) if self.items else 0.0,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_seconds": round(self.last_batch_seconds, 6),
+            "batch_size_counts": {str(size): count for size, count in sorted(self.size_counts.items())},
+        }
+
+
+@dataclass
+class _PendingItem:
+    payload: Any
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        run_batch: Callable[[list[Any]], list[Any]],
+        max_batch_size: int,
+        max_wait_seconds: float,
+        pool: InferencePool,
+    ) -> None:
+        self._run_batch = run_batch
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait_seconds = max(0.0, max_wait_seconds)
+        self._pool = pool
+        self._queue: asyncio.Queue[_PendingItem] | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.stats = BatchStats()
+
+    @property
+    def max_batch_size(self) -> int:
+        return self._max_batch_size
+
+    async def submit(self, payload: Any) -> Any:
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait(_PendingItem(payload=payload, future=future, enqueued_at=time.perf_counter()))
+        return await future
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._queue.get_nowait().future.cancel()
+        self._worker = None
+        self._queue = None
+        self._loop = None
+
+    def _ensure_worker(self) -> asyncio.Queue[_PendingItem]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def _collect(self, queue: asyncio.Queue[_PendingItem]) -> list[_PendingItem]:
+        batch = [await queue.get()]
+        deadline = time.perf_counter() + self._max_wait_seconds
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                while len(batch) < self._max_batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        slots = asyncio.Semaphore(self._pool.max_workers)
+        dispatches: set[asyncio.Task] = set()
+        try:
+            while True:
+                batch = await self._collect(queue)
+                live = [item for item in batch if not item.future.done()]
+                self.stats.skipped_items += len(batch) - len(live)
+                if not live:
+                    continue
+
+                await slots.acquire()
+                task = asyncio.create_task(self._dispatch(live))
+                dispatches.add(task)
+                task.add_done_callback(dispatches.discard)
+                task.add_done_callback(lambda _: slots.release())
+        finally:
+            for task in dispatches:
+                task.cancel()
+
+    async def _dispatch(self, live: list[_PendingItem]) -> None:
+        started = time.perf_counter()
+        queue_wait = sum(started - item.enqueued_at for item in live)
+        failed = False
+        try:
+            job = self._pool.submit(self._run_batch, [item.payload for item in live])
+            for item in live:
+                item.future.add_done_callback(partial(self._track_abandoned, job, live))
+            results = await self._pool.wait(job)
+            if len(results) != len(live):
+                raise RuntimeError("Batch callable returned a different number of results.")
+        except Exception as exc:
+            failed = True
+            for item in live:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+        else:
+            for item, result in zip(live, results):
+                if not item.future.done():
+                    item.future.set_result(result)
+        finally:
+            self.stats.record(len(live), time.perf_counter() - started, queue_wait, failed)
+
+    def _track_abandoned(self, job: Future, live: list[_PendingItem], future: asyncio.Future) -> None:
+        if not future.cancelled():
+            return
+        # A batch nobody is waiting for any more is dropped if it has not started yet;
+        # otherwise its running work keeps counting against pool capacity until it ends.
+        if all(item.future.cancelled() for item in live) and job.cancel():
+            return
+        self._pool.orphan_until_done(job)
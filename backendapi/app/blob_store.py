@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .config import Settings
+
+BLOB_URL_PREFIX = "/blobs/"
+
+_EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+_MEDIA_TYPES = {extension: media_type for media_type, extension in _EXTENSIONS.items()}
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}\.(png|jpg|webp)$")
+
+
+class BlobStore(ABC):
+    # Blobs are keyed by the sha256 of their content, so writing the same artifact twice
+    # stores it once and a key always refers to the same bytes.
+    @abstractmethod
+    def put(self, content: bytes, media_type: str) -> str:
+        ...
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str) -> None:
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def put(self, content: bytes, media_type: str) -> str:
+        key = blob_key(content, media_type)
+        path = self._path(key)
+        if path.exists():
+            return key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            temp_path.write_bytes(content)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        return key
+
+    def get(self, key: str) -> bytes | None:
+        if not is_blob_key(key):
+            return None
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _path(self, key: str) -> Path:
+        return self._root / key[:2] / key
+
+
+def create_blob_store(settings: Settings) -> BlobStore | None:
+    if not settings.BLOB_STORE_DIR:
+        return None
+    return LocalBlobStore(settings.BLOB_STORE_DIR)
+
+
+def blob_key(content: bytes, media_type: str) -> str:
+    extension = _EXTENSIONS.get(media_type)
+    if extension is None:
+        raise ValueError(f"Unsupported blob media type: {media_type}")
+    return f"{hashlib.sha256(content).hexdigest()}.{extension}"
+
+
+def is_blob_key(key: str) -> bool:
+    return bool(_KEY_PATTERN.match(key))
+
+
+def blob_media_type(key: str) -> str:
+    return _MEDIA_TYPES[key.rsplit(".", 1)[-1]]
+
+
+def blob_url(key: str) -> str:
+    return f"{BLOB_URL_PREFIX}{key}"
+
+
+def blob_key_from_url(value: str) -> str | None:
+    # Also accepts the absolute form stored in scan rows when BLOB_PUBLIC_BASE_URL is set.
+    if "://" in value:
+        value = urlsplit(value).path
+    if not value.startswith(BLOB_URL_PREFIX):
+        return None
+    key = value[len(BLOB_URL_PREFIX):]
+    return key if is_blob_key(key) else None
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Iterable
+
+
+async def gather_or_cancel(awaitables: Iterable[Awaitable[Any]], timeout: float) -> list[Any]:
+    # Runs everything concurrently under one deadline; the first failure or the deadline
+    # cancels whatever is still running instead of letting it finish in the background.
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.wait_for(asyncio.gather(*tasks), timeout=timeout)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
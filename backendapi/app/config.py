@@ -1,3 +1,5 @@
+import json
+import logging
 import os
 from functools import lru_cache
 
@@ -6,6 +8,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 def _normalize_origin(origin: str) -> str:
     return origin.strip().rstrip("/")
@@ -19,6 +23,36 @@ def _parse_cors_origins(value: str) -> list[str]:
     ]
 
 
+def _load_runtime_profile(path: str | None) -> dict:
+    # Written by `python -m benchmarks.calibrate`; explicit environment variables still win.
+    # A broken profile must not keep the API from starting, so it is ignored with a warning.
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as profile_file:
+            profile = json.load(profile_file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring inference profile %s: %s", path, exc)
+        return {}
+    try:
+        if not isinstance(profile, dict):
+            raise TypeError("expected a JSON object")
+        for key, minimum in (("workers", 1), ("intra_op_threads", 0), ("inter_op_threads", 0)):
+            value = profile.get(key, minimum)
+            if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+                raise ValueError(f"{key} must be an integer >= {minimum}, got {value!r}")
+    except (TypeError, ValueError) as exc:
+        logger.warning("Ignoring inference profile %s: %s", path, exc)
+        return {}
+    return profile
+
+
+_RUNTIME_PROFILE_PATH = os.getenv("INFERENCE_PROFILE_PATH", "inference_profile.json").strip() or None
+_RUNTIME_PROFILE = _load_runtime_profile(_RUNTIME_PROFILE_PATH)
+
+
 class Settings:
     APP_VERSION: str = os.getenv("APP_VERSION", "0.1.0")
     API_KEY: str | None = os.getenv("API_KEY")
@@ -32,6 +66,18 @@ class Settings:
 
     MAX_IMAGE_BYTES: int = int(os.getenv("MAX_IMAGE_BYTES", str(5 * 1024 * 1024)))
     INFERENCE_TIMEOUT_SECONDS: float = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "10"))
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "thread").strip().lower()
+    INFERENCE_PROFILE_PATH: str | None = _RUNTIME_PROFILE_PATH if _RUNTIME_PROFILE else None
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", str(_RUNTIME_PROFILE.get("workers", 2))))
+    # 0 lets the service pick: intra-op threads default to the available cores split across
+    # INFERENCE_WORKERS, inter-op threads keep torch's default.
+    INFERENCE_INTRA_OP_THREADS: int = int(
+        os.getenv("INFERENCE_INTRA_OP_THREADS", str(_RUNTIME_PROFILE.get("intra_op_threads", 0)))
+    )
+    INFERENCE_INTER_OP_THREADS: int = int(
+        os.getenv("INFERENCE_INTER_OP_THREADS", str(_RUNTIME_PROFILE.get("inter_op_threads", 0)))
+    )
+    INFERENCE_MAX_QUEUE: int = int(os.getenv("INFERENCE_MAX_QUEUE", "16"))
     MAX_IMAGE_COUNT: int = int(os.getenv("MAX_IMAGE_COUNT", "4"))
     MIN_IMAGE_WIDTH: int = int(os.getenv("MIN_IMAGE_WIDTH", "224"))
     MIN_IMAGE_HEIGHT: int = int(os.getenv("MIN_IMAGE_HEIGHT", "224"))
@@ -44,12 +90,46 @@ class Settings:
     MODEL_MODULE: str = os.getenv("MODEL_MODULE", "app.ai_model_adapter")
     MODEL_CALLABLE: str = os.getenv("MODEL_CALLABLE", "predict_image_bytes")
     MODEL_VERSION: str = os.getenv("MODEL_VERSION", "demo-v1")
+    MODEL_EXPLAIN_CALLABLE: str = os.getenv("MODEL_EXPLAIN_CALLABLE", "explain_image_bytes")
+    MODEL_BATCH_CALLABLE: str = os.getenv("MODEL_BATCH_CALLABLE", "predict_image_batch")
+    INFERENCE_BATCH_MAX_SIZE: int = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "8"))
+    INFERENCE_BATCH_MAX_WAIT_MS: float = float(os.getenv("INFERENCE_BATCH_MAX_WAIT_MS", "10"))
+    INFERENCE_WARMUP: bool = os.getenv("INFERENCE_WARMUP", "true").lower() == "true"
+    INFERENCE_WARMUP_TIMEOUT_SECONDS: float = float(os.getenv("INFERENCE_WARMUP_TIMEOUT_SECONDS", "120"))
+    INFERENCE_WARMUP_RETRIES: int = int(os.getenv("INFERENCE_WARMUP_RETRIES", "2"))
+    PREDICTION_CACHE_MAX_BYTES: int = int(os.getenv("PREDICTION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    PREDICTION_CACHE_TTL_SECONDS: float = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+    HEATMAP_CACHE_MAX_BYTES: int = int(os.getenv("HEATMAP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    PREDICTION_CACHE_DIR: str | None = os.getenv("PREDICTION_CACHE_DIR", "").strip() or None
+    PREDICTION_CACHE_DISK_MAX_BYTES: int = int(os.getenv("PREDICTION_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+    HEATMAP_CACHE_DISK_MAX_BYTES: int = int(os.getenv("HEATMAP_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory").strip().lower()
+    SESSION_SQLITE_PATH: str = os.getenv("SESSION_SQLITE_PATH", "sessions.sqlite3")
+    SESSION_TTL_SECONDS: float = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+    SESSION_STORE_MAX_BYTES: int = int(os.getenv("SESSION_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+    SESSION_SPILL_DIR: str | None = os.getenv("SESSION_SPILL_DIR", "").strip() or None
+    SESSION_SPILL_MAX_BYTES: int = int(os.getenv("SESSION_SPILL_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+    BLOB_STORE_DIR: str | None = os.getenv("BLOB_STORE_DIR", "").strip() or None
+    # Public origin that serves /blobs/ (e.g. https://api.example.com); scan rows store absolute
+    # blob links under it, or inline previews when it is unset.
+    BLOB_PUBLIC_BASE_URL: str = os.getenv("BLOB_PUBLIC_BASE_URL", "").strip()
 
     SUPABASE_URL: str | None = os.getenv("SUPABASE_URL")
     SUPABASE_SERVICE_ROLE_KEY: str | None = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
     SUPABASE_TABLE: str = os.getenv("SUPABASE_TABLE", "scan_results")
+    SCAN_JOURNAL_PATH: str = os.getenv("SCAN_JOURNAL_PATH", "scan_journal.jsonl")
+    SCAN_WRITE_BATCH_SIZE: int = int(os.getenv("SCAN_WRITE_BATCH_SIZE", "20"))
+    SCAN_WRITE_FLUSH_SECONDS: float = float(os.getenv("SCAN_WRITE_FLUSH_SECONDS", "0.5"))
+    SCAN_WRITE_MAX_BACKOFF_SECONDS: float = float(os.getenv("SCAN_WRITE_MAX_BACKOFF_SECONDS", "60"))
+    SCAN_WRITE_MAX_ATTEMPTS: int = int(os.getenv("SCAN_WRITE_MAX_ATTEMPTS", "5"))
+    SCAN_DEAD_LETTER_PATH: str = os.getenv("SCAN_DEAD_LETTER_PATH", "scan_dead_letter.jsonl")
     ENABLE_SCAN_HISTORY: bool = os.getenv("ENABLE_SCAN_HISTORY", "true").lower() == "true"
 
+    REQUEST_TRACING: bool = os.getenv("REQUEST_TRACING", "false").lower() == "true"
+    REQUEST_TRACE_LOG: bool = os.getenv("REQUEST_TRACE_LOG", "false").lower() == "true"
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,6 +1,14 @@
 from __future__ import annotations
 
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
 from typing import Any
+from uuid import uuid4
 
 try:
     from supabase import Client, create_client
@@ -8,13 +16,49 @@ except Exception:  # pragma: no cover - optional dependency for demo mode
     Client = Any  # type: ignore[assignment]
     create_client = None
 
+try:
+    from postgrest.exceptions import APIError
+except Exception:  # pragma: no cover - ships with supabase
+    APIError = None
+
 from .config import get_settings
+from .metrics import observe_stage
+
+SCAN_COLUMNS = "id,created_at,user_id,patient_ref,risk_level,risk_score,top_label,model_version,status"
+# Summary rows pull a handful of scalar fields out of metadata instead of the whole blob.
+SCAN_SUMMARY_COLUMNS = (
+    f"{SCAN_COLUMNS},"
+    "confidence:metadata->confidence,"
+    "image_count:metadata->image_count,"
+    "explanation:metadata->>explanation,"
+    "simple_explanation:metadata->>simple_explanation"
+)
+# Every queued row carries the same keys: PostgREST rejects a bulk upsert whose objects differ.
+SCAN_ROW_KEYS = (*SCAN_COLUMNS.split(","), "metadata")
+SCAN_FIELD_SELECTORS = {
+    **{column: column for column in SCAN_COLUMNS.split(",")},
+    "metadata": "metadata",
+    "confidence": "confidence:metadata->confidence",
+    "image_count": "image_count:metadata->image_count",
+    "explanation": "explanation:metadata->>explanation",
+    "simple_explanation": "simple_explanation:metadata->>simple_explanation",
+}
 
 
 class SupabaseService:
     def __init__(self) -> None:
         self.client: Client | None = None
         self._status = "not_configured"
+        self._pending: deque[dict[str, Any]] = deque()
+        self._condition = threading.Condition()
+        self._writer: threading.Thread | None = None
+        self._stopping = False
+        self._journal_path: Path | None = None
+        self._dead_letter_path: Path | None = None
+        self._row_attempts: dict[str, int] = {}
+        self._written = 0
+        self._failed_attempts = 0
+        self._dead_lettered = 0
 
     @property
     def status(self) -> str:
@@ -43,39 +87,190 @@ class SupabaseService:
         except Exception:
             self.client = None
             self._status = "failed"
+            return
 
-    def insert_scan(self, payload: dict[str, Any]) -> str | None:
-        if not self.client:
+        self._start_writer(settings.SCAN_JOURNAL_PATH, settings.SCAN_DEAD_LETTER_PATH)
+
+    def enqueue_scan(self, payload: dict[str, Any]) -> str | None:
+        # Write-behind: the row gets its id here and is journaled before returning, so the
+        # caller never waits on Supabase and a restart replays anything not yet written.
+        if not self.client or self._writer is None:
             return None
+
+        row = _normalize_row({**payload, "id": payload.get("id") or str(uuid4())})
+        with observe_stage("insert_scan"), self._condition:
+            self._append_journal(row)
+            self._pending.append(row)
+            self._condition.notify()
+        return row["id"]
+
+    def write_stats(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                "pending": len(self._pending),
+                "written": self._written,
+                "failed_attempts": self._failed_attempts,
+                "dead_lettered": self._dead_lettered,
+            }
+
+    def close(self, timeout: float = 5.0) -> None:
+        writer = self._writer
+        if writer is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        writer.join(timeout=timeout)
+        self._writer = None
+
+    def _start_writer(self, journal_path: str, dead_letter_path: str) -> None:
+        if self._writer is not None:
+            return
+        self._journal_path = Path(journal_path)
+        self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._dead_letter_path = Path(dead_letter_path)
+        self._pending.extend(_normalize_row(row) for row in _read_journal(self._journal_path))
+        self._stopping = False
+        self._writer = threading.Thread(target=self._write_loop, name="scan-writer", daemon=True)
+        self._writer.start()
+
+    def _write_loop(self) -> None:
         settings = get_settings()
+        batch_size = max(1, settings.SCAN_WRITE_BATCH_SIZE)
+        backoff = 0.0
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                if len(self._pending) < batch_size and not self._stopping:
+                    # Give concurrent requests a moment to fill the batch.
+                    self._condition.wait(settings.SCAN_WRITE_FLUSH_SECONDS)
+                batch = list(islice(self._pending, batch_size))
+
+            settled, reachable = self._write_batch(batch, max(1, settings.SCAN_WRITE_MAX_ATTEMPTS))
+            self._status = "connected" if reachable else "failed"
+            if settled:
+                settled_ids = {row["id"] for row in settled}
+                with self._condition:
+                    self._pending = deque(row for row in self._pending if row["id"] not in settled_ids)
+                    self._rewrite_journal()
+                backoff = 0.0
+                continue
+
+            # Nothing left the queue: Supabase is down, or the rows at the head are still
+            # being retried before they are dead-lettered.
+            backoff = min(settings.SCAN_WRITE_MAX_BACKOFF_SECONDS, backoff * 2 or 0.5)
+            with self._condition:
+                self._failed_attempts += 1
+                if self._stopping:
+                    return
+                self._condition.wait(backoff)
 
+    def _write_batch(self, batch: list[dict[str, Any]], max_attempts: int) -> tuple[list[dict[str, Any]], bool]:
+        # Returns the rows that left the queue (written or dead-lettered) and whether
+        # Supabase answered at all.
         try:
-            row = self.client.table(settings.SUPABASE_TABLE).insert(payload).execute()
-            data = row.data or []
-            if not data:
-                return None
-            return data[0].get("id")
-        except Exception:
-            self._status = "failed"
-            raise
+            self._write_rows(batch)
+        except Exception as exc:
+            if not _is_rejection(exc):
+                return [], False
+        else:
+            with self._condition:
+                self._written += len(batch)
+            return batch, True
+
+        # A rejected batch may hold one bad row; write them one at a time so the rest drain.
+        settled: list[dict[str, Any]] = []
+        for row in batch:
+            try:
+                self._write_rows([row])
+            except Exception as exc:
+                if not _is_rejection(exc):
+                    return settled, False
+                attempts = self._row_attempts.get(row["id"], 0) + 1
+                self._row_attempts[row["id"]] = attempts
+                if attempts >= max_attempts:
+                    self._dead_letter(row, exc, attempts)
+                    settled.append(row)
+                continue
+            self._row_attempts.pop(row["id"], None)
+            with self._condition:
+                self._written += 1
+            settled.append(row)
+        return settled, True
+
+    def _write_rows(self, rows: list[dict[str, Any]]) -> None:
+        settings = get_settings()
+        # Ids are generated client-side, so a retry after a lost response is a no-op.
+        with observe_stage("scan_write_batch"):
+            self.client.table(settings.SUPABASE_TABLE).upsert(
+                rows,
+                on_conflict="id",
+                ignore_duplicates=True,
+            ).execute()
+
+    def _append_journal(self, row: dict[str, Any]) -> None:
+        with self._journal_path.open("a", encoding="utf-8") as journal:
+            journal.write(json.dumps(row, default=str) + "\n")
+
+    def _dead_letter(self, row: dict[str, Any], exc: Exception, attempts: int) -> None:
+        # Kept on disk for inspection and manual replay instead of blocking the queue.
+        self._row_attempts.pop(row["id"], None)
+        entry = {
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+            "attempts": attempts,
+            "error": str(exc),
+            "row": row,
+        }
+        self._dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._dead_letter_path.open("a", encoding="utf-8") as dead_letter:
+            dead_letter.write(json.dumps(entry, default=str) + "\n")
+        with self._condition:
+            self._dead_lettered += 1
+
+    def _rewrite_journal(self) -> None:
+        temp_path = self._journal_path.with_suffix(".tmp")
+        with temp_path.open("w", encoding="utf-8") as journal:
+            for row in self._pending:
+                journal.write(json.dumps(row, default=str) + "\n")
+        os.replace(temp_path, self._journal_path)
 
     def fetch_scans(
         self,
         patient_ref: str | None,
         limit: int,
         user_id: str | None = None,
+        summary: bool = False,
+        fields: list[str] | None = None,
+        before: tuple[str, str] | None = None,
+        after: tuple[str, str] | None = None,
+        risk_levels: list[str] | None = None,
+        top_label: str | None = None,
+        created_from: str | None = None,
+        created_to: str | None = None,
     ) -> list[dict[str, Any]]:
         if not self.client:
             return []
 
+        if fields:
+            # id and created_at are always selected because cursors are built from them.
+            selected = dict.fromkeys(["id", "created_at", *fields])
+            columns = ",".join(SCAN_FIELD_SELECTORS[field] for field in selected)
+        else:
+            columns = SCAN_SUMMARY_COLUMNS if summary else f"{SCAN_COLUMNS},metadata"
+
+        # Keyset pagination on (created_at, id): newest first, except when paging forward
+        # from an `after` cursor, where rows are fetched oldest first and flipped back.
+        descending = after is None
         settings = get_settings()
         try:
             query = (
                 self.client.table(settings.SUPABASE_TABLE)
-                .select(
-                    "id,created_at,user_id,patient_ref,risk_level,risk_score,top_label,model_version,status,metadata"
-                )
-                .order("created_at", desc=True)
+                .select(columns)
+                .order("created_at", desc=descending)
+                .order("id", desc=descending)
                 .limit(limit)
             )
 
@@ -83,9 +278,71 @@ class SupabaseService:
                 query = query.eq("user_id", user_id)
             if patient_ref:
                 query = query.eq("patient_ref", patient_ref)
+            if risk_levels:
+                query = query.in_("risk_level", risk_levels)
+            if top_label:
+                query = query.eq("top_label", top_label)
+            if created_from:
+                query = query.gte("created_at", created_from)
+            if created_to:
+                query = query.lt("created_at", created_to)
+            if before is not None:
+                query = query.or_(_keyset_filter("lt", *before))
+            if after is not None:
+                query = query.or_(_keyset_filter("gt", *after))
 
-            result = query.execute()
-            return result.data or []
+            with observe_stage("fetch_scans"):
+                result = query.execute()
+        except Exception:
+            self._status = "failed"
+            raise
+        rows = result.data or []
+        return rows if descending else rows[::-1]
+
+    def fetch_scan_fields(self, scan_id: str, selector: str) -> dict[str, Any] | None:
+        if not self.client:
+            return None
+
+        settings = get_settings()
+        try:
+            with observe_stage("fetch_scan_fields"):
+                result = (
+                    self.client.table(settings.SUPABASE_TABLE).select(selector).eq("id", scan_id).limit(1).execute()
+                )
         except Exception:
             self._status = "failed"
             raise
+        data = result.data or []
+        return data[0] if data else None
+
+
+def _keyset_filter(operator: str, created_at: str, scan_id: str) -> str:
+    return f'created_at.{operator}."{created_at}",and(created_at.eq."{created_at}",id.{operator}.{scan_id})'
+
+
+def _normalize_row(row: dict[str, Any]) -> dict[str, Any]:
+    return {**dict.fromkeys(SCAN_ROW_KEYS), **row}
+
+
+def _is_rejection(exc: Exception) -> bool:
+    # The database answered and refused the rows (schema, constraint, bad value). Connection
+    # errors, timeouts and server-side resource errors are outages: those only back off.
+    if APIError is None or not isinstance(exc, APIError):
+        return False
+    code = str(exc.code or "")
+    return bool(code) and not code.startswith(("08", "5", "PGRST0"))
+
+
+def _read_journal(path: Path) -> list[dict[str, Any]]:
+    if not path.exists():
+        return []
+    rows: list[dict[str, Any]] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            row = json.loads(line)
+        except ValueError:
+            # A crash mid-append can leave a torn last line.
+            continue
+        if isinstance(row, dict) and row.get("id"):
+            rows.append(row)
+    return rows
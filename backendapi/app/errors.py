@@ -5,10 +5,17 @@ from fastapi.responses import JSONResponse
 
 
 class AppError(Exception):
-    def __init__(self, code: str, message: str, status_code: int) -> None:
+    def __init__(
+        self,
+        code: str,
+        message: str,
+        status_code: int,
+        headers: dict[str, str] | None = None,
+    ) -> None:
         self.code = code
         self.message = message
         self.status_code = status_code
+        self.headers = headers
         super().__init__(message)
 
 
@@ -16,14 +23,19 @@ def build_http_error(code: str, message: str, status_code: int) -> HTTPException
     return HTTPException(status_code=status_code, detail={"code": code, "message": message})
 
 
+def app_error_response(request: Request, exc: AppError) -> JSONResponse:
+    request_id = getattr(request.state, "request_id", "unknown")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": {"code": exc.code, "message": exc.message, "request_id": request_id}},
+        headers=exc.headers,
+    )
+
+
 def add_error_handlers(app) -> None:
     @app.exception_handler(AppError)
     async def app_error_handler(request: Request, exc: AppError):
-        request_id = getattr(request.state, "request_id", "unknown")
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={"error": {"code": exc.code, "message": exc.message, "request_id": request_id}},
-        )
+        return app_error_response(request, exc)
 
     @app.exception_handler(HTTPException)
     async def http_error_handler(request: Request, exc: HTTPException):
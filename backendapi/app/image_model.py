@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from typing import Any
 
+from .concurrency import gather_or_cancel
+from .imaging import DecodedImage
 from .intelligence import aggregate_scores
+from .metrics import observe_stage
 from .model import ModelService, Prediction
-from .validation import analyze_image_quality
+from .validation import analyze_image_quality, decode_image
 
 MVP_CONDITIONS: dict[str, str] = {
     "Viral_skin_disease": "Viral skin disease",
@@ -43,6 +47,7 @@ class ImageInput:
     filename: str
     content_type: str | None
     image_bytes: bytes
+    decoded: DecodedImage | None = None
 
 
 def normalize_condition_key(label: str | None) -> str:
@@ -101,18 +106,17 @@ def _prediction_probability_map(prediction: Prediction) -> dict[str, float]:
     return _fallback_probability_map(prediction)
 
 
-async def analyze_images(model_service: ModelService, settings: Any, images: list[ImageInput]) -> dict[str, Any]:
-    if not images:
-        raise ValueError("images must not be empty")
-
-    image_scores: list[float] = []
-    image_confidences: list[float] = []
-    per_condition_totals = {key: 0.0 for key in MVP_CONDITIONS}
-    image_results: list[dict[str, Any]] = []
-
-    for index, image in enumerate(images, start=1):
+def _assess_image_sync(
+    image_bytes: bytes,
+    settings: Any,
+    decoded: DecodedImage | None,
+) -> tuple[DecodedImage, dict[str, Any]]:
+    if decoded is None:
+        with observe_stage("decode"):
+            decoded = decode_image(image_bytes, settings.MAX_IMAGE_BYTES)
+    with observe_stage("analyze_image_quality"):
         quality = analyze_image_quality(
-            image_bytes=image.image_bytes,
+            image_bytes=image_bytes,
             max_bytes=settings.MAX_IMAGE_BYTES,
             min_width=settings.MIN_IMAGE_WIDTH,
             min_height=settings.MIN_IMAGE_HEIGHT,
@@ -120,8 +124,45 @@ async def analyze_images(model_service: ModelService, settings: Any, images: lis
             min_brightness_mean=settings.MIN_BRIGHTNESS_MEAN,
             max_brightness_mean=settings.MAX_BRIGHTNESS_MEAN,
             min_edge_intensity=settings.MIN_EDGE_INTENSITY,
+            decoded=decoded,
+        )
+    return decoded, quality
+
+
+async def assess_image(
+    image_bytes: bytes,
+    settings: Any,
+    decoded: DecodedImage | None = None,
+) -> tuple[DecodedImage, dict[str, Any]]:
+    return await asyncio.to_thread(_assess_image_sync, image_bytes, settings, decoded)
+
+
+async def _analyze_image(
+    model_service: ModelService,
+    settings: Any,
+    image: ImageInput,
+) -> tuple[dict[str, Any], Prediction]:
+    decoded, quality = await assess_image(image.image_bytes, settings, image.decoded)
+    prediction = await model_service.predict(image.image_bytes, decoded=decoded)
+    return quality, prediction
+
+
+async def analyze_images(model_service: ModelService, settings: Any, images: list[ImageInput]) -> dict[str, Any]:
+    if not images:
+        raise ValueError("images must not be empty")
+
+    with observe_stage("analyze_images"):
+        outcomes = await gather_or_cancel(
+            (_analyze_image(model_service, settings, image) for image in images),
+            timeout=settings.INFERENCE_TIMEOUT_SECONDS,
         )
-        prediction = await model_service.predict(image.image_bytes)
+
+    image_scores: list[float] = []
+    image_confidences: list[float] = []
+    per_condition_totals = {key: 0.0 for key in MVP_CONDITIONS}
+    image_results: list[dict[str, Any]] = []
+
+    for index, (image, (quality, prediction)) in enumerate(zip(images, outcomes), start=1):
         probability_map = _prediction_probability_map(prediction)
 
         for condition_key, probability in probability_map.items():
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import math
+from dataclasses import dataclass, field
+from typing import Any
+
+from PIL import Image, ImageFilter, ImageStat
+
+# Smallest decode that still serves the model input (square resize) and the preview.
+MODEL_DECODE_SIZE = 224
+PREVIEW_DECODE_SIZE = 640
+# Scale the visual-pattern statistics are measured at: the preview size, which is also the
+# default webcam capture the heuristic's thresholds were tuned on.
+PATTERN_ANALYSIS_SIZE = PREVIEW_DECODE_SIZE
+
+
+@dataclass
+class DecodedImage:
+    # Decoded once per upload and shared by validation, preview, heatmap and inference.
+    # Unless full_resolution is asked for, `source` is a reduced working image that is just
+    # large enough for the model input and the preview.
+    image_bytes: bytes
+    source: Image.Image
+    format: str = "unknown"
+    original_size: tuple[int, int] | None = None
+    _cache: dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_bytes(cls, image_bytes: bytes, full_resolution: bool = False) -> "DecodedImage":
+        image = Image.open(io.BytesIO(image_bytes))
+        image_format = (image.format or "unknown").lower()
+        original_size = image.size
+        decoded = cls(image_bytes=image_bytes, source=image, format=image_format, original_size=original_size)
+        if full_resolution:
+            image.load()
+            return decoded
+
+        request = _decode_request(original_size, MODEL_DECODE_SIZE, PREVIEW_DECODE_SIZE)
+        if image_format == "jpeg":
+            # DCT scaling: libjpeg decodes straight to 1/2, 1/4 or 1/8 size, never below the request.
+            image.draft("RGB", request)
+            image.load()
+        else:
+            image.load()
+            decoded._cache["full"] = image
+            image = _reduce_to(image, request)
+        decoded.source = image
+        return decoded
+
+    @classmethod
+    def from_model_input(
+        cls,
+        image: Image.Image,
+        digest: str,
+        image_format: str,
+        pattern_stats: dict[str, float],
+    ) -> "DecodedImage":
+        # Rebuilt from a model-sized image plus the visual-pattern statistics, e.g. in an
+        # inference worker process that never sees the original upload.
+        decoded = cls(image_bytes=b"", source=image, format=image_format)
+        decoded._cache.update(
+            {
+                "digest": digest,
+                "pattern_stats": dict(pattern_stats),
+                f"resized:{image.width}": image,
+            }
+        )
+        return decoded
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.original_size or self.source.size
+
+    @property
+    def reduced(self) -> bool:
+        return self.source.size != self.size
+
+    @property
+    def digest(self) -> str:
+        if "digest" not in self._cache:
+            self._cache["digest"] = hashlib.sha256(self.image_bytes).hexdigest()
+        return self._cache["digest"]
+
+    @property
+    def rgb(self) -> Image.Image:
+        if "rgb" not in self._cache:
+            self._cache["rgb"] = self.source if self.source.mode == "RGB" else self.source.convert("RGB")
+        return self._cache["rgb"]
+
+    @property
+    def gray(self) -> Image.Image:
+        # Always full resolution: edge intensity roughly halves with every 2x reduction, so
+        # MIN_EDGE_INTENSITY only holds at the original scale (see benchmarks.decode_stability).
+        # Only the quality checks read it; prediction uses pattern_stats instead.
+        if "gray" not in self._cache:
+            full = self._full()
+            if full is self.source:
+                self._cache["gray"] = self.rgb.convert("L")
+            else:
+                self._cache["gray"] = (full if full.mode == "RGB" else full.convert("RGB")).convert("L")
+        return self._cache["gray"]
+
+    @property
+    def edges(self) -> Image.Image:
+        if "edges" not in self._cache:
+            self._cache["edges"] = self.gray.filter(ImageFilter.FIND_EDGES)
+        return self._cache["edges"]
+
+    @property
+    def channel_means(self) -> tuple[float, float, float]:
+        # Means are scale-invariant, so the reduced working image is enough.
+        if "channel_means" not in self._cache:
+            r_mean, g_mean, b_mean = ImageStat.Stat(self.rgb).mean[:3]
+            self._cache["channel_means"] = (float(r_mean), float(g_mean), float(b_mean))
+        return self._cache["channel_means"]
+
+    @property
+    def brightness_mean(self) -> float:
+        if "brightness_mean" not in self._cache:
+            self._cache["brightness_mean"] = float(ImageStat.Stat(self.gray).mean[0])
+        return self._cache["brightness_mean"]
+
+    @property
+    def edge_intensity(self) -> float:
+        if "edge_intensity" not in self._cache:
+            self._cache["edge_intensity"] = float(ImageStat.Stat(self.edges).mean[0])
+        return self._cache["edge_intensity"]
+
+    @property
+    def stats(self) -> dict[str, float]:
+        r_mean, g_mean, b_mean = self.channel_means
+        return {
+            "r_mean": r_mean,
+            "g_mean": g_mean,
+            "b_mean": b_mean,
+            "brightness_mean": self.brightness_mean,
+            "edge_intensity": self.edge_intensity,
+        }
+
+    @property
+    def pattern_stats(self) -> dict[str, float]:
+        # Measured on the preview-sized image, so they cost no extra decode and do not
+        # drift with the upload resolution; uploads at or below that size are unaffected.
+        if "pattern_stats" not in self._cache:
+            image = self.thumbnail(PATTERN_ANALYSIS_SIZE)
+            gray = image.convert("L")
+            r_mean, g_mean, b_mean = ImageStat.Stat(image).mean[:3]
+            self._cache["pattern_stats"] = {
+                "r_mean": float(r_mean),
+                "g_mean": float(g_mean),
+                "b_mean": float(b_mean),
+                "brightness_mean": float(ImageStat.Stat(gray).mean[0]),
+                "edge_intensity": float(ImageStat.Stat(gray.filter(ImageFilter.FIND_EDGES)).mean[0]),
+            }
+        return self._cache["pattern_stats"]
+
+    def _full(self) -> Image.Image:
+        if not self.reduced:
+            return self.source
+        if "full" not in self._cache:
+            image = Image.open(io.BytesIO(self.image_bytes))
+            image.load()
+            self._cache["full"] = image
+        return self._cache["full"]
+
+    def at_least(self, width: int, height: int) -> Image.Image:
+        # The working image, unless a consumer needs more pixels than it has (e.g. a model
+        # with a larger input size); then decode again at the smallest scale that fits.
+        full_width, full_height = self.size
+        if self.source.width >= min(width, full_width) and self.source.height >= min(height, full_height):
+            return self.source
+        key = f"decode:{width}x{height}"
+        if key not in self._cache:
+            if "full" in self._cache:
+                self._cache[key] = _reduce_to(self._cache["full"], (width, height))
+            else:
+                image = Image.open(io.BytesIO(self.image_bytes))
+                image.draft("RGB", (width, height))
+                image.load()
+                self._cache[key] = image
+        return self._cache[key]
+
+    def resized(self, size: int) -> Image.Image:
+        key = f"resized:{size}"
+        if key not in self._cache:
+            image = self.at_least(size, size)
+            if image is self.source:
+                image = self.rgb
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+            self._cache[key] = image.resize((size, size), Image.Resampling.BILINEAR)
+        return self._cache[key]
+
+    def flattened(self, background: tuple[int, int, int] = (255, 255, 255)) -> Image.Image:
+        key = "flattened"
+        if key not in self._cache:
+            self._cache[key] = _flatten(self.source, background) if self.source.mode in {"RGBA", "LA"} else self.rgb
+        return self._cache[key]
+
+    def thumbnail(self, max_dimension: int) -> Image.Image:
+        key = f"thumbnail:{max_dimension}"
+        if key not in self._cache:
+            image = self.at_least(*_scaled_size(self.size, max_dimension))
+            if image is self.source:
+                image = self.flattened()
+            elif image.mode in {"RGBA", "LA"}:
+                image = _flatten(image, (255, 255, 255))
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+            width, height = image.size
+            scale = max_dimension / max(width, height)
+            if scale < 1:
+                size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                image = image.resize(size, Image.Resampling.BICUBIC, reducing_gap=2.0)
+            self._cache[key] = image
+        return self._cache[key]
+
+
+def _flatten(image: Image.Image, background: tuple[int, int, int]) -> Image.Image:
+    flattened = Image.new("RGB", image.size, background)
+    flattened.paste(image, mask=image.getchannel("A"))
+    return flattened
+
+
+def _scaled_size(size: tuple[int, int], max_dimension: int) -> tuple[int, int]:
+    width, height = size
+    scale = min(1.0, max_dimension / max(width, height))
+    return math.ceil(width * scale), math.ceil(height * scale)
+
+
+def _decode_request(size: tuple[int, int], model_size: int, preview_size: int) -> tuple[int, int]:
+    # Both sides must stay >= the model input for the square resize, and the long side
+    # >= the preview size.
+    width, height = size
+    scale = min(1.0, max(model_size / min(width, height), preview_size / max(width, height)))
+    return math.ceil(width * scale), math.ceil(height * scale)
+
+
+def _reduce_to(image: Image.Image, request: tuple[int, int]) -> Image.Image:
+    # Integer box reduction for formats without DCT scaling (PNG), mirroring what draft() does.
+    # Palette and high bit-depth images are left alone: averaging their values is meaningless.
+    if image.mode not in {"L", "LA", "RGB", "RGBA"}:
+        return image
+    factor = min(image.width // request[0], image.height // request[1])
+    return image.reduce(factor) if factor >= 2 else image
+
+
+def try_decode_image(image_bytes: bytes) -> DecodedImage | None:
+    try:
+        return DecodedImage.from_bytes(image_bytes)
+    except Exception:
+        return None
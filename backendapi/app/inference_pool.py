@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from .errors import AppError
+
+
+class InferenceOverloaded(AppError):
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__(
+            "MODEL_OVERLOADED",
+            "The screening model is busy. Please retry shortly.",
+            503,
+            headers={"Retry-After": str(retry_after_seconds)},
+        )
+        self.retry_after_seconds = retry_after_seconds
+
+
+class InferencePool:
+    def __init__(self, max_workers: int, max_queue: int, executor: Executor | None = None) -> None:
+        self._max_workers = max(1, max_workers)
+        self._capacity = self._max_workers + max(0, max_queue)
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="inference",
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._orphaned = 0
+        self._rejected = 0
+        self._cancelled_before_start = 0
+        self._completed = 0
+        self._average_job_seconds = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def executor(self) -> Executor:
+        return self._executor
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        with self._lock:
+            if self._in_flight + self._orphaned >= self._capacity:
+                self._rejected += 1
+                raise InferenceOverloaded(self._retry_after_locked())
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        job = self._executor.submit(_call_timed, fn, *args)
+        job.add_done_callback(self._record_job)
+        return job
+
+    async def wait(self, job: Future) -> Any:
+        result, _ = await asyncio.wrap_future(job)
+        return result
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        job = self.submit(fn, *args)
+        try:
+            result, _ = await asyncio.shield(asyncio.wrap_future(job))
+            return result
+        except asyncio.CancelledError:
+            if not job.cancel():
+                self.orphan_until_done(job)
+            raise
+
+    def orphan_until_done(self, job: Future) -> None:
+        # Work that is already running cannot be interrupted; keep counting it against
+        # capacity until it actually finishes so timeouts cannot oversubscribe the pool.
+        if job.done():
+            return
+        with self._lock:
+            self._orphaned += 1
+        job.add_done_callback(lambda _: self._release_orphan())
+
+    def retry_after_seconds(self) -> int:
+        with self._lock:
+            return self._retry_after_locked()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self._max_workers,
+                "capacity": self._capacity,
+                "in_flight": self._in_flight,
+                "orphaned": self._orphaned,
+                "rejected": self._rejected,
+                "cancelled_before_start": self._cancelled_before_start,
+                "completed": self._completed,
+                "average_job_seconds": round(self._average_job_seconds, 6),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _retry_after_locked(self) -> int:
+        backlog = self._in_flight + self._orphaned
+        job_seconds = self._average_job_seconds or 1.0
+        return max(1, math.ceil(backlog / self._max_workers * job_seconds))
+
+    def _record_job(self, job: Future) -> None:
+        with self._lock:
+            if job.cancelled():
+                self._cancelled_before_start += 1
+                return
+            self._completed += 1
+            if job.exception() is not None:
+                return
+            _, elapsed = job.result()
+            if self._average_job_seconds == 0.0:
+                self._average_job_seconds = elapsed
+            else:
+                self._average_job_seconds = 0.8 * self._average_job_seconds + 0.2 * elapsed
+
+    def _release_orphan(self) -> None:
+        with self._lock:
+            self._orphaned -= 1
+
+
+def _call_timed(fn: Callable[..., Any], *args: Any) -> tuple[Any, float]:
+    # Module-level so it can also be shipped to process-pool workers.
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
@@ -5,19 +5,24 @@ import base64
 import io
 import json
 import math
+import re
+import time
 import uuid
 from collections import Counter
 from datetime import datetime, timezone
+from typing import Literal
 
 from fastapi import Depends, FastAPI, File, Form, Header, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from PIL import Image
+from fastapi.responses import JSONResponse, Response
 
+from .blob_store import blob_key_from_url, blob_media_type, blob_url, create_blob_store, is_blob_key
 from .config import Settings, get_settings
-from .db import SupabaseService
-from .errors import AppError, add_error_handlers
-from .image_model import ImageInput, analyze_images
+from .db import SCAN_FIELD_SELECTORS, SupabaseService
+from .errors import AppError, add_error_handlers, app_error_response
+from .concurrency import gather_or_cancel
+from .image_model import ImageInput, analyze_images, assess_image
+from .imaging import DecodedImage, try_decode_image
 from .intelligence import (
     aggregate_scores,
     apply_context_weighting,
@@ -29,10 +34,23 @@ from .intelligence import (
     normalize_followup_answers,
     validate_context,
 )
-from .model import ModelService, map_risk_level
+from .metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    REGISTRY,
+    REQUEST_SECONDS,
+    REQUESTS,
+    MetricFamily,
+    histogram_samples,
+    metric_family,
+    observe_stage,
+    stats_family,
+)
+from .model import ModelService, Prediction, map_risk_level
+from .pagination import decode_cursor, page_cursors
 from .question_engine import build_questions, normalize_answers
 from .response_generator import build_screening_response
 from .risk_engine import evaluate_risk
+from .scan_assets import asset_etag, asset_selector, asset_urls, decode_asset, etag_matches
 from .schemas import (
     AnalyzeSessionResponse,
     ConditionScore,
@@ -44,18 +62,25 @@ from .schemas import (
     PredictResponse,
     QuestionsSessionResponse,
     ScanHistoryResponse,
+    ScanProjectionResponse,
+    ScanSummary,
+    ScanSummaryResponse,
     ScreeningResultResponse,
     SessionRequest,
     SubmitAnswersRequest,
     SubmitAnswersResponse,
     UploadSessionResponse,
 )
-from .session_store import SessionStore
+from .session_store import create_session_store
 from .text_extractor import extract_text_signals
-from .validation import analyze_image_quality, validate_image
+from .tracing import configure_trace_logging, end_trace, start_trace
+from .validation import read_image_upload
 
 DISCLAIMER = "This is a screening result, not a diagnosis. Please consult a dermatologist."
 MISSING_CONTEXT_MESSAGE = "Please upload an image and provide clinical context before proceeding."
+# Room for the non-file form fields and multipart framing on top of the images themselves.
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+HEATMAP_URL_PATTERN = re.compile(r"^/heatmaps/([0-9a-f]{64})$")
 
 app = FastAPI(title="Derma Vision API", version="0.1.0")
 add_error_handlers(app)
@@ -70,19 +95,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-model_service = ModelService()
+blob_store = create_blob_store(settings)
+model_service = ModelService(blob_store=blob_store)
 db_service = SupabaseService()
-session_store = SessionStore()
+session_store = create_session_store(settings)
+_warmup_task: asyncio.Task | None = None
+_pending_scan_writes: set[asyncio.Task] = set()
 
 
 @app.middleware("http")
 async def request_context_middleware(request: Request, call_next):
     request.state.request_id = str(uuid.uuid4())
-    response = await call_next(request)
+    settings = get_settings()
+    trace, trace_token = start_trace(request.state.request_id) if settings.REQUEST_TRACING else (None, None)
+    started = time.perf_counter()
+    try:
+        oversized = _oversized_upload_error(request, settings)
+        response = app_error_response(request, oversized) if oversized else await call_next(request)
+    finally:
+        if trace_token is not None:
+            end_trace(trace_token)
+    elapsed = time.perf_counter() - started
+    # Route templates, not raw paths, so scan ids and digests don't explode the label set.
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    REQUESTS.inc(request.method, route, str(response.status_code))
+    REQUEST_SECONDS.observe(elapsed, request.method, route)
+    if trace is not None:
+        response.headers["Server-Timing"] = trace.server_timing(elapsed)
+        if settings.REQUEST_TRACE_LOG:
+            trace.log(request.method, route, response.status_code, elapsed)
     response.headers["X-Request-ID"] = request.state.request_id
     return response
 
 
+def _oversized_upload_error(request: Request, settings: Settings) -> AppError | None:
+    # The multipart parser spools the whole body before a route runs, so a declared length
+    # that no valid request can reach is refused before any of it is read.
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        return None
+    try:
+        content_length = int(request.headers.get("content-length", ""))
+    except ValueError:
+        return None
+    limit = settings.MAX_IMAGE_BYTES * max(settings.MAX_IMAGE_COUNT, 3) + MULTIPART_OVERHEAD_BYTES
+    if content_length <= limit:
+        return None
+    return AppError("IMAGE_TOO_LARGE", f"Request body exceeds {limit} bytes.", 413, headers={"Connection": "close"})
+
+
 def require_api_key(
     x_api_key: str | None = Header(default=None, alias="X-API-Key"),
     settings: Settings = Depends(get_settings),
@@ -92,21 +152,53 @@ def require_api_key(
 
 
 @app.on_event("startup")
-def startup_event() -> None:
+async def startup_event() -> None:
+    global _warmup_task
+    if get_settings().REQUEST_TRACE_LOG:
+        configure_trace_logging()
     try:
         model_service.load()
     except Exception:
         pass
+    if model_service.state == "warming":
+        # Warm-up runs in the background so /health can report progress while it happens.
+        _warmup_task = asyncio.get_running_loop().create_task(model_service.warm_up())
 
     db_service.connect()
 
 
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    if _warmup_task is not None:
+        _warmup_task.cancel()
+    if _pending_scan_writes:
+        # Rows still waiting on their heatmap are written before the model and db go away.
+        await asyncio.wait(set(_pending_scan_writes), timeout=get_settings().INFERENCE_TIMEOUT_SECONDS)
+    await model_service.close()
+    await asyncio.to_thread(db_service.close)
+
+
+def _require_model() -> None:
+    if model_service.state == "warming":
+        raise AppError("MODEL_NOT_READY", "Model is warming up.", 503, headers={"Retry-After": "5"})
+    if not model_service.loaded:
+        raise AppError("MODEL_NOT_READY", "Model is not loaded.", 503)
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health() -> HealthResponse:
     settings = get_settings()
-    model_status = "loaded" if model_service.loaded else "failed"
+    model_status = model_service.state
+    if model_status == "loaded" and model_service.degraded:
+        # Answers are coming from fallback scores, not the trained checkpoint.
+        model_status = "fallback"
     db_status = db_service.status
-    status = "ok" if model_status == "loaded" and db_status in {"connected", "not_configured"} else "degraded"
+    if model_status == "warming":
+        status = "warming"
+    elif model_status == "loaded" and db_status in {"connected", "not_configured"}:
+        status = "ok"
+    else:
+        status = "degraded"
 
     return HealthResponse(
         status=status,
@@ -114,7 +206,65 @@ async def health() -> HealthResponse:
         model=model_status,
         db=db_status,
         version=settings.APP_VERSION,
+        engine=model_service.engine,
+        engines=model_service.engine_stats,
+        warmup=model_service.warmup_report,
+        runtime_profile=model_service.runtime_profile,
+    )
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    body = await asyncio.to_thread(REGISTRY.render)
+    return Response(content=body, media_type=METRICS_CONTENT_TYPE)
+
+
+def _service_metrics() -> list[MetricFamily]:
+    model_state = metric_family("model_state", "gauge", "1 for the current model state and serving engine.")
+    model_state.samples.append(
+        (model_state.name, {"state": model_service.state, "engine": model_service.engine or "unknown"}, 1.0)
+    )
+    engine_latency = metric_family(
+        "model_engine_latency_seconds",
+        "histogram",
+        "Inference latency by the engine that served the prediction.",
     )
+    for engine, stats in model_service.engine_stats.items():
+        buckets = [(float(bound), count) for bound, count in stats["latency_buckets"].items() if bound != "+Inf"]
+        engine_latency.samples.extend(
+            histogram_samples(
+                engine_latency.name,
+                {"engine": engine},
+                buckets,
+                stats["predictions"],
+                stats["total_seconds"],
+            )
+        )
+    return [
+        model_state,
+        engine_latency,
+        stats_family("prediction_cache", "Prediction cache counters.", model_service.cache_stats),
+        stats_family("heatmap_cache", "Heatmap cache counters.", model_service.heatmap_cache_stats),
+        stats_family("inference_pool", "Inference pool occupancy and job counters.", model_service.pool_stats),
+        stats_family("micro_batcher", "Micro-batcher counters.", model_service.batch_stats),
+        stats_family("session_store", "Screening session store usage.", session_store.stats()),
+        stats_family("scan_writer", "Write-behind scan queue.", db_service.write_stats()),
+    ]
+
+
+REGISTRY.register_collector(_service_metrics)
+
+
+async def _read_image(upload: UploadFile, settings: Settings, check_minimum_size: bool = True) -> bytes:
+    # /predict never applied the quality minimums, so it only gets the upper bounds.
+    with observe_stage("upload_read"):
+        return await read_image_upload(
+            upload,
+            max_bytes=settings.MAX_IMAGE_BYTES,
+            min_width=settings.MIN_IMAGE_WIDTH if check_minimum_size else 1,
+            min_height=settings.MIN_IMAGE_HEIGHT if check_minimum_size else 1,
+            max_dimension=settings.MAX_IMAGE_DIMENSION,
+        )
 
 
 @app.post("/predict", response_model=PredictResponse, dependencies=[Depends(require_api_key)])
@@ -122,24 +272,31 @@ async def predict(
     image: UploadFile = File(...),
     patient_ref: str | None = Query(default=None),
     user_id: uuid.UUID | None = Query(default=None),
+    explain: Literal["none", "heatmap"] = Query(default="none"),
 ):
     settings = get_settings()
 
-    if not model_service.loaded:
-        raise AppError("MODEL_NOT_READY", "Model is not loaded.", 503)
+    _require_model()
 
-    image_bytes = await image.read()
-    validate_image(image_bytes, settings.MAX_IMAGE_BYTES)
+    image_bytes = await _read_image(image, settings, check_minimum_size=False)
+    with observe_stage("decode"):
+        decoded = await asyncio.to_thread(try_decode_image, image_bytes)
 
     try:
-        prediction = await model_service.predict(image_bytes)
+        prediction = await model_service.predict(image_bytes, decoded=decoded)
     except asyncio.TimeoutError:
         raise AppError("INFERENCE_TIMEOUT", "Model inference timed out.", 504)
+    except AppError:
+        raise
     except Exception:
         raise AppError("INFERENCE_FAILED", "Could not process image right now. Please retry.", 500)
+    if explain == "heatmap":
+        await _attach_heatmap_url(prediction, image_bytes, decoded)
 
     risk_level = map_risk_level(prediction.risk_score)
     created_at = datetime.now(timezone.utc)
+    image_preview = await asyncio.to_thread(_build_preview_data_url, decoded)
+    persisted_preview = await asyncio.to_thread(_persisted_blob_url, image_preview)
 
     scan_payload = {
         "created_at": created_at.isoformat(),
@@ -153,18 +310,15 @@ async def predict(
         "metadata": {
             "filename": image.filename,
             "content_type": image.content_type,
-            "image_preview": _build_preview_data_url(image_bytes),
+            "image_preview": persisted_preview,
             "model_explainability": prediction.explainability,
+            "model_engine": prediction.engine,
             "confidence": prediction.model_confidence,
             "explanation": f"{risk_level.title()} risk screening result.",
         },
     }
 
-    scan_id = None
-    try:
-        scan_id = db_service.insert_scan(scan_payload)
-    except Exception:
-        scan_id = None
+    scan_id = await _enqueue_scan(scan_payload)
 
     return PredictResponse(
         scan_id=scan_id,
@@ -173,9 +327,84 @@ async def predict(
         top_label=prediction.top_label,
         disclaimer=DISCLAIMER,
         created_at=created_at,
+        heatmap_url=(prediction.explainability or {}).get("heatmap_url"),
     )
 
 
+async def _attach_heatmap_url(prediction: Prediction, image_bytes: bytes, decoded: DecodedImage | None) -> None:
+    # Only advertised when a heatmap is queued or already rendered, so the URL resolves.
+    digest = await model_service.request_heatmap(image_bytes, decoded=decoded)
+    if digest is not None:
+        # A fresh dict: the explainability object may be shared with the prediction cache.
+        prediction.explainability = {**(prediction.explainability or {}), "heatmap_url": f"/heatmaps/{digest}"}
+
+
+async def _enqueue_scan(scan_payload: dict) -> str | None:
+    explainability = scan_payload["metadata"].get("model_explainability")
+    if _heatmap_digest(explainability) is None or not db_service.enabled:
+        return await _write_scan(scan_payload)
+    # The row waits for its heatmap in the background so Grad-CAM never holds up the response;
+    # its id is assigned now so the caller can already refer to the scan.
+    scan_payload = {**scan_payload, "id": str(uuid.uuid4())}
+    task = asyncio.get_running_loop().create_task(_write_scan(scan_payload))
+    _pending_scan_writes.add(task)
+    task.add_done_callback(_pending_scan_writes.discard)
+    return scan_payload["id"]
+
+
+async def _write_scan(scan_payload: dict) -> str | None:
+    metadata = scan_payload["metadata"]
+    explainability = await _persisted_explainability(metadata.get("model_explainability"))
+    scan_payload = {**scan_payload, "metadata": {**metadata, "model_explainability": explainability}}
+    try:
+        return await asyncio.to_thread(db_service.enqueue_scan, scan_payload)
+    except Exception:
+        return None
+
+
+async def _persisted_explainability(explainability: dict | None) -> dict | None:
+    # Scan rows outlive the heatmap cache, so they keep the rendered heatmap itself (a persisted
+    # blob URL or an inline PNG), never a /heatmaps/{digest} link that stops resolving.
+    if not isinstance(explainability, dict):
+        return explainability
+    heatmap_url = explainability.get("heatmap_url")
+    persisted = {key: value for key, value in explainability.items() if key != "heatmap_url"}
+    digest = _heatmap_digest(explainability)
+    if digest is not None:
+        artifact = await model_service.wait_for_heatmap(digest, get_settings().INFERENCE_TIMEOUT_SECONDS)
+        heatmap_url = (artifact or {}).get("heatmap_url")
+        if isinstance((artifact or {}).get("heatmap"), str):
+            persisted["heatmap"] = artifact["heatmap"]
+    if isinstance(heatmap_url, str) and blob_key_from_url(heatmap_url) is not None:
+        persisted["heatmap_url"] = await asyncio.to_thread(_persisted_blob_url, heatmap_url)
+    return persisted
+
+
+def _heatmap_digest(explainability: dict | None) -> str | None:
+    heatmap_url = explainability.get("heatmap_url") if isinstance(explainability, dict) else None
+    match = HEATMAP_URL_PATTERN.match(heatmap_url) if isinstance(heatmap_url, str) else None
+    return match.group(1) if match else None
+
+
+@app.get("/heatmaps/{digest}", dependencies=[Depends(require_api_key)])
+async def heatmap(digest: str, if_none_match: str | None = Header(default=None, alias="If-None-Match")):
+    if not re.fullmatch(r"[0-9a-f]{64}", digest):
+        raise AppError("HEATMAP_NOT_FOUND", "Heatmap not found.", 404)
+
+    status, artifact = await model_service.heatmap(digest)
+    if status == "pending":
+        return JSONResponse({"status": "pending"}, status_code=202, headers={"Retry-After": "1"})
+    if artifact is None:
+        raise AppError("HEATMAP_NOT_FOUND", "Heatmap not found.", 404)
+    if isinstance(artifact.get("heatmap_url"), str) and (key := blob_key_from_url(artifact["heatmap_url"])):
+        return await _blob_response(key, if_none_match)
+    decoded_asset = decode_asset(artifact["heatmap"]) if isinstance(artifact.get("heatmap"), str) else None
+    if decoded_asset is None:
+        raise AppError("HEATMAP_NOT_FOUND", "Heatmap not found.", 404)
+    content, media_type = decoded_asset
+    return _immutable_response(content, media_type, asset_etag(content), if_none_match)
+
+
 def _parse_json_object(value: str | None, field_name: str) -> dict:
     if not value:
         return {}
@@ -188,29 +417,46 @@ def _parse_json_object(value: str | None, field_name: str) -> dict:
     return parsed
 
 
-def _build_preview_data_url(image_bytes: bytes, max_dimension: int = 640, quality: int = 82) -> str | None:
+def _build_preview_data_url(
+    decoded: DecodedImage | None,
+    max_dimension: int = 640,
+    quality: int = 82,
+) -> str | None:
+    if decoded is None:
+        return None
     try:
-        with Image.open(io.BytesIO(image_bytes)) as image:
-            image.load()
-            image.thumbnail((max_dimension, max_dimension))
-
-            if image.mode in {"RGBA", "LA"}:
-                background = Image.new("RGB", image.size, (255, 255, 255))
-                background.paste(image, mask=image.getchannel("A"))
-                image = background
-            elif image.mode != "RGB":
-                image = image.convert("RGB")
-
+        with observe_stage("preview"):
+            image = decoded.thumbnail(max_dimension)
             buffer = io.BytesIO()
             image.save(buffer, format="JPEG", quality=quality, optimize=True)
+            if blob_store is not None:
+                return blob_url(blob_store.put(buffer.getvalue(), "image/jpeg"))
             encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
             return f"data:image/jpeg;base64,{encoded}"
     except Exception:
         return None
 
 
-def _get_session_or_404(session_id: str):
-    session = session_store.get_session(session_id)
+def _persisted_blob_url(value: str | None) -> str | None:
+    # Scan rows are also read outside this API, so they must not hold host-relative /blobs/
+    # links: use the public base when one is configured, otherwise inline the blob again.
+    key = blob_key_from_url(value) if isinstance(value, str) else None
+    if key is None or blob_store is None:
+        return value
+    if settings.BLOB_PUBLIC_BASE_URL:
+        return f"{settings.BLOB_PUBLIC_BASE_URL.rstrip('/')}{blob_url(key)}"
+    content = blob_store.get(key)
+    if content is None:
+        return None
+    return f"data:{blob_media_type(key)};base64,{base64.b64encode(content).decode('ascii')}"
+
+
+def _build_upload_preview(image_bytes: bytes) -> str | None:
+    return _build_preview_data_url(try_decode_image(image_bytes))
+
+
+async def _get_session_or_404(session_id: str):
+    session = await asyncio.to_thread(session_store.get_session, session_id)
     if session is None:
         raise AppError("SESSION_NOT_FOUND", "Screening session not found.", 404)
     return session
@@ -220,16 +466,27 @@ async def _ensure_session_analysis(session) -> None:
     if session.analysis is not None and session.text_signals is not None:
         return
 
+    try:
+        image_payloads = await asyncio.gather(
+            *(asyncio.to_thread(session_store.load_image_bytes, image) for image in session.images)
+        )
+    except FileNotFoundError:
+        # A spilled image evicted or expired between fetching the session and reading it.
+        raise AppError("SESSION_NOT_FOUND", "Screening session not found.", 404)
     image_inputs = [
         ImageInput(
             filename=image["filename"],
             content_type=image.get("content_type"),
-            image_bytes=image["image_bytes"],
+            image_bytes=image_bytes,
         )
-        for image in session.images
+        for image, image_bytes in zip(session.images, image_payloads)
     ]
-    session.analysis = await analyze_images(model_service, settings, image_inputs)
+    try:
+        session.analysis = await analyze_images(model_service, settings, image_inputs)
+    except asyncio.TimeoutError:
+        raise AppError("INFERENCE_TIMEOUT", "Model inference timed out.", 504)
     session.text_signals = extract_text_signals(session.description)
+    await asyncio.to_thread(session_store.save_session, session)
 
 
 def _store_mvp_scan(session) -> str | None:
@@ -246,7 +503,9 @@ def _store_mvp_scan(session) -> str | None:
         "metadata": {
             "session_id": session.session_id,
             "image_count": session.analysis["image_count"],
-            "image_previews": [image.get("preview") for image in session.images if image.get("preview")],
+            "image_previews": [
+                _persisted_blob_url(image.get("preview")) for image in session.images if image.get("preview")
+            ],
             "context": {"context_text": session.description},
             "text_signals": session.text_signals,
             "followup_items": session.questions,
@@ -262,7 +521,7 @@ def _store_mvp_scan(session) -> str | None:
     }
 
     try:
-        return db_service.insert_scan(payload)
+        return db_service.enqueue_scan(payload)
     except Exception:
         return None
 
@@ -272,8 +531,7 @@ async def upload_screening(
     images: list[UploadFile] = File(...),
     description: str = Form(...),
 ):
-    if not model_service.loaded:
-        raise AppError("MODEL_NOT_READY", "Model is not loaded.", 503)
+    _require_model()
 
     cleaned_description = description.strip()
     if not cleaned_description:
@@ -283,20 +541,24 @@ async def upload_screening(
     if not 2 <= len(images) <= 3:
         raise AppError("INVALID_IMAGE_COUNT", "Please upload 2 or 3 images for screening.", 400)
 
-    stored_images: list[dict[str, str | bytes | None]] = []
+    image_payloads: list[bytes] = []
     for upload in images:
-        image_bytes = await upload.read()
-        validate_image(image_bytes, settings.MAX_IMAGE_BYTES)
-        stored_images.append(
-            {
-                "filename": upload.filename or "unknown",
-                "content_type": upload.content_type,
-                "image_bytes": image_bytes,
-                "preview": _build_preview_data_url(image_bytes),
-            }
-        )
+        image_payloads.append(await _read_image(upload, settings))
+
+    previews = await asyncio.gather(
+        *(asyncio.to_thread(_build_upload_preview, image_bytes) for image_bytes in image_payloads)
+    )
+    stored_images: list[dict[str, str | bytes | None]] = [
+        {
+            "filename": upload.filename or "unknown",
+            "content_type": upload.content_type,
+            "image_bytes": image_bytes,
+            "preview": preview,
+        }
+        for upload, image_bytes, preview in zip(images, image_payloads, previews)
+    ]
 
-    session = session_store.create_session(cleaned_description, stored_images)
+    session = await asyncio.to_thread(session_store.create_session, cleaned_description, stored_images)
     return UploadSessionResponse(
         session_id=session.session_id,
         created_at=session.created_at,
@@ -307,10 +569,9 @@ async def upload_screening(
 
 @app.post("/analyze", response_model=AnalyzeSessionResponse, dependencies=[Depends(require_api_key)])
 async def analyze_screening(request: SessionRequest):
-    if not model_service.loaded:
-        raise AppError("MODEL_NOT_READY", "Model is not loaded.", 503)
+    _require_model()
 
-    session = _get_session_or_404(request.session_id)
+    session = await _get_session_or_404(request.session_id)
     await _ensure_session_analysis(session)
 
     message = None
@@ -329,11 +590,12 @@ async def analyze_screening(request: SessionRequest):
 
 @app.post("/questions", response_model=QuestionsSessionResponse, dependencies=[Depends(require_api_key)])
 async def screening_questions(request: SessionRequest):
-    session = _get_session_or_404(request.session_id)
+    session = await _get_session_or_404(request.session_id)
     await _ensure_session_analysis(session)
 
     if not session.questions:
         session.questions = build_questions(session.analysis["conditions"], session.text_signals or {})
+        await asyncio.to_thread(session_store.save_session, session)
 
     return QuestionsSessionResponse(
         session_id=session.session_id,
@@ -343,7 +605,7 @@ async def screening_questions(request: SessionRequest):
 
 @app.post("/submit-answers", response_model=SubmitAnswersResponse, dependencies=[Depends(require_api_key)])
 async def submit_screening_answers(request: SubmitAnswersRequest):
-    session = _get_session_or_404(request.session_id)
+    session = await _get_session_or_404(request.session_id)
     await _ensure_session_analysis(session)
 
     if not session.questions:
@@ -371,7 +633,8 @@ async def submit_screening_answers(request: SubmitAnswersRequest):
     }
 
     if session.scan_id is None:
-        session.scan_id = _store_mvp_scan(session)
+        session.scan_id = await asyncio.to_thread(_store_mvp_scan, session)
+    await asyncio.to_thread(session_store.save_session, session)
 
     return SubmitAnswersResponse(
         session_id=session.session_id,
@@ -383,12 +646,32 @@ async def submit_screening_answers(request: SubmitAnswersRequest):
 
 @app.get("/result", response_model=ScreeningResultResponse, dependencies=[Depends(require_api_key)])
 async def screening_result(session_id: str = Query(...)):
-    session = _get_session_or_404(session_id)
+    session = await _get_session_or_404(session_id)
     if session.result is None:
         raise AppError("RESULT_NOT_READY", "Submit answers before requesting a result.", 409)
     return ScreeningResultResponse(**session.result)
 
 
+async def _analyze_enhanced_image(
+    image_bytes: bytes,
+    settings: Settings,
+    explain: bool = False,
+) -> tuple[dict, Prediction, str | None]:
+    decoded, metrics = await assess_image(image_bytes, settings)
+    try:
+        prediction, preview = await asyncio.gather(
+            model_service.predict(image_bytes, decoded=decoded),
+            asyncio.to_thread(_build_preview_data_url, decoded),
+        )
+    except (asyncio.TimeoutError, AppError):
+        raise
+    except Exception:
+        raise AppError("INFERENCE_FAILED", "Could not process image right now. Please retry.", 500)
+    if explain:
+        await _attach_heatmap_url(prediction, image_bytes, decoded)
+    return metrics, prediction, preview
+
+
 @app.post("/predict/enhanced", response_model=PredictEnhancedResponse, dependencies=[Depends(require_api_key)])
 async def predict_enhanced(
     image: UploadFile | None = File(default=None),
@@ -397,12 +680,12 @@ async def predict_enhanced(
     followup_answers: str | None = Form(default=None),
     patient_ref: str | None = Query(default=None),
     user_id: uuid.UUID | None = Query(default=None),
+    explain: Literal["none", "heatmap"] = Query(default="none"),
 ):
     settings = get_settings()
     created_at = datetime.now(timezone.utc)
 
-    if not model_service.loaded:
-        raise AppError("MODEL_NOT_READY", "Model is not loaded.", 503)
+    _require_model()
 
     uploads: list[UploadFile] = []
     if image is not None:
@@ -427,6 +710,7 @@ async def predict_enhanced(
 
     image_scores: list[float] = []
     image_labels: list[str] = []
+    image_engines: list[str | None] = []
     image_model_confidences: list[float] = []
     model_explainability_chunks: list[dict] = []
     quality_metrics: list[dict] = []
@@ -434,39 +718,29 @@ async def predict_enhanced(
     content_types: list[str] = []
     image_previews: list[str] = []
 
-    for upload in uploads:
-        image_bytes = await upload.read()
-        try:
-            metrics = analyze_image_quality(
-                image_bytes=image_bytes,
-                max_bytes=settings.MAX_IMAGE_BYTES,
-                min_width=settings.MIN_IMAGE_WIDTH,
-                min_height=settings.MIN_IMAGE_HEIGHT,
-                max_dimension=settings.MAX_IMAGE_DIMENSION,
-                min_brightness_mean=settings.MIN_BRIGHTNESS_MEAN,
-                max_brightness_mean=settings.MAX_BRIGHTNESS_MEAN,
-                min_edge_intensity=settings.MIN_EDGE_INTENSITY,
+    try:
+        image_payloads = [await _read_image(upload, settings) for upload in uploads]
+        outcomes = await gather_or_cancel(
+            (_analyze_enhanced_image(image_bytes, settings, explain == "heatmap") for image_bytes in image_payloads),
+            timeout=settings.INFERENCE_TIMEOUT_SECONDS,
+        )
+    except asyncio.TimeoutError:
+        raise AppError("INFERENCE_TIMEOUT", "Model inference timed out.", 504)
+    except AppError as exc:
+        if exc.code in {"INVALID_IMAGE", "UNSUPPORTED_IMAGE", "IMAGE_TOO_LARGE", "MISSING_IMAGE"}:
+            return PredictEnhancedResponse(
+                status="invalid_image",
+                message="Image quality insufficient for analysis. Please retake photo.",
+                disclaimer=DISCLAIMER,
+                created_at=created_at,
             )
-        except AppError as exc:
-            if exc.code in {"INVALID_IMAGE", "UNSUPPORTED_IMAGE", "IMAGE_TOO_LARGE", "MISSING_IMAGE"}:
-                return PredictEnhancedResponse(
-                    status="invalid_image",
-                    message="Image quality insufficient for analysis. Please retake photo.",
-                    disclaimer=DISCLAIMER,
-                    created_at=created_at,
-                )
-            raise
-
-        try:
-            prediction = await model_service.predict(image_bytes)
-        except asyncio.TimeoutError:
-            raise AppError("INFERENCE_TIMEOUT", "Model inference timed out.", 504)
-        except Exception:
-            raise AppError("INFERENCE_FAILED", "Could not process image right now. Please retry.", 500)
+        raise
 
+    for upload, (metrics, prediction, preview) in zip(uploads, outcomes):
         quality_metrics.append(metrics)
         image_scores.append(prediction.risk_score)
         image_labels.append(prediction.top_label)
+        image_engines.append(prediction.engine)
         if (
             prediction.model_confidence is not None
             and isinstance(prediction.model_confidence, (int, float))
@@ -477,7 +751,6 @@ async def predict_enhanced(
             model_explainability_chunks.append(prediction.explainability)
         filenames.append(upload.filename or "unknown")
         content_types.append(upload.content_type or "unknown")
-        preview = _build_preview_data_url(image_bytes)
         if preview:
             image_previews.append(preview)
 
@@ -510,11 +783,12 @@ async def predict_enhanced(
         )
 
     top_label = Counter(image_labels).most_common(1)[0][0]
-    context_result = apply_context_weighting(
-        float(aggregation["aggregate_score"]),
-        merged_context,
-        top_label=top_label,
-    )
+    with observe_stage("context_weighting"):
+        context_result = apply_context_weighting(
+            float(aggregation["aggregate_score"]),
+            merged_context,
+            top_label=top_label,
+        )
     final_score = float(context_result["score"])
     messaging = build_risk_message(final_score)
     followup_question_items = build_followup_questions(
@@ -572,6 +846,13 @@ async def predict_enhanced(
         "contributing_factors": contributing_factors,
         "reasoning": "Final score combines weighted multi-image model score with capped deterministic context adjustment.",
     }
+    persisted_previews = [
+        preview
+        for preview in await asyncio.gather(
+            *(asyncio.to_thread(_persisted_blob_url, preview) for preview in image_previews)
+        )
+        if preview
+    ]
 
     scan_payload = {
         "created_at": created_at.isoformat(),
@@ -584,8 +865,8 @@ async def predict_enhanced(
         "status": "success",
         "metadata": {
             "image_count": len(image_scores),
-            "image_preview": image_previews[0] if image_previews else None,
-            "image_previews": image_previews,
+            "image_preview": persisted_previews[0] if persisted_previews else None,
+            "image_previews": persisted_previews,
             "individual_scores": [round(score, 4) for score in image_scores],
             "aggregate_score": round(float(aggregation["aggregate_score"]), 4),
             "score_spread": round(float(aggregation["spread"]), 4),
@@ -595,6 +876,7 @@ async def predict_enhanced(
             "followup_questions": followup_questions,
             "followup_items": followup_items,
             "model_confidences": [round(value, 4) for value in image_model_confidences],
+            "model_engines": image_engines,
             "quality_metrics": quality_metrics,
             "filenames": filenames,
             "content_types": content_types,
@@ -612,11 +894,7 @@ async def predict_enhanced(
         },
     }
 
-    scan_id = None
-    try:
-        scan_id = db_service.insert_scan(scan_payload)
-    except Exception:
-        scan_id = None
+    scan_id = await _enqueue_scan(scan_payload)
 
     return PredictEnhancedResponse(
         status="success",
@@ -642,26 +920,133 @@ async def predict_enhanced(
     )
 
 
-@app.get("/scans", response_model=ScanHistoryResponse, dependencies=[Depends(require_api_key)])
+@app.get(
+    "/scans",
+    response_model=ScanHistoryResponse | ScanSummaryResponse | ScanProjectionResponse,
+    dependencies=[Depends(require_api_key)],
+)
 async def scans(
     patient_ref: str | None = Query(default=None),
     user_id: uuid.UUID | None = Query(default=None),
     limit: int = Query(default=10, ge=1, le=50),
+    view: Literal["full", "summary"] = Query(default="full"),
+    before: str | None = Query(default=None),
+    after: str | None = Query(default=None),
+    risk_level: list[Literal["low", "medium", "high"]] | None = Query(default=None),
+    top_label: str | None = Query(default=None),
+    created_from: datetime | None = Query(default=None),
+    created_to: datetime | None = Query(default=None),
+    fields: str | None = Query(default=None),
     settings: Settings = Depends(get_settings),
 ):
     if not settings.ENABLE_SCAN_HISTORY:
         raise AppError("FEATURE_DISABLED", "Scan history is disabled.", 404)
+    if before and after:
+        raise AppError("INVALID_CURSOR", "Use either before or after, not both.", 422)
+
+    selected_fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    if selected_fields is not None:
+        unknown = sorted(set(selected_fields) - set(SCAN_FIELD_SELECTORS))
+        if unknown or not selected_fields:
+            raise AppError("INVALID_FIELDS", f"Unknown scan fields: {', '.join(unknown) or '(none)'}.", 422)
 
     try:
-        items = db_service.fetch_scans(
+        items = await asyncio.to_thread(
+            db_service.fetch_scans,
             patient_ref=patient_ref,
             limit=limit,
             user_id=str(user_id) if user_id else None,
+            summary=view == "summary",
+            fields=selected_fields,
+            before=decode_cursor(before) if before else None,
+            after=decode_cursor(after) if after else None,
+            risk_levels=list(risk_level) if risk_level else None,
+            top_label=top_label,
+            created_from=created_from.isoformat() if created_from else None,
+            created_to=created_to.isoformat() if created_to else None,
         )
+    except AppError:
+        raise
+    except Exception:
+        raise AppError("SCAN_HISTORY_FAILED", "Could not fetch scan history.", 500)
+
+    next_cursor, prev_cursor = page_cursors(items, limit, paging_forward=after is not None)
+    if selected_fields is not None:
+        return ScanProjectionResponse(items=items, next_cursor=next_cursor, prev_cursor=prev_cursor)
+    if view == "full":
+        return ScanHistoryResponse(items=items, next_cursor=next_cursor, prev_cursor=prev_cursor)
+    return ScanSummaryResponse(
+        items=[
+            ScanSummary(
+                **{
+                    **item,
+                    "explanation": item.get("simple_explanation") or item.get("explanation"),
+                    **asset_urls(item["id"], item.get("image_count")),
+                }
+            )
+            for item in items
+        ],
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+    )
+
+
+@app.get("/scans/{scan_id}/assets/{asset}", dependencies=[Depends(require_api_key)])
+async def scan_asset(
+    scan_id: uuid.UUID,
+    asset: str,
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    settings: Settings = Depends(get_settings),
+):
+    if not settings.ENABLE_SCAN_HISTORY:
+        raise AppError("FEATURE_DISABLED", "Scan history is disabled.", 404)
+    selector = asset_selector(asset)
+    if selector is None:
+        raise AppError("ASSET_NOT_FOUND", "Unknown scan asset.", 404)
+
+    try:
+        row = await asyncio.to_thread(db_service.fetch_scan_fields, str(scan_id), selector)
     except Exception:
         raise AppError("SCAN_HISTORY_FAILED", "Could not fetch scan history.", 500)
 
-    return ScanHistoryResponse(items=items)
+    value = (row or {}).get("value") or (row or {}).get("first")
+    if isinstance(value, str) and (key := blob_key_from_url(value)) is not None:
+        return await _blob_response(key, if_none_match)
+    decoded_asset = decode_asset(value) if isinstance(value, str) and value else None
+    if decoded_asset is None:
+        raise AppError("ASSET_NOT_FOUND", "Scan asset not found.", 404)
+
+    content, media_type = decoded_asset
+    return _immutable_response(content, media_type, asset_etag(content), if_none_match)
+
+
+@app.get("/blobs/{key}", dependencies=[Depends(require_api_key)])
+async def blob(key: str, if_none_match: str | None = Header(default=None, alias="If-None-Match")):
+    return await _blob_response(key, if_none_match)
+
+
+async def _blob_response(key: str, if_none_match: str | None) -> Response:
+    if blob_store is None or not is_blob_key(key):
+        raise AppError("ASSET_NOT_FOUND", "Blob not found.", 404)
+    # The key is the content hash, so a matching client copy is answered without a read.
+    etag = f'"{key.split(".", 1)[0]}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=_immutable_headers(etag))
+    content = await asyncio.to_thread(blob_store.get, key)
+    if content is None:
+        raise AppError("ASSET_NOT_FOUND", "Blob not found.", 404)
+    return Response(content=content, media_type=blob_media_type(key), headers=_immutable_headers(etag))
+
+
+def _immutable_response(content: bytes, media_type: str, etag: str, if_none_match: str | None) -> Response:
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=_immutable_headers(etag))
+    return Response(content=content, media_type=media_type, headers=_immutable_headers(etag))
+
+
+def _immutable_headers(etag: str) -> dict[str, str]:
+    # Stored scans and blobs never change, so clients can keep them for as long as they like.
+    return {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"}
 
 
 @app.get("/")
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+from .tracing import record_span
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_PREFIX = "dermavision_"
+
+
+@dataclass
+class MetricFamily:
+    name: str
+    kind: str
+    help_text: str
+    samples: list[tuple[str, dict[str, str], float]] = field(default_factory=list)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            values = sorted(self._values.items())
+        family = MetricFamily(self.name, "counter", self.help_text)
+        for label_values, value in values:
+            family.samples.append((self.name, dict(zip(self._labels, label_values)), value))
+        return family
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._labels = labels
+        self._buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (plus one overflow slot), sum, count.
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            counts, totals = self._series.setdefault(label_values, ([0] * (len(self._buckets) + 1), [0.0]))
+            for index, upper_bound in enumerate(self._buckets):
+                if value <= upper_bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            totals[0] += value
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            series = sorted((labels, (list(counts), totals[0])) for labels, (counts, totals) in self._series.items())
+        family = MetricFamily(self.name, "histogram", self.help_text)
+        for label_values, (counts, total) in series:
+            labels = dict(zip(self._labels, label_values))
+            family.samples.extend(
+                histogram_samples(self.name, labels, zip(self._buckets, _cumulative(counts)), sum(counts), total)
+            )
+        return family
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], list[MetricFamily]]] = []
+
+    def counter(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(f"{_PREFIX}{name}", help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(f"{_PREFIX}{name}", help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], list[MetricFamily]]) -> None:
+        # Collectors are called on every scrape, for values that already live elsewhere.
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        families = [metric.collect() for metric in self._metrics]
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception:
+                # One broken collector must not take the whole scrape down.
+                continue
+
+        lines: list[str] = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {_escape_help(family.help_text)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in family.samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "route"),
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "stage_duration_seconds",
+    "Time spent in each processing stage of a request.",
+    ("stage",),
+)
+
+
+@contextmanager
+def observe_stage(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        STAGE_SECONDS.observe(seconds, stage)
+        record_span(stage, started, seconds)
+
+
+def metric_family(name: str, kind: str, help_text: str) -> MetricFamily:
+    return MetricFamily(f"{_PREFIX}{name}", kind, help_text)
+
+
+def stats_family(
+    name: str,
+    help_text: str,
+    stats: dict[str, Any] | None,
+    labels: dict[str, str] | None = None,
+) -> MetricFamily:
+    # Exposes the numeric fields of a component's stats() snapshot as one labelled gauge.
+    family = metric_family(name, "gauge", help_text)
+    for key, value in (stats or {}).items():
+        if isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, (int, float)):
+            continue
+        family.samples.append((family.name, {**(labels or {}), "field": key}, float(value)))
+    return family
+
+
+def histogram_samples(
+    name: str,
+    labels: dict[str, str],
+    cumulative_buckets: Any,
+    count: int,
+    total: float,
+) -> list[tuple[str, dict[str, str], float]]:
+    samples = [
+        (f"{name}_bucket", {**labels, "le": _format_value(upper_bound)}, float(bucket_count))
+        for upper_bound, bucket_count in cumulative_buckets
+    ]
+    samples.append((f"{name}_bucket", {**labels, "le": "+Inf"}, float(count)))
+    samples.append((f"{name}_sum", labels, total))
+    samples.append((f"{name}_count", labels, float(count)))
+    return samples
+
+
+def _cumulative(counts: list[int]) -> list[int]:
+    running = 0
+    cumulative = []
+    for count in counts[:-1]:
+        running += count
+        cumulative.append(running)
+    return cumulative
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape_label(str(value))}"' for key, value in labels.items())
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(float(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
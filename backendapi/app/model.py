@@ -1,11 +1,28 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import binascii
+import hashlib
 import importlib
-from dataclasses import dataclass
+import inspect
+import io
+import time
+from dataclasses import dataclass, field
+from functools import partial
 from typing import Any, Callable
 
+from PIL import Image
+
+from .batching import MicroBatcher
+from .blob_store import BlobStore, blob_url
 from .config import get_settings
+from .imaging import DecodedImage, try_decode_image
+from .inference_pool import InferencePool
+from .metrics import observe_stage
+from .prediction_cache import PredictionCache
+from .process_backend import SharedImageHandle, create_process_executor, predict_shared, worker_input_size
+from .runtime_profile import apply_thread_profile, resolve_thread_profile
 
 
 @dataclass
@@ -15,67 +32,528 @@ class Prediction:
     explainability: dict[str, Any] | None = None
     model_confidence: float | None = None
     class_probabilities: dict[str, float] | None = None
+    engine: str | None = None
+
+
+# Engines that mean the trained checkpoint is not the one answering.
+FALLBACK_ENGINES = frozenset({"fallback", "heuristic"})
+ENGINE_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class EngineStats:
+    predictions: int = 0
+    total_seconds: float = 0.0
+    bucket_counts: list[int] = field(default_factory=lambda: [0] * len(ENGINE_LATENCY_BUCKETS))
+
+    def record(self, seconds: float) -> None:
+        self.predictions += 1
+        self.total_seconds += seconds
+        for index, upper_bound in enumerate(ENGINE_LATENCY_BUCKETS):
+            if seconds <= upper_bound:
+                self.bucket_counts[index] += 1
+                break
+
+    def snapshot(self) -> dict[str, Any]:
+        # Cumulative buckets keyed by upper bound, the way Prometheus histograms count.
+        buckets: dict[str, int] = {}
+        cumulative = 0
+        for upper_bound, count in zip(ENGINE_LATENCY_BUCKETS, self.bucket_counts):
+            cumulative += count
+            buckets[str(upper_bound)] = cumulative
+        buckets["+Inf"] = self.predictions
+        return {
+            "predictions": self.predictions,
+            "total_seconds": round(self.total_seconds, 6),
+            "average_seconds": round(self.total_seconds / self.predictions, 6) if self.predictions else 0.0,
+            "latency_buckets": buckets,
+        }
 
 
 class ModelService:
-    def __init__(self) -> None:
-        self._loaded = False
+    def __init__(self, blob_store: BlobStore | None = None) -> None:
+        self._blob_store = blob_store
+        self._state = "failed"
         self._predict_callable: Callable[[bytes], dict[str, Any]] | None = None
+        self._load_callable: Callable[[], Any] | None = None
+        self._run_batch: Callable[[list[Any]], list[dict[str, Any]]] | None = None
+        self._batch_callable: Callable[..., list[dict[str, Any]]] | None = None
+        self._process_backend = False
+        self._warmup_report: dict[str, Any] | None = None
+        self._runtime_profile: dict[str, Any] | None = None
+        self._engine: str | None = None
+        self._engine_stats: dict[str, EngineStats] = {}
+        self._accepts_decoded = False
+        self._batcher: MicroBatcher | None = None
+        self._pool: InferencePool | None = None
+        self._shared_input_size: int | None = None
+        self._cache: PredictionCache | None = None
+        self._fingerprint_callable: Callable[[], str] | None = None
+        self._model_fingerprint: str | None = None
+        self._explain_callable: Callable[..., str | None] | None = None
+        self._explain_accepts_decoded = False
+        self._heatmap_cache: PredictionCache | None = None
+        self._heatmap_tasks: dict[str, asyncio.Task] = {}
+        self._heatmap_slot = asyncio.Semaphore(1)
 
     @property
     def loaded(self) -> bool:
-        return self._loaded
+        return self._state == "loaded"
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def engine(self) -> str | None:
+        # Engine behind the most recent inference; None until one has run or when the
+        # model module does not report it.
+        return self._engine
+
+    @property
+    def degraded(self) -> bool:
+        return self._engine in FALLBACK_ENGINES
+
+    @property
+    def engine_stats(self) -> dict[str, Any]:
+        return {engine: stats.snapshot() for engine, stats in sorted(self._engine_stats.items())}
+
+    @property
+    def warmup_report(self) -> dict[str, Any] | None:
+        return self._warmup_report
+
+    @property
+    def runtime_profile(self) -> dict[str, Any] | None:
+        return self._runtime_profile
+
+    @property
+    def batch_stats(self) -> dict[str, Any] | None:
+        return self._batcher.stats.snapshot() if self._batcher is not None else None
+
+    @property
+    def pool_stats(self) -> dict[str, Any] | None:
+        return self._pool.stats() if self._pool is not None else None
+
+    @property
+    def cache_stats(self) -> dict[str, Any] | None:
+        return self._cache.stats() if self._cache is not None else None
+
+    @property
+    def heatmap_cache_stats(self) -> dict[str, Any] | None:
+        return self._heatmap_cache.stats() if self._heatmap_cache is not None else None
+
+    @property
+    def backend(self) -> str:
+        return "process" if self._process_backend else "thread"
 
     def load(self) -> None:
         settings = get_settings()
+        self._state = "failed"
+        self._warmup_report = None
+        self._engine = None
         module = importlib.import_module(settings.MODEL_MODULE)
         callable_obj = getattr(module, settings.MODEL_CALLABLE)
         if not callable(callable_obj):
             raise RuntimeError("Configured model callable is not callable")
 
         self._predict_callable = callable_obj
-        self._loaded = True
+        load_callable = getattr(module, "load_model", None)
+        self._load_callable = load_callable if callable(load_callable) else None
+        self._accepts_decoded = _accepts_keyword(callable_obj, "decoded")
+        fingerprint_callable = getattr(module, "model_fingerprint", None)
+        self._fingerprint_callable = fingerprint_callable if callable(fingerprint_callable) else None
+        self._model_fingerprint = None
+        explain_callable = getattr(module, settings.MODEL_EXPLAIN_CALLABLE, None)
+        self._explain_callable = explain_callable if callable(explain_callable) else None
+        self._explain_accepts_decoded = self._explain_callable is not None and _accepts_keyword(
+            self._explain_callable, "decoded"
+        )
+        self._heatmap_cache = PredictionCache(
+            max_bytes=settings.HEATMAP_CACHE_MAX_BYTES,
+            ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+            disk_dir=f"{settings.PREDICTION_CACHE_DIR}/heatmaps" if settings.PREDICTION_CACHE_DIR else None,
+            max_disk_bytes=settings.HEATMAP_CACHE_DISK_MAX_BYTES,
+        )
+        self._cache = None
+        if settings.PREDICTION_CACHE_MAX_BYTES > 0 or settings.PREDICTION_CACHE_DIR:
+            self._cache = PredictionCache(
+                max_bytes=settings.PREDICTION_CACHE_MAX_BYTES,
+                ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+                disk_dir=settings.PREDICTION_CACHE_DIR,
+                max_disk_bytes=settings.PREDICTION_CACHE_DISK_MAX_BYTES,
+            )
+        batch_callable = getattr(module, settings.MODEL_BATCH_CALLABLE, None)
+        self._batch_callable = batch_callable if callable(batch_callable) else None
+        process_backend = settings.INFERENCE_BACKEND == "process" and self._batch_callable is not None
+        self._configure_backend(process_backend)
+        if process_backend and not settings.INFERENCE_WARMUP:
+            try:
+                self._shared_input_size = int(self._pool.executor.submit(worker_input_size).result())
+                if self._fingerprint_callable is not None:
+                    self._model_fingerprint = str(self._pool.executor.submit(self._fingerprint_callable).result())
+            except Exception:
+                self._fall_back_to_threads()
+        # Requests are refused until warm_up() has run, so nobody pays for the checkpoint load.
+        self._state = "warming" if settings.INFERENCE_WARMUP else "loaded"
 
-    async def predict(self, image_bytes: bytes) -> Prediction:
+    def _configure_backend(self, process_backend: bool) -> None:
+        # Only called before traffic is admitted, so the old pool has no callers and the
+        # old batcher never started its worker.
         settings = get_settings()
-        if not self._predict_callable:
-            raise RuntimeError("Model not loaded")
+        if self._pool is not None:
+            self._pool.shutdown()
+        executor = None
+        self._shared_input_size = None
+        self._process_backend = process_backend
+        thread_profile = resolve_thread_profile(
+            settings.INFERENCE_INTRA_OP_THREADS,
+            settings.INFERENCE_INTER_OP_THREADS,
+            settings.INFERENCE_WORKERS,
+        )
+        if self._process_backend:
+            # Workers load the checkpoint once in their initializer.
+            executor = create_process_executor(
+                settings.INFERENCE_WORKERS,
+                settings.MODEL_MODULE,
+                settings.MODEL_BATCH_CALLABLE,
+                thread_profile,
+            )
+            # Each worker applied the thread profile in its initializer.
+            self._runtime_profile = dict(thread_profile)
+        else:
+            self._runtime_profile = apply_thread_profile(thread_profile)
+        self._runtime_profile.update(backend=self.backend, source=settings.INFERENCE_PROFILE_PATH)
 
-        loop = asyncio.get_running_loop()
-        result = await asyncio.wait_for(
-            loop.run_in_executor(None, self._predict_callable, image_bytes),
-            timeout=settings.INFERENCE_TIMEOUT_SECONDS,
+        self._pool = InferencePool(
+            max_workers=settings.INFERENCE_WORKERS,
+            max_queue=settings.INFERENCE_MAX_QUEUE,
+            executor=executor,
         )
-        risk_score = max(0.0, min(1.0, float(result["risk_score"])))
-        top_label = str(result.get("top_label", "unknown"))
-        explainability = result.get("explainability")
-        if explainability is not None and not isinstance(explainability, dict):
-            explainability = {"raw": explainability}
-        confidence_raw = result.get("model_confidence", result.get("confidence"))
+        self._run_batch = None
+        if self._batch_callable is not None:
+            self._run_batch = predict_shared if executor is not None else partial(_run_batch, self._batch_callable)
+        self._batcher = None
+        if self._run_batch is not None and settings.INFERENCE_BATCH_MAX_SIZE > 1:
+            self._batcher = MicroBatcher(
+                run_batch=self._run_batch,
+                max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+                max_wait_seconds=settings.INFERENCE_BATCH_MAX_WAIT_MS / 1000.0,
+                pool=self._pool,
+            )
+
+    def _fall_back_to_threads(self) -> None:
+        self._configure_backend(False)
+        self._runtime_profile["fallback_from"] = "process"
+
+    async def _start_workers(self, report: dict[str, Any]) -> None:
+        # Spawning worker processes can fail transiently (memory pressure, a slow import), and a
+        # broken process pool cannot be reused: retry on a fresh pool with backoff, then serve
+        # from the thread backend rather than staying unavailable until a restart.
+        settings = get_settings()
+        attempts = 1 + max(0, settings.INFERENCE_WARMUP_RETRIES)
+        for attempt in range(1, attempts + 1):
+            try:
+                if attempt > 1:
+                    await asyncio.sleep(min(30.0, 2.0 ** (attempt - 2)))
+                    self._configure_backend(True)
+                # One call per worker, so every process has finished its initializer.
+                sizes = await asyncio.wait_for(
+                    asyncio.gather(
+                        *(self._pool.run(worker_input_size) for _ in range(max(1, settings.INFERENCE_WORKERS)))
+                    ),
+                    timeout=settings.INFERENCE_WARMUP_TIMEOUT_SECONDS,
+                )
+                self._shared_input_size = int(sizes[0])
+                return
+            except Exception as exc:
+                report.setdefault("worker_errors", []).append(str(exc) or exc.__class__.__name__)
+        self._fall_back_to_threads()
+        report["backend_fallback"] = "thread"
+        if self._load_callable is not None:
+            report["checkpoint_loaded"] = bool(await self._pool.run(self._load_callable))
+
+    async def warm_up(self) -> None:
+        settings = get_settings()
+        started = time.perf_counter()
+        report: dict[str, Any] = {"batches": {}}
         try:
-            model_confidence = float(confidence_raw) if confidence_raw is not None else None
-        except (TypeError, ValueError):
-            model_confidence = None
-        if model_confidence is not None:
-            model_confidence = max(0.0, min(1.0, model_confidence))
-        raw_class_probabilities = result.get("class_probabilities")
-        class_probabilities: dict[str, float] | None = None
-        if isinstance(raw_class_probabilities, dict):
-            parsed_probabilities: dict[str, float] = {}
-            for label, value in raw_class_probabilities.items():
-                try:
-                    parsed_probabilities[str(label)] = max(0.0, min(1.0, float(value)))
-                except (TypeError, ValueError):
-                    continue
-            if parsed_probabilities:
-                class_probabilities = parsed_probabilities
-        return Prediction(
-            risk_score=risk_score,
-            top_label=top_label,
-            explainability=explainability,
-            model_confidence=model_confidence,
-            class_probabilities=class_probabilities,
-        )
+            if self._process_backend:
+                await self._start_workers(report)
+            elif self._load_callable is not None:
+                report["checkpoint_loaded"] = bool(await self._pool.run(self._load_callable))
+            if self._fingerprint_callable is not None:
+                # The fingerprint names the runtime the workers resolved, so ask them; hashing the
+                # checkpoint and artifact is part of every cache key, so do it before traffic arrives.
+                self._model_fingerprint = str(await self._pool.run(self._fingerprint_callable))
+            report["load_seconds"] = round(time.perf_counter() - started, 4)
+
+            image_bytes, decoded = await asyncio.to_thread(_warmup_image)
+            max_batch_size = settings.INFERENCE_BATCH_MAX_SIZE if self._run_batch is not None else 1
+            for batch_size in _warmup_batch_sizes(max_batch_size):
+                batch_started = time.perf_counter()
+                results = await asyncio.wait_for(
+                    self._warm_batch(image_bytes, decoded, batch_size),
+                    timeout=settings.INFERENCE_WARMUP_TIMEOUT_SECONDS,
+                )
+                report["batches"][str(batch_size)] = round(time.perf_counter() - batch_started, 4)
+                engine = results[0].get("engine") if results and isinstance(results[0], dict) else None
+                if engine:
+                    self._engine = report["engine"] = str(engine)
+        except Exception as exc:
+            # Requests still run after a failed warm-up; they just pay the remaining cost.
+            report["error"] = str(exc) or exc.__class__.__name__
+        report["total_seconds"] = round(time.perf_counter() - started, 4)
+        self._warmup_report = report
+        if self._process_backend and self._shared_input_size is None:
+            self._state = "failed"
+            return
+        self._state = "loaded"
+
+    async def _warm_batch(self, image_bytes: bytes, decoded: DecodedImage, batch_size: int) -> list[dict[str, Any]]:
+        # Dummy passes go straight to the pool: they must not be cached or counted as traffic.
+        if self._run_batch is None:
+            return [await self._pool.run(self._predict_callable, image_bytes)]
+        if not self._process_backend:
+            return await self._pool.run(self._run_batch, [(image_bytes, decoded)] * batch_size)
+        handles = [
+            await asyncio.to_thread(SharedImageHandle.create, image_bytes, decoded, self._shared_input_size)
+            for _ in range(batch_size)
+        ]
+        try:
+            return await self._pool.run(self._run_batch, handles)
+        finally:
+            for handle in handles:
+                handle.release()
+
+    async def predict(self, image_bytes: bytes, decoded: DecodedImage | None = None) -> Prediction:
+        settings = get_settings()
+        if not self._predict_callable or self._pool is None:
+            raise RuntimeError("Model not loaded")
+
+        cache_key: str | None = None
+        if self._cache is not None:
+            # Checked before admission so repeat submissions never take a pool slot.
+            with observe_stage("prediction_cache"):
+                cache_key, cached = await asyncio.to_thread(self._cache_lookup, image_bytes, decoded)
+            if cached is not None:
+                return _parse_prediction(cached)
+
+        started = time.perf_counter()
+        with self._pool.admit(), observe_stage("model_forward"):
+            if self._process_backend:
+                result = await self._predict_shared(image_bytes, decoded, settings.INFERENCE_TIMEOUT_SECONDS)
+            else:
+                if self._batcher is not None:
+                    pending = self._batcher.submit((image_bytes, decoded))
+                elif decoded is not None and self._accepts_decoded:
+                    pending = self._pool.run(partial(self._predict_callable, image_bytes, decoded=decoded))
+                else:
+                    pending = self._pool.run(self._predict_callable, image_bytes)
+                result = await asyncio.wait_for(pending, timeout=settings.INFERENCE_TIMEOUT_SECONDS)
+        self._record_engine(result, time.perf_counter() - started)
+        if self._blob_store is not None:
+            result = await asyncio.to_thread(_externalize_heatmap, result, self._blob_store)
+        prediction = _parse_prediction(result)
+        # A fallback answer must not outlive the outage that caused it: once the checkpoint
+        # is back, the same image has to be scored by it rather than replayed from the cache.
+        if cache_key is not None and prediction.engine not in FALLBACK_ENGINES:
+            await asyncio.to_thread(self._cache.put, cache_key, result)
+        return prediction
+
+    def _record_engine(self, result: dict[str, Any], seconds: float) -> None:
+        engine = result.get("engine") if isinstance(result, dict) else None
+        if not engine:
+            return
+        self._engine = str(engine)
+        self._engine_stats.setdefault(self._engine, EngineStats()).record(seconds)
+
+    def _cache_lookup(self, image_bytes: bytes, decoded: DecodedImage | None) -> tuple[str, dict[str, Any] | None]:
+        key = self._cache_key(_digest(image_bytes, decoded))
+        return key, self._cache.get(key)
+
+    def _cache_key(self, digest: str, artifact: str = "prediction") -> str:
+        if self._model_fingerprint is None:
+            self._model_fingerprint = self._fingerprint_callable() if self._fingerprint_callable else ""
+        return PredictionCache.build_key(digest, get_settings().MODEL_VERSION, f"{self._model_fingerprint}:{artifact}")
+
+    async def request_heatmap(self, image_bytes: bytes, decoded: DecodedImage | None = None) -> str | None:
+        # Schedules Grad-CAM in the background and returns the image digest it will be
+        # cached under, or None when heatmaps are unavailable or too many are queued.
+        if self._explain_callable is None or self._pool is None or self._heatmap_cache is None:
+            return None
+        digest = _digest(image_bytes, decoded)
+        if digest in self._heatmap_tasks:
+            return digest
+        cached = await asyncio.to_thread(self._heatmap_lookup, digest)
+        if cached is not None:
+            return digest
+        if len(self._heatmap_tasks) >= get_settings().INFERENCE_MAX_QUEUE:
+            return None
+
+        task = asyncio.get_running_loop().create_task(self._compute_heatmap(digest, image_bytes, decoded))
+        self._heatmap_tasks[digest] = task
+        task.add_done_callback(lambda _: self._heatmap_tasks.pop(digest, None))
+        return digest
+
+    async def heatmap(self, digest: str) -> tuple[str, dict[str, Any] | None]:
+        if digest in self._heatmap_tasks:
+            return "pending", None
+        if self._heatmap_cache is None:
+            return "missing", None
+        cached = await asyncio.to_thread(self._heatmap_lookup, digest)
+        return ("ready", cached) if cached is not None else ("missing", None)
+
+    async def wait_for_heatmap(self, digest: str, timeout: float) -> dict[str, Any] | None:
+        # Waits for a scheduled heatmap to settle without cancelling it if the wait gives up.
+        task = self._heatmap_tasks.get(digest)
+        if task is not None:
+            await asyncio.wait({task}, timeout=timeout)
+        _, artifact = await self.heatmap(digest)
+        return artifact
+
+    def _heatmap_lookup(self, digest: str) -> dict[str, Any] | None:
+        return self._heatmap_cache.get(self._cache_key(digest, "heatmap"))
+
+    async def _compute_heatmap(self, digest: str, image_bytes: bytes, decoded: DecodedImage | None) -> None:
+        settings = get_settings()
+        try:
+            # One heatmap at a time, so background explanations never crowd out predictions.
+            async with self._heatmap_slot:
+                with observe_stage("heatmap"):
+                    if decoded is not None and self._explain_accepts_decoded and not self._process_backend:
+                        pending = self._pool.run(partial(self._explain_callable, image_bytes, decoded=decoded))
+                    else:
+                        pending = self._pool.run(self._explain_callable, image_bytes)
+                    heatmap = await asyncio.wait_for(pending, timeout=settings.INFERENCE_TIMEOUT_SECONDS)
+            if not heatmap:
+                return
+            result = {"explainability": {"heatmap": heatmap}}
+            if self._blob_store is not None:
+                result = await asyncio.to_thread(_externalize_heatmap, result, self._blob_store)
+            key = await asyncio.to_thread(self._cache_key, digest, "heatmap")
+            await asyncio.to_thread(self._heatmap_cache.put, key, result["explainability"])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Failed heatmaps are simply not cached; a later request schedules them again.
+            return
+
+    async def _predict_shared(
+        self,
+        image_bytes: bytes,
+        decoded: DecodedImage | None,
+        timeout: float,
+    ) -> dict[str, Any]:
+        if decoded is None:
+            decoded = try_decode_image(image_bytes)
+        handle = await asyncio.to_thread(SharedImageHandle.create, image_bytes, decoded, self._shared_input_size)
+        try:
+            if self._batcher is not None:
+                result = await asyncio.wait_for(self._batcher.submit(handle), timeout=timeout)
+            else:
+                results = await asyncio.wait_for(self._pool.run(predict_shared, [handle]), timeout=timeout)
+                result = results[0]
+        finally:
+            handle.release()
+        if result is None:
+            raise RuntimeError("Inference worker could not read the shared image.")
+        return result
+
+    async def close(self) -> None:
+        for task in list(self._heatmap_tasks.values()):
+            task.cancel()
+        if self._batcher is not None:
+            await self._batcher.close()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+def _digest(image_bytes: bytes, decoded: DecodedImage | None) -> str:
+    return decoded.digest if decoded is not None else hashlib.sha256(image_bytes).hexdigest()
+
+
+def _warmup_image() -> tuple[bytes, DecodedImage]:
+    image = Image.linear_gradient("L").resize((256, 256)).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    image_bytes = buffer.getvalue()
+    return image_bytes, DecodedImage.from_bytes(image_bytes)
+
+
+def _warmup_batch_sizes(max_batch_size: int) -> list[int]:
+    sizes = [1]
+    while sizes[-1] * 2 < max_batch_size:
+        sizes.append(sizes[-1] * 2)
+    if max_batch_size > 1:
+        sizes.append(max_batch_size)
+    return sizes
+
+
+def _run_batch(
+    batch_callable: Callable[..., list[dict[str, Any]]],
+    items: list[tuple[bytes, DecodedImage | None]],
+) -> list[dict[str, Any]]:
+    return batch_callable([image_bytes for image_bytes, _ in items], decoded=[decoded for _, decoded in items])
+
+
+def _externalize_heatmap(result: dict[str, Any], blob_store: BlobStore) -> dict[str, Any]:
+    # Swaps the inline base64 PNG for a blob reference before the result is cached,
+    # returned or persisted.
+    explainability = result.get("explainability")
+    if not isinstance(explainability, dict) or not isinstance(explainability.get("heatmap"), str):
+        return result
+    try:
+        content = base64.b64decode(explainability["heatmap"], validate=True)
+    except (binascii.Error, ValueError):
+        return result
+    explainability = {key: value for key, value in explainability.items() if key != "heatmap"}
+    explainability["heatmap_url"] = blob_url(blob_store.put(content, "image/png"))
+    return {**result, "explainability": explainability}
+
+
+def _parse_prediction(result: dict[str, Any]) -> Prediction:
+    risk_score = max(0.0, min(1.0, float(result["risk_score"])))
+    top_label = str(result.get("top_label", "unknown"))
+    explainability = result.get("explainability")
+    if explainability is not None and not isinstance(explainability, dict):
+        explainability = {"raw": explainability}
+    confidence_raw = result.get("model_confidence", result.get("confidence"))
+    try:
+        model_confidence = float(confidence_raw) if confidence_raw is not None else None
+    except (TypeError, ValueError):
+        model_confidence = None
+    if model_confidence is not None:
+        model_confidence = max(0.0, min(1.0, model_confidence))
+    raw_class_probabilities = result.get("class_probabilities")
+    class_probabilities: dict[str, float] | None = None
+    if isinstance(raw_class_probabilities, dict):
+        parsed_probabilities: dict[str, float] = {}
+        for label, value in raw_class_probabilities.items():
+            try:
+                parsed_probabilities[str(label)] = max(0.0, min(1.0, float(value)))
+            except (TypeError, ValueError):
+                continue
+        if parsed_probabilities:
+            class_probabilities = parsed_probabilities
+    return Prediction(
+        risk_score=risk_score,
+        top_label=top_label,
+        explainability=explainability,
+        model_confidence=model_confidence,
+        class_probabilities=class_probabilities,
+        engine=str(result["engine"]) if result.get("engine") else None,
+    )
+
+
+def _accepts_keyword(func: Callable[..., Any], name: str) -> bool:
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(
+        parameter.name == name or parameter.kind is inspect.Parameter.VAR_KEYWORD
+        for parameter in parameters
+    )
 
 
 def map_risk_level(score: float) -> str:
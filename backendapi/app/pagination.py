@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any
+
+from .errors import AppError
+
+
+def encode_cursor(row: dict[str, Any]) -> str:
+    payload = json.dumps([str(row["created_at"]), str(row["id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(value: str) -> tuple[str, str]:
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        created_at, scan_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        # Round-trip both parts so nothing but a timestamp and a UUID reaches the query.
+        return datetime.fromisoformat(created_at).isoformat(), str(uuid.UUID(scan_id))
+    except (binascii.Error, TypeError, ValueError, UnicodeError):
+        raise AppError("INVALID_CURSOR", "Pagination cursor is invalid.", 422)
+
+
+def page_cursors(items: list[dict[str, Any]], limit: int, paging_forward: bool) -> tuple[str | None, str | None]:
+    # next_cursor pages towards older scans (`before`), prev_cursor towards newer ones (`after`).
+    if not items:
+        return None, None
+    next_cursor = encode_cursor(items[-1]) if len(items) >= limit or paging_forward else None
+    return next_cursor, encode_cursor(items[0])
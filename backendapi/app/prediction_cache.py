@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+
+# A full disk tier is swept down to this share of its budget, so it is not rescanned on every write.
+_DISK_LOW_WATER = 0.9
+
+
+class PredictionCache:
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        disk_dir: str | None = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self._max_bytes = max(0, max_bytes)
+        self._ttl_seconds = ttl_seconds
+        self._disk_dir = Path(disk_dir) if disk_dir else None
+        self._max_disk_bytes = max(0, max_disk_bytes)
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        self._disk_evictions = 0
+        self._entries: OrderedDict[str, tuple[float, int, dict[str, Any]]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        if self._disk_dir is not None:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+            # Files left by an earlier run count against the budget; expired ones go now.
+            with self._disk_lock:
+                self._sweep_disk(time.time(), self._max_disk_bytes)
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0 or self._disk_dir is not None
+
+    @staticmethod
+    def build_key(image_digest: str, model_version: str, model_fingerprint: str) -> str:
+        return f"{image_digest}:{model_version}:{model_fingerprint}"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, size, value = entry
+                if now - stored_at <= self._ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._bytes -= size
+                self._expirations += 1
+
+        value = self._read_disk(key, now)
+        with self._lock:
+            if value is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+        self._remember(key, value, now)
+        return value
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        now = time.time()
+        self._remember(key, value, now)
+        self._write_disk(key, value)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "disk_enabled": self._disk_dir is not None,
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self._max_disk_bytes,
+                "disk_evictions": self._disk_evictions,
+            }
+
+    def _remember(self, key: str, value: dict[str, Any], stored_at: float) -> None:
+        size = len(json.dumps(value, separators=(",", ":"), default=str))
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (stored_at, size, value)
+            self._bytes += size
+            while self._bytes > self._max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def _disk_path(self, key: str) -> Path | None:
+        if self._disk_dir is None:
+            return None
+        return self._disk_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def _read_disk(self, key: str, now: float) -> dict[str, Any] | None:
+        path = self._disk_path(key)
+        if path is None:
+            return None
+        try:
+            if now - path.stat().st_mtime > self._ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(payload, dict) or payload.get("key") != key:
+            return None
+        value = payload.get("value")
+        return value if isinstance(value, dict) else None
+
+    def _write_disk(self, key: str, value: dict[str, Any]) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        content = json.dumps({"key": key, "value": value}, default=str).encode("utf-8")
+        if len(content) > self._max_disk_bytes:
+            return
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            temp_path.write_bytes(content)
+            os.replace(temp_path, path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            return
+        with self._disk_lock:
+            self._disk_bytes += len(content)
+            if self._disk_bytes > self._max_disk_bytes:
+                self._sweep_disk(time.time(), int(self._max_disk_bytes * _DISK_LOW_WATER))
+
+    def _sweep_disk(self, now: float, target_bytes: int) -> None:
+        # Rescans rather than trusting the running total: other workers may share the directory.
+        # Expired files are dropped first, then the least recently written until under target.
+        files: list[tuple[float, int, Path]] = []
+        expired = 0
+        for path in self._disk_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self._ttl_seconds:
+                path.unlink(missing_ok=True)
+                expired += 1
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        with self._lock:
+            self._expirations += expired
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= target_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self._disk_evictions += 1
+        self._disk_bytes = total
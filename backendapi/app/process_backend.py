@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable
+
+from PIL import Image
+
+from .imaging import DecodedImage
+from .runtime_profile import apply_thread_profile
+
+_BATCH_CALLABLE: Callable[..., list[dict[str, Any]]] | None = None
+_INPUT_SIZE: int = 224
+
+
+@dataclass
+class SharedImageHandle:
+    # Pickled to the worker instead of the upload: pixels travel through shared memory.
+    shm_name: str | None
+    width: int
+    height: int
+    digest: str
+    image_format: str
+    pattern_stats: dict[str, float]
+    image_bytes: bytes = b""
+
+    @classmethod
+    def create(cls, image_bytes: bytes, decoded: DecodedImage | None, input_size: int) -> "SharedImageHandle":
+        if decoded is None:
+            # Undecodable uploads carry their raw bytes so the worker can still run its fallback.
+            return cls(None, 0, 0, "", "unknown", {}, image_bytes=image_bytes)
+
+        pixels = decoded.resized(input_size).tobytes()
+        block = shared_memory.SharedMemory(create=True, size=len(pixels))
+        block.buf[: len(pixels)] = pixels
+        block.close()
+        return cls(
+            shm_name=block.name,
+            width=input_size,
+            height=input_size,
+            digest=decoded.digest,
+            image_format=decoded.format,
+            pattern_stats=decoded.pattern_stats,
+        )
+
+    def open(self) -> DecodedImage | None:
+        if self.shm_name is None:
+            return None
+        block = _attach(self.shm_name)
+        try:
+            size = self.width * self.height * 3
+            image = Image.frombytes("RGB", (self.width, self.height), bytes(block.buf[:size]))
+        finally:
+            block.close()
+        return DecodedImage.from_model_input(
+            image,
+            digest=self.digest,
+            image_format=self.image_format,
+            pattern_stats=self.pattern_stats,
+        )
+
+    def release(self) -> None:
+        if self.shm_name is None:
+            return
+        try:
+            block = shared_memory.SharedMemory(name=self.shm_name)
+        except FileNotFoundError:
+            return
+        block.close()
+        block.unlink()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers attachments with the resource tracker, which would
+        # unlink the block when the worker exits; the parent owns its lifetime instead.
+        block = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(block._name, "shared_memory")
+        return block
+
+
+def _initialize_worker(model_module: str, batch_callable: str, thread_profile: dict[str, int] | None = None) -> None:
+    global _BATCH_CALLABLE, _INPUT_SIZE
+    if thread_profile is not None:
+        apply_thread_profile(thread_profile)
+    module = importlib.import_module(model_module)
+    load_model = getattr(module, "load_model", None)
+    if callable(load_model):
+        load_model()
+    input_size = getattr(module, "model_input_size", None)
+    if callable(input_size):
+        _INPUT_SIZE = int(input_size())
+    _BATCH_CALLABLE = getattr(module, batch_callable)
+
+
+def worker_input_size() -> int:
+    return _INPUT_SIZE
+
+
+def predict_shared(handles: list[SharedImageHandle]) -> list[dict[str, Any] | None]:
+    if _BATCH_CALLABLE is None:
+        raise RuntimeError("Inference worker was not initialized.")
+
+    images: list[bytes] = []
+    decoded: list[DecodedImage | None] = []
+    indices: list[int] = []
+    for index, handle in enumerate(handles):
+        try:
+            item = handle.open()
+        except FileNotFoundError:
+            # The request gave up and released its block before this worker got to it.
+            continue
+        images.append(handle.image_bytes)
+        decoded.append(item)
+        indices.append(index)
+
+    results: list[dict[str, Any] | None] = [None] * len(handles)
+    if indices:
+        for index, result in zip(indices, _BATCH_CALLABLE(images, decoded=decoded)):
+            results[index] = result
+    return results
+
+
+def create_process_executor(
+    workers: int,
+    model_module: str,
+    batch_callable: str,
+    thread_profile: dict[str, int] | None = None,
+) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_initialize_worker,
+        initargs=(model_module, batch_callable, thread_profile),
+    )
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS and Windows
+        return os.cpu_count() or 1
+
+
+def resolve_thread_profile(intra_op_threads: int, inter_op_threads: int, slots: int) -> dict[str, int]:
+    # Every slot runs its own intra-op thread team, so by default the cores are split between
+    # them instead of each forward pass assuming it has the whole machine.
+    slots = max(1, slots)
+    return {
+        "slots": slots,
+        "intra_op_threads": intra_op_threads if intra_op_threads > 0 else max(1, available_cpus() // slots),
+        "inter_op_threads": max(0, inter_op_threads),
+    }
+
+
+def apply_thread_profile(profile: dict[str, int]) -> dict[str, Any]:
+    # Process-wide; call before the first forward pass (torch only accepts the inter-op
+    # setting once, before any inter-op work has started).
+    applied: dict[str, Any] = {**profile, "cpus": available_cpus(), "applied": False}
+    try:
+        # Imported lazily so the parent of a process-backend pool never loads torch.
+        import torch
+    except Exception:
+        return applied
+    torch.set_num_threads(profile["intra_op_threads"])
+    if profile["inter_op_threads"] > 0:
+        try:
+            torch.set_num_interop_threads(profile["inter_op_threads"])
+        except RuntimeError:
+            pass
+    applied.update(
+        applied=True,
+        intra_op_threads=torch.get_num_threads(),
+        inter_op_threads=torch.get_num_interop_threads(),
+    )
+    return applied
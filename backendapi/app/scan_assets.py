@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import re
+from typing import Any
+
+_ASSET_PATTERN = re.compile(r"^(heatmap|preview)(?:-(\d{1,2}))?$")
+_DATA_URL_PATTERN = re.compile(r"^data:(?P<media_type>[\w.+-]+/[\w.+-]+);base64,(?P<data>.*)$", re.DOTALL)
+
+
+def asset_selector(asset: str) -> str | None:
+    # PostgREST JSON paths, so an asset request only pulls its own string out of metadata.
+    match = _ASSET_PATTERN.match(asset)
+    if match is None:
+        return None
+    kind, index = match.groups()
+    if kind == "heatmap":
+        if index is not None:
+            return None
+        return "value:metadata->model_explainability->>heatmap,first:metadata->model_explainability->>heatmap_url"
+    if index is None:
+        return "value:metadata->>image_preview,first:metadata->image_previews->>0"
+    return f"value:metadata->image_previews->>{int(index)}"
+
+
+def asset_urls(scan_id: str, image_count: Any) -> dict[str, Any]:
+    try:
+        count = max(1, int(image_count))
+    except (TypeError, ValueError):
+        count = 1
+    base = f"/scans/{scan_id}/assets"
+    return {
+        "preview_url": f"{base}/preview",
+        "preview_urls": [f"{base}/preview-{index}" for index in range(count)] if count > 1 else [f"{base}/preview"],
+        "heatmap_url": f"{base}/heatmap",
+    }
+
+
+def decode_asset(value: str) -> tuple[bytes, str] | None:
+    match = _DATA_URL_PATTERN.match(value)
+    media_type = "image/png"
+    data = value
+    if match is not None:
+        media_type = match.group("media_type")
+        data = match.group("data")
+    try:
+        return base64.b64decode(data, validate=True), media_type
+    except (binascii.Error, ValueError):
+        return None
+
+
+def asset_etag(content: bytes) -> str:
+    return f'"{hashlib.sha256(content).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
@@ -24,6 +24,7 @@ class PredictResponse(BaseModel):
     top_label: str
     disclaimer: str
     created_at: datetime
+    heatmap_url: str | None = None
 
 
 class EnhancedDetails(BaseModel):
@@ -68,11 +69,15 @@ class PredictEnhancedResponse(BaseModel):
 
 
 class HealthResponse(BaseModel):
-    status: Literal["ok", "degraded"]
+    status: Literal["ok", "warming", "degraded"]
     api: Literal["up"]
-    model: Literal["loaded", "failed"]
+    model: Literal["warming", "loaded", "fallback", "failed"]
     db: Literal["connected", "not_configured", "failed"]
     version: str
+    engine: str | None = None
+    engines: dict[str, Any] = Field(default_factory=dict)
+    warmup: dict[str, Any] | None = None
+    runtime_profile: dict[str, Any] | None = None
 
 
 class ScanRecord(BaseModel):
@@ -87,8 +92,39 @@ class ScanRecord(BaseModel):
     metadata: dict[str, Any] | None = None
 
 
+class ScanSummary(BaseModel):
+    id: uuid.UUID
+    created_at: datetime
+    patient_ref: str | None = None
+    risk_level: str
+    risk_score: float
+    top_label: str
+    model_version: str
+    status: str
+    confidence: float | str | None = None
+    image_count: int | None = None
+    explanation: str | None = None
+    preview_url: str
+    preview_urls: list[str] = Field(default_factory=list)
+    heatmap_url: str
+
+
 class ScanHistoryResponse(BaseModel):
     items: list[ScanRecord]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class ScanSummaryResponse(BaseModel):
+    items: list[ScanSummary]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class ScanProjectionResponse(BaseModel):
+    items: list[dict[str, Any]]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
 
 
 class ConditionScore(BaseModel):
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any
 from uuid import uuid4
 
+from .config import Settings
+
+_SPILL_SUFFIX = ".session-image"
+
 
 @dataclass
 class ScreeningSession:
@@ -21,9 +32,62 @@ class ScreeningSession:
     scan_id: str | None = None
 
 
-class SessionStore:
-    def __init__(self) -> None:
-        self._sessions: dict[str, ScreeningSession] = {}
+class SessionStore(ABC):
+    @abstractmethod
+    def create_session(self, description: str, images: list[dict[str, Any]]) -> ScreeningSession:
+        ...
+
+    @abstractmethod
+    def get_session(self, session_id: str) -> ScreeningSession | None:
+        ...
+
+    @abstractmethod
+    def save_session(self, session: ScreeningSession) -> None:
+        ...
+
+    @abstractmethod
+    def load_image_bytes(self, image: dict[str, Any]) -> bytes:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict[str, Any]:
+        ...
+
+
+@dataclass
+class _StoredSession:
+    session: ScreeningSession
+    size_bytes: int
+    last_accessed: float
+    spill_paths: list[Path] = field(default_factory=list)
+    spill_bytes: int = 0
+
+
+class InMemorySessionStore(SessionStore):
+    def __init__(
+        self,
+        ttl_seconds: float = 3600.0,
+        max_bytes: int = 256 * 1024 * 1024,
+        spill_dir: str | None = None,
+        max_spill_bytes: int = 1024 * 1024 * 1024,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_bytes = max(0, max_bytes)
+        self._spill_dir = Path(spill_dir) if spill_dir else None
+        self._max_spill_bytes = max(0, max_spill_bytes)
+        self._sessions: OrderedDict[str, _StoredSession] = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._created = 0
+        self._evicted = 0
+        self._expired = 0
+        self._spilled_bytes = 0
+        if self._spill_dir is not None:
+            self._spill_dir.mkdir(parents=True, exist_ok=True)
+            # Spilled images belong to sessions of a previous process, which are gone.
+            for stale in self._spill_dir.glob(f"*{_SPILL_SUFFIX}"):
+                stale.unlink(missing_ok=True)
 
     def create_session(self, description: str, images: list[dict[str, Any]]) -> ScreeningSession:
         session = ScreeningSession(
@@ -32,8 +96,283 @@ class SessionStore:
             description=description,
             images=images,
         )
-        self._sessions[session.session_id] = session
+        spill_paths, spill_bytes = self._spill_images(session) if self._spill_dir is not None else ([], 0)
+        stored = _StoredSession(
+            session=session,
+            size_bytes=_session_size(session),
+            last_accessed=time.monotonic(),
+            spill_paths=spill_paths,
+            spill_bytes=spill_bytes,
+        )
+
+        evicted: list[_StoredSession] = []
+        with self._lock:
+            self._sessions[session.session_id] = stored
+            self._bytes += stored.size_bytes
+            self._disk_bytes += stored.spill_bytes
+            self._created += 1
+            evicted.extend(self._expire_locked(stored.last_accessed))
+            # Spilled images have their own budget, so disk use is bounded by more than the TTL.
+            # The session just created is never evicted for its own sake.
+            while (
+                self._bytes > self._max_bytes or self._disk_bytes > self._max_spill_bytes
+            ) and len(self._sessions) > 1:
+                _, oldest = self._sessions.popitem(last=False)
+                self._forget_locked(oldest)
+                self._evicted += 1
+                evicted.append(oldest)
+        _remove_spilled(evicted)
         return session
 
     def get_session(self, session_id: str) -> ScreeningSession | None:
-        return self._sessions.get(session_id)
+        now = time.monotonic()
+        with self._lock:
+            expired = self._expire_locked(now)
+            stored = self._sessions.get(session_id)
+            if stored is not None:
+                stored.last_accessed = now
+                self._sessions.move_to_end(session_id)
+        _remove_spilled(expired)
+        return stored.session if stored is not None else None
+
+    def save_session(self, session: ScreeningSession) -> None:
+        # Sessions are handed out by reference, so mutations are already in place.
+        return None
+
+    def load_image_bytes(self, image: dict[str, Any]) -> bytes:
+        image_bytes = image.get("image_bytes")
+        if image_bytes is not None:
+            return image_bytes
+        image_path = image.get("image_path")
+        if image_path is None:
+            raise FileNotFoundError("Session image has no stored payload.")
+        return Path(image_path).read_bytes()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl_seconds,
+                "created": self._created,
+                "evicted": self._evicted,
+                "expired": self._expired,
+                "spilled_bytes": self._spilled_bytes,
+                "spill_enabled": self._spill_dir is not None,
+                "spill_disk_bytes": self._disk_bytes,
+                "max_spill_bytes": self._max_spill_bytes,
+            }
+
+    def _spill_images(self, session: ScreeningSession) -> tuple[list[Path], int]:
+        paths: list[Path] = []
+        total = 0
+        for index, image in enumerate(session.images):
+            image_bytes = image.pop("image_bytes", None)
+            if image_bytes is None:
+                continue
+            path = self._spill_dir / f"{session.session_id}-{index}{_SPILL_SUFFIX}"
+            path.write_bytes(image_bytes)
+            image["image_path"] = str(path)
+            paths.append(path)
+            total += len(image_bytes)
+        with self._lock:
+            self._spilled_bytes += total
+        return paths, total
+
+    def _expire_locked(self, now: float) -> list[_StoredSession]:
+        # Sessions are kept in access order, so expired ones are always at the front.
+        expired: list[_StoredSession] = []
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            if now - oldest.last_accessed <= self._ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self._forget_locked(oldest)
+            self._expired += 1
+            expired.append(oldest)
+        return expired
+
+    def _forget_locked(self, stored: _StoredSession) -> None:
+        self._bytes -= stored.size_bytes
+        self._disk_bytes -= stored.spill_bytes
+
+
+class SqliteSessionStore(SessionStore):
+    # Shared by every worker process on the host; image payloads live in their own table
+    # so reading or saving a session never copies the uploads.
+    def __init__(self, path: str, ttl_seconds: float = 3600.0) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._expired = 0
+        with self._connection() as connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS screening_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    last_accessed REAL NOT NULL,
+                    state TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS screening_sessions_last_accessed
+                    ON screening_sessions (last_accessed);
+                CREATE TABLE IF NOT EXISTS screening_session_images (
+                    session_id TEXT NOT NULL,
+                    image_index INTEGER NOT NULL,
+                    image_bytes BLOB NOT NULL,
+                    PRIMARY KEY (session_id, image_index)
+                );
+                """
+            )
+
+    def create_session(self, description: str, images: list[dict[str, Any]]) -> ScreeningSession:
+        session = ScreeningSession(
+            session_id=str(uuid4()),
+            created_at=datetime.now(timezone.utc),
+            description=description,
+            images=images,
+        )
+        image_rows: list[tuple[str, int, bytes]] = []
+        for index, image in enumerate(session.images):
+            image_bytes = image.pop("image_bytes", None)
+            if image_bytes is not None:
+                image_rows.append((session.session_id, index, image_bytes))
+                image["image_ref"] = [session.session_id, index]
+
+        now = time.time()
+        with self._connection() as connection:
+            self._expire(connection, now)
+            connection.execute(
+                "INSERT INTO screening_sessions (session_id, created_at, last_accessed, state) VALUES (?, ?, ?, ?)",
+                (session.session_id, session.created_at.isoformat(), now, _dump_state(session)),
+            )
+            connection.executemany(
+                "INSERT INTO screening_session_images (session_id, image_index, image_bytes) VALUES (?, ?, ?)",
+                image_rows,
+            )
+        with self._lock:
+            self._created += 1
+        return session
+
+    def get_session(self, session_id: str) -> ScreeningSession | None:
+        now = time.time()
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT created_at, last_accessed, state FROM screening_sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            created_at, last_accessed, state = row
+            if now - last_accessed > self._ttl_seconds:
+                self._expire(connection, now)
+                return None
+            connection.execute(
+                "UPDATE screening_sessions SET last_accessed = ? WHERE session_id = ?",
+                (now, session_id),
+            )
+        return _load_state(session_id, created_at, state)
+
+    def save_session(self, session: ScreeningSession) -> None:
+        with self._connection() as connection:
+            connection.execute(
+                "UPDATE screening_sessions SET state = ?, last_accessed = ? WHERE session_id = ?",
+                (_dump_state(session), time.time(), session.session_id),
+            )
+
+    def load_image_bytes(self, image: dict[str, Any]) -> bytes:
+        image_ref = image.get("image_ref")
+        if image_ref is None:
+            raise FileNotFoundError("Session image has no stored payload.")
+        session_id, image_index = image_ref
+        row = self._connection().execute(
+            "SELECT image_bytes FROM screening_session_images WHERE session_id = ? AND image_index = ?",
+            (session_id, image_index),
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError("Session image payload has expired.")
+        return bytes(row[0])
+
+    def stats(self) -> dict[str, Any]:
+        row = self._connection().execute(
+            """
+            SELECT
+                (SELECT COUNT(*) FROM screening_sessions),
+                (SELECT COALESCE(SUM(LENGTH(image_bytes)), 0) FROM screening_session_images)
+            """
+        ).fetchone()
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "sessions": row[0],
+                "image_bytes": row[1],
+                "ttl_seconds": self._ttl_seconds,
+                "created": self._created,
+                "expired": self._expired,
+            }
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=30.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _expire(self, connection: sqlite3.Connection, now: float) -> None:
+        cutoff = now - self._ttl_seconds
+        connection.execute(
+            "DELETE FROM screening_session_images WHERE session_id IN "
+            "(SELECT session_id FROM screening_sessions WHERE last_accessed < ?)",
+            (cutoff,),
+        )
+        expired = connection.execute("DELETE FROM screening_sessions WHERE last_accessed < ?", (cutoff,)).rowcount
+        if expired > 0:
+            with self._lock:
+                self._expired += expired
+
+
+def create_session_store(settings: Settings) -> SessionStore:
+    if settings.SESSION_BACKEND == "sqlite":
+        return SqliteSessionStore(settings.SESSION_SQLITE_PATH, ttl_seconds=settings.SESSION_TTL_SECONDS)
+    return InMemorySessionStore(
+        ttl_seconds=settings.SESSION_TTL_SECONDS,
+        max_bytes=settings.SESSION_STORE_MAX_BYTES,
+        spill_dir=settings.SESSION_SPILL_DIR,
+        max_spill_bytes=settings.SESSION_SPILL_MAX_BYTES,
+    )
+
+
+def _dump_state(session: ScreeningSession) -> str:
+    state = asdict(session)
+    state.pop("session_id")
+    state.pop("created_at")
+    return json.dumps(state)
+
+
+def _load_state(session_id: str, created_at: str, state: str) -> ScreeningSession:
+    return ScreeningSession(
+        session_id=session_id,
+        created_at=datetime.fromisoformat(created_at),
+        **json.loads(state),
+    )
+
+
+def _session_size(session: ScreeningSession) -> int:
+    size = len(session.description.encode("utf-8"))
+    for image in session.images:
+        size += len(image.get("image_bytes") or b"")
+        size += len(image.get("preview") or "")
+    return size
+
+
+def _remove_spilled(sessions: list[_StoredSession]) -> None:
+    for stored in sessions:
+        for path in stored.spill_paths:
+            path.unlink(missing_ok=True)
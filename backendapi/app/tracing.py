@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+_CURRENT_TRACE: ContextVar["RequestTrace | None"] = ContextVar("request_trace", default=None)
+
+
+@dataclass
+class RequestTrace:
+    request_id: str
+    started: float = field(default_factory=time.perf_counter)
+    # (stage, offset from request start, duration), both in seconds.
+    spans: list[tuple[str, float, float]] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, stage: str, started: float, seconds: float) -> None:
+        # Stages also run in to_thread workers, which share this object through the context.
+        with self._lock:
+            self.spans.append((stage, started - self.started, seconds))
+
+    def server_timing(self, total_seconds: float) -> str:
+        # Repeated stages (one per uploaded image) are summed into a single entry.
+        totals: dict[str, tuple[float, int]] = {}
+        with self._lock:
+            for stage, _, seconds in self.spans:
+                duration, count = totals.get(stage, (0.0, 0))
+                totals[stage] = (duration + seconds, count + 1)
+        entries = [
+            f'{stage};dur={duration * 1000:.1f}' + (f';desc="x{count}"' if count > 1 else "")
+            for stage, (duration, count) in totals.items()
+        ]
+        entries.append(f"total;dur={total_seconds * 1000:.1f}")
+        return ", ".join(entries)
+
+    def log(self, method: str, route: str, status_code: int, total_seconds: float) -> None:
+        with self._lock:
+            spans = [
+                {"stage": stage, "start_ms": round(offset * 1000, 2), "duration_ms": round(seconds * 1000, 2)}
+                for stage, offset, seconds in self.spans
+            ]
+        logger.info(
+            json.dumps(
+                {
+                    "event": "request_trace",
+                    "request_id": self.request_id,
+                    "method": method,
+                    "route": route,
+                    "status": status_code,
+                    "total_ms": round(total_seconds * 1000, 2),
+                    "spans": spans,
+                }
+            )
+        )
+
+
+def configure_trace_logging() -> None:
+    # Trace lines are INFO, which the default WARNING root level drops. Uvicorn only configures
+    # its own loggers, so a handler is attached here unless logging is already set up.
+    logger.setLevel(logging.INFO)
+    if not logger.hasHandlers():
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+
+
+def start_trace(request_id: str) -> tuple[RequestTrace, Token]:
+    trace = RequestTrace(request_id=request_id)
+    return trace, _CURRENT_TRACE.set(trace)
+
+
+def end_trace(token: Token) -> None:
+    _CURRENT_TRACE.reset(token)
+
+
+def record_span(stage: str, started: float, seconds: float) -> None:
+    trace = _CURRENT_TRACE.get()
+    if trace is not None:
+        trace.record(stage, started, seconds)
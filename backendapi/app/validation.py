@@ -2,13 +2,20 @@ from __future__ import annotations
 
 import io
 
-from PIL import Image, ImageFilter, ImageStat
+from fastapi import UploadFile
+from PIL import Image
 
 from .errors import AppError
+from .imaging import DecodedImage
 
 
 JPEG_PREFIX = b"\xff\xd8\xff"
 PNG_PREFIX = b"\x89PNG\r\n\x1a\n"
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# JPEG headers can sit behind large EXIF/ICC segments; past this, the full decode decides.
+MAX_HEADER_PROBE_BYTES = 512 * 1024
+HEADER_FORMATS = {"JPEG", "PNG"}
+HEADER_MODES = {"1", "L", "LA", "P", "PA", "RGB", "RGBA", "CMYK", "YCbCr", "I", "I;16"}
 
 
 def _is_allowed_image(image_bytes: bytes) -> bool:
@@ -26,6 +33,64 @@ def validate_image(image_bytes: bytes, max_bytes: int) -> None:
         raise AppError("UNSUPPORTED_IMAGE", "Only JPG and PNG images are allowed.", 415)
 
 
+def check_image_header(
+    head: bytes,
+    min_width: int,
+    min_height: int,
+    max_dimension: int,
+) -> bool:
+    # Parses only the header (Image.open is lazy), so dimensions and mode are checked
+    # before any pixel data is decoded. False means the header is not complete yet.
+    try:
+        image = Image.open(io.BytesIO(head))
+    except Image.DecompressionBombError:
+        raise AppError("INVALID_IMAGE", "Image quality insufficient for analysis. Please retake photo.", 422)
+    except Exception:
+        return False
+
+    width, height = image.size
+    if image.format not in HEADER_FORMATS or image.mode not in HEADER_MODES:
+        raise AppError("UNSUPPORTED_IMAGE", "Only JPG and PNG images are allowed.", 415)
+    if width < min_width or height < min_height or width > max_dimension or height > max_dimension:
+        raise AppError("INVALID_IMAGE", "Image quality insufficient for analysis. Please retake photo.", 422)
+    return True
+
+
+async def read_image_upload(
+    upload: UploadFile,
+    max_bytes: int,
+    min_width: int,
+    min_height: int,
+    max_dimension: int,
+) -> bytes:
+    # Reads in chunks so an oversized or non-image upload is rejected after its first bytes
+    # instead of after the whole file has been copied into memory.
+    buffer = bytearray()
+    header_checked = False
+    while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise AppError("IMAGE_TOO_LARGE", f"Image exceeds {max_bytes} bytes.", 413)
+        if header_checked or len(buffer) - len(chunk) >= MAX_HEADER_PROBE_BYTES:
+            continue
+        if len(buffer) >= len(PNG_PREFIX) and not _is_allowed_image(bytes(buffer[: len(PNG_PREFIX)])):
+            raise AppError("UNSUPPORTED_IMAGE", "Only JPG and PNG images are allowed.", 415)
+        header_checked = check_image_header(bytes(buffer), min_width, min_height, max_dimension)
+
+    image_bytes = bytes(buffer)
+    validate_image(image_bytes, max_bytes)
+    return image_bytes
+
+
+def decode_image(image_bytes: bytes, max_bytes: int) -> DecodedImage:
+    validate_image(image_bytes, max_bytes)
+    try:
+        # The quality thresholds are only valid on a full-resolution decode.
+        return DecodedImage.from_bytes(image_bytes, full_resolution=True)
+    except Exception:
+        raise AppError("INVALID_IMAGE", "Image quality insufficient for analysis. Please retake photo.", 422)
+
+
 def analyze_image_quality(
     image_bytes: bytes,
     max_bytes: int,
@@ -35,28 +100,22 @@ def analyze_image_quality(
     min_brightness_mean: float,
     max_brightness_mean: float,
     min_edge_intensity: float,
+    decoded: DecodedImage | None = None,
 ) -> dict[str, float | int | str]:
-    validate_image(image_bytes, max_bytes)
-
-    try:
-        img = Image.open(io.BytesIO(image_bytes))
-        image_format = (img.format or "unknown").lower()
-        img.verify()
-        img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    except Exception:
-        raise AppError("INVALID_IMAGE", "Image quality insufficient for analysis. Please retake photo.", 422)
+    if decoded is None:
+        decoded = decode_image(image_bytes, max_bytes)
+    else:
+        validate_image(decoded.image_bytes, max_bytes)
 
-    width, height = img.size
+    width, height = decoded.size
     if width < min_width or height < min_height or width > max_dimension or height > max_dimension:
         raise AppError("INVALID_IMAGE", "Image quality insufficient for analysis. Please retake photo.", 422)
 
-    gray = img.convert("L")
-    brightness_mean = float(ImageStat.Stat(gray).mean[0])
+    brightness_mean = decoded.brightness_mean
     if brightness_mean < min_brightness_mean or brightness_mean > max_brightness_mean:
         raise AppError("INVALID_IMAGE", "Image quality insufficient for analysis. Please retake photo.", 422)
 
-    edges = gray.filter(ImageFilter.FIND_EDGES)
-    edge_intensity = float(ImageStat.Stat(edges).mean[0])
+    edge_intensity = decoded.edge_intensity
     if edge_intensity < min_edge_intensity:
         raise AppError("INVALID_IMAGE", "Image quality insufficient for analysis. Please retake photo.", 422)
 
@@ -65,5 +124,5 @@ def analyze_image_quality(
         "height": height,
         "brightness_mean": round(brightness_mean, 2),
         "edge_intensity": round(edge_intensity, 2),
-        "format": image_format,
+        "format": decoded.format,
     }
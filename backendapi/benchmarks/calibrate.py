@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from app.runtime_profile import available_cpus
+
+from .run import BACKEND_DIR, run_engine_subprocess
+from .run import parse_args as parse_benchmark_args
+
+DEFAULT_OUTPUT = BACKEND_DIR / "inference_profile.json"
+OBJECTIVES = ("throughput", "latency")
+
+
+def powers_of_two(limit: int) -> list[int]:
+    values = [1]
+    while values[-1] * 2 <= limit:
+        values.append(values[-1] * 2)
+    if values[-1] != limit:
+        values.append(limit)
+    return values
+
+
+def parse_counts(value: str | None) -> list[int] | None:
+    if not value:
+        return None
+    return sorted({int(part) for part in value.split(",") if part.strip()})
+
+
+def candidate_profiles(options: argparse.Namespace, cpus: int) -> list[dict[str, int]]:
+    slots = options.slots or [value for value in powers_of_two(cpus) if value <= 4]
+    intra = options.intra_op_threads or powers_of_two(cpus)
+    inter = options.inter_op_threads or ([1, 2] if cpus > 1 else [1])
+    candidates = [
+        {"workers": slot_count, "intra_op_threads": intra_count, "inter_op_threads": inter_count}
+        for slot_count in slots
+        for intra_count in intra
+        for inter_count in inter
+        # More busy threads than cores only adds context switches; skip unless asked for.
+        if options.oversubscribe or slot_count * intra_count <= cpus
+    ]
+    return candidates or [{"workers": 1, "intra_op_threads": 1, "inter_op_threads": 1}]
+
+
+def measure(profile: dict[str, int], options: argparse.Namespace) -> dict[str, Any]:
+    argv = [
+        "--engines", "checkpoint",
+        "--scenarios", options.scenario,
+        "--resolutions", str(options.resolution),
+        "--requests", str(options.requests),
+        "--concurrency", str(options.concurrency),
+        "--warmup", str(options.warmup),
+        "--backend", options.backend,
+    ]
+    env = {
+        # The profile under test must not be overridden by one written earlier.
+        "INFERENCE_PROFILE_PATH": "",
+        "INFERENCE_WORKERS": str(profile["workers"]),
+        "INFERENCE_INTRA_OP_THREADS": str(profile["intra_op_threads"]),
+        "INFERENCE_INTER_OP_THREADS": str(profile["inter_op_threads"]),
+    }
+    run = run_engine_subprocess("checkpoint", parse_benchmark_args(argv), argv, extra_env=env)
+    if run["served_by"] != "checkpoint":
+        raise SystemExit(
+            f"Predictions were served by {run['served_by']!r}, not the trained checkpoint; "
+            "calibration needs torch and ai-training/model.pt."
+        )
+    result = run["results"][0]
+    return {
+        **profile,
+        "p50_ms": result["p50_ms"],
+        "p95_ms": result["p95_ms"],
+        "throughput_rps": result["throughput_rps"],
+        "errors": sum(result["errors"].values()),
+    }
+
+
+def select_best(measurements: list[dict[str, Any]], objective: str) -> dict[str, Any]:
+    clean = [measurement for measurement in measurements if not measurement["errors"]] or measurements
+    if objective == "latency":
+        return min(clean, key=lambda item: (item["p95_ms"], -item["throughput_rps"]))
+    return max(clean, key=lambda item: (item["throughput_rps"], -item["p95_ms"]))
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Sweep inference thread and slot settings on this machine and write the best profile."
+    )
+    parser.add_argument("--objective", choices=OBJECTIVES, default="throughput")
+    parser.add_argument("--slots", help="comma-separated INFERENCE_WORKERS values (default: 1,2,4 up to the cores)")
+    parser.add_argument("--intra-op-threads", help="comma-separated values (default: powers of two up to the cores)")
+    parser.add_argument("--inter-op-threads", help="comma-separated values (default: 1,2)")
+    parser.add_argument("--oversubscribe", action="store_true", help="also try slots x threads above the core count")
+    parser.add_argument("--scenario", default="predict")
+    parser.add_argument("--resolution", type=int, default=512)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=4)
+    parser.add_argument("--backend", choices=("thread", "process"), default="thread")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--dry-run", action="store_true", help="print the candidates without running them")
+    options = parser.parse_args(argv)
+    options.slots = parse_counts(options.slots)
+    options.intra_op_threads = parse_counts(options.intra_op_threads)
+    options.inter_op_threads = parse_counts(options.inter_op_threads)
+    return options
+
+
+def main(argv: list[str] | None = None) -> int:
+    options = parse_args(list(sys.argv[1:] if argv is None else argv))
+    cpus = available_cpus()
+    candidates = candidate_profiles(options, cpus)
+    print(f"{len(candidates)} candidate profile(s) on {cpus} CPU(s), objective: {options.objective}")
+    if options.dry_run:
+        for profile in candidates:
+            print(f"  {profile}")
+        return 0
+
+    header = f"{'slots':>6}{'intra':>7}{'inter':>7}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>9}{'err':>5}"
+    print(header)
+    print("-" * len(header))
+    measurements = []
+    for profile in candidates:
+        measurement = measure(profile, options)
+        measurements.append(measurement)
+        print(
+            f"{measurement['workers']:>6}{measurement['intra_op_threads']:>7}{measurement['inter_op_threads']:>7}"
+            f"{measurement['p50_ms']:>10.1f}{measurement['p95_ms']:>10.1f}"
+            f"{measurement['throughput_rps']:>9.2f}{measurement['errors']:>5}"
+        )
+
+    best = select_best(measurements, options.objective)
+    profile = {
+        "workers": best["workers"],
+        "intra_op_threads": best["intra_op_threads"],
+        "inter_op_threads": best["inter_op_threads"],
+        "objective": options.objective,
+        "measured": best,
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "platform": platform.platform(),
+            "cpus": cpus,
+            "backend": options.backend,
+            "scenario": options.scenario,
+            "resolution": options.resolution,
+            "requests": options.requests,
+            "concurrency": options.concurrency,
+        },
+        "candidates": measurements,
+    }
+    options.output.write_text(json.dumps(profile, indent=2) + "\n", encoding="utf-8")
+    print(
+        f"\nBest for {options.objective}: INFERENCE_WORKERS={best['workers']} "
+        f"INFERENCE_INTRA_OP_THREADS={best['intra_op_threads']} INFERENCE_INTER_OP_THREADS={best['inter_op_threads']}"
+    )
+    print(f"Profile written to {options.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import io
+import random
+from dataclasses import dataclass
+
+from PIL import Image, ImageChops, ImageDraw, ImageFilter
+
+_SKIN_TONES = ((224, 172, 150), (198, 134, 104), (161, 102, 72), (236, 196, 170), (120, 78, 54))
+
+
+@dataclass(frozen=True)
+class SyntheticImage:
+    name: str
+    resolution: int
+    content_type: str
+    data: bytes
+
+
+def build_corpus(
+    resolutions: list[int],
+    images_per_resolution: int,
+    seed: int = 0,
+    image_format: str = "JPEG",
+) -> dict[int, list[SyntheticImage]]:
+    # Deterministic for a given seed, so two runs (or two machines) see identical uploads.
+    return {
+        resolution: [
+            synthetic_image(resolution, seed * 100_003 + resolution * 1_009 + index, image_format)
+            for index in range(images_per_resolution)
+        ]
+        for resolution in resolutions
+    }
+
+
+def synthetic_image(resolution: int, seed: int, image_format: str = "JPEG") -> SyntheticImage:
+    rng = random.Random(seed)
+    skin = rng.choice(_SKIN_TONES)
+    image = Image.new("RGB", (resolution, resolution), skin)
+    draw = ImageDraw.Draw(image)
+
+    # Skin texture: small freckles and pores, then a lesion with an irregular border.
+    for _ in range(resolution // 2):
+        x, y = rng.randrange(resolution), rng.randrange(resolution)
+        radius = rng.randint(1, max(2, resolution // 160))
+        shade = rng.randint(-40, 25)
+        draw.ellipse(
+            (x - radius, y - radius, x + radius, y + radius),
+            fill=tuple(max(0, min(255, channel + shade)) for channel in skin),
+        )
+    center = resolution / 2 + rng.uniform(-0.1, 0.1) * resolution
+    lesion_radius = resolution * rng.uniform(0.12, 0.28)
+    lesion_color = (rng.randint(60, 150), rng.randint(30, 90), rng.randint(20, 70))
+    for _ in range(12):
+        offset_x = rng.uniform(-0.35, 0.35) * lesion_radius
+        offset_y = rng.uniform(-0.35, 0.35) * lesion_radius
+        radius = lesion_radius * rng.uniform(0.45, 0.8)
+        draw.ellipse(
+            (center + offset_x - radius, center + offset_y - radius, center + offset_x + radius, center + offset_y + radius),
+            fill=tuple(max(0, channel + rng.randint(-20, 20)) for channel in lesion_color),
+        )
+    image = image.filter(ImageFilter.GaussianBlur(radius=max(0.6, resolution / 1024)))
+    # Sensor-like grain; without it the quality gate rejects the image as too smooth.
+    grain = Image.frombytes("L", (resolution, resolution), rng.randbytes(resolution * resolution))
+    grain = grain.point(lambda value: value * 28 // 255).convert("RGB")
+    image = ImageChops.add(image, grain, scale=1.0, offset=-14)
+
+    buffer = io.BytesIO()
+    if image_format.upper() == "PNG":
+        image.save(buffer, format="PNG")
+        content_type, extension = "image/png", "png"
+    else:
+        image.save(buffer, format="JPEG", quality=90)
+        content_type, extension = "image/jpeg", "jpg"
+    return SyntheticImage(
+        name=f"synthetic-{resolution}-{seed}.{extension}",
+        resolution=resolution,
+        content_type=content_type,
+        data=buffer.getvalue(),
+    )
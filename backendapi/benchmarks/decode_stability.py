@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from PIL import Image, ImageEnhance, ImageFilter, ImageStat
+
+from app.ai_model_adapter import _estimate_visual_pattern
+from app.config import get_settings
+from app.imaging import DecodedImage
+
+from .corpus import synthetic_image
+
+# Variants push the corpus towards the quality thresholds, where a drift would flip decisions.
+VARIANTS = ("original", "blur", "heavy_blur", "dark", "bright")
+
+
+def variant(data: bytes, name: str, image_format: str) -> bytes:
+    if name == "original" and image_format == "JPEG":
+        return data
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    if name == "blur":
+        image = image.filter(ImageFilter.GaussianBlur(radius=max(1.0, image.width / 1024)))
+    elif name == "heavy_blur":
+        image = image.filter(ImageFilter.GaussianBlur(radius=max(3.0, image.width / 256)))
+    elif name == "dark":
+        image = ImageEnhance.Brightness(image).enhance(0.09)
+    elif name == "bright":
+        image = ImageEnhance.Brightness(image).enhance(1.7)
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **({"quality": 90} if image_format == "JPEG" else {}))
+    return buffer.getvalue()
+
+
+def full_resolution_reference(data: bytes, input_size: int) -> dict[str, Any]:
+    # The decode path before reduced-resolution decoding: everything from one full RGB decode.
+    started = time.perf_counter()
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    gray = rgb.convert("L")
+    model_input = rgb.resize((input_size, input_size), Image.Resampling.BILINEAR)
+    stats = {
+        "brightness_mean": float(ImageStat.Stat(gray).mean[0]),
+        "edge_intensity": float(ImageStat.Stat(gray.filter(ImageFilter.FIND_EDGES)).mean[0]),
+        "channel_means": [float(value) for value in ImageStat.Stat(rgb).mean[:3]],
+    }
+    elapsed = (time.perf_counter() - started) * 1000
+    # Visual-pattern label as the quality-checked routes compute it, from a full decode.
+    pattern = _estimate_visual_pattern(DecodedImage.from_bytes(data, full_resolution=True))
+    return {**stats, "model_input": model_input, "size": image.size, "pattern": pattern["label"], "ms": elapsed}
+
+
+def reduced_decode(data: bytes, input_size: int) -> dict[str, Any]:
+    # Everything /predict touches: the model input, the visual pattern and the preview.
+    started = time.perf_counter()
+    decoded = DecodedImage.from_bytes(data)
+    model_input = decoded.resized(input_size)
+    pattern = _estimate_visual_pattern(decoded)
+    decoded.thumbnail(640)
+    predict_ms = (time.perf_counter() - started) * 1000
+    # A JPEG must never be decoded at full size here; PNG has no draft mode, so its only decode is the full one.
+    predict_full_decode = decoded.format == "jpeg" and "full" in decoded._cache
+    stats = {
+        "brightness_mean": decoded.brightness_mean,
+        "edge_intensity": decoded.edge_intensity,
+        "channel_means": list(decoded.channel_means),
+    }
+    # The same statistics on the working image alone. Brightness survives the reduction;
+    # edge intensity does not, which is why DecodedImage computes both at full resolution.
+    working_gray = decoded.rgb.convert("L")
+    return {
+        **stats,
+        "model_input": model_input,
+        "pattern": pattern["label"],
+        "predict_full_decode": predict_full_decode,
+        "working_size": decoded.source.size,
+        "working_brightness_mean": float(ImageStat.Stat(working_gray).mean[0]),
+        "working_edge_intensity": float(ImageStat.Stat(working_gray.filter(ImageFilter.FIND_EDGES)).mean[0]),
+        "predict_ms": predict_ms,
+        "ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+def passes_quality(stats: dict[str, Any], settings: Any) -> bool:
+    return (
+        settings.MIN_BRIGHTNESS_MEAN <= stats["brightness_mean"] <= settings.MAX_BRIGHTNESS_MEAN
+        and stats["edge_intensity"] >= settings.MIN_EDGE_INTENSITY
+    )
+
+
+def pixel_difference(left: Image.Image, right: Image.Image) -> float:
+    left_bytes, right_bytes = left.tobytes(), right.tobytes()
+    return sum(abs(a - b) for a, b in zip(left_bytes, right_bytes)) / max(len(left_bytes), 1)
+
+
+def compare(name: str, data: bytes, input_size: int, settings: Any) -> dict[str, Any]:
+    reference = full_resolution_reference(data, input_size)
+    reduced = reduced_decode(data, input_size)
+    return {
+        "name": name,
+        "size": list(reference["size"]),
+        "working_size": list(reduced["working_size"]),
+        "brightness_mean": round(reference["brightness_mean"], 3),
+        "edge_intensity": round(reference["edge_intensity"], 3),
+        "brightness_delta": round(abs(reduced["brightness_mean"] - reference["brightness_mean"]), 3),
+        "edge_delta": round(abs(reduced["edge_intensity"] - reference["edge_intensity"]), 3),
+        "working_brightness_mean": round(reduced["working_brightness_mean"], 3),
+        "working_edge_intensity": round(reduced["working_edge_intensity"], 3),
+        "channel_mean_delta": round(
+            max(abs(a - b) for a, b in zip(reduced["channel_means"], reference["channel_means"])), 3
+        ),
+        "model_input_pixel_delta": round(pixel_difference(reduced["model_input"], reference["model_input"]), 3),
+        "pattern_reference": reference["pattern"],
+        "pattern_reduced": reduced["pattern"],
+        "predict_full_decode": reduced["predict_full_decode"],
+        "passes_reference": passes_quality(reference, settings),
+        "passes_reduced": passes_quality(reduced, settings),
+        "reference_ms": round(reference["ms"], 2),
+        "predict_ms": round(reduced["predict_ms"], 2),
+        "reduced_ms": round(reduced["ms"], 2),
+    }
+
+
+def corpus(options: argparse.Namespace) -> list[tuple[str, bytes]]:
+    items: list[tuple[str, bytes]] = []
+    for resolution in options.resolutions:
+        base = synthetic_image(resolution, options.seed + resolution).data
+        for image_format in options.formats:
+            for name in VARIANTS:
+                items.append((f"{resolution}/{image_format.lower()}/{name}", variant(base, name, image_format)))
+    if options.images_dir is not None:
+        for path in sorted(options.images_dir.iterdir()):
+            if path.suffix.lower() in {".jpg", ".jpeg", ".png"}:
+                items.append((path.name, path.read_bytes()))
+    return items
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Check that reduced-resolution decoding keeps the image quality decisions of a full decode."
+    )
+    parser.add_argument("--resolutions", default="512,1024,2048,4096")
+    parser.add_argument("--formats", default="JPEG,PNG")
+    parser.add_argument("--images-dir", type=Path, help="also check real photos from this directory")
+    parser.add_argument("--input-size", type=int, default=224)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="max allowed brightness/edge drift")
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    options = parser.parse_args(argv)
+    options.resolutions = [int(size) for size in options.resolutions.split(",") if size.strip()]
+    options.formats = [name.strip().upper() for name in options.formats.split(",") if name.strip()]
+    return options
+
+
+def main(argv: list[str] | None = None) -> int:
+    options = parse_args(list(sys.argv[1:] if argv is None else argv))
+    settings = get_settings()
+    rows = [compare(name, data, options.input_size, settings) for name, data in corpus(options)]
+
+    header = (
+        f"{'image':<26}{'working':>11}{'bright':>8}{'d':>6}{'@wk':>8}{'edge':>8}{'d':>6}{'@wk':>8}"
+        f"{'px d':>7}{'pass':>6}{'full ms':>9}{'pred ms':>9}{'all ms':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        working = "x".join(str(value) for value in row["working_size"])
+        decision = "yes" if row["passes_reduced"] else "no"
+        if row["passes_reduced"] != row["passes_reference"] or row["pattern_reduced"] != row["pattern_reference"]:
+            decision = "FLIP"
+        print(
+            f"{row['name']:<26}{working:>11}{row['brightness_mean']:>8.1f}{row['brightness_delta']:>6.2f}"
+            f"{row['working_brightness_mean']:>8.1f}{row['edge_intensity']:>8.2f}{row['edge_delta']:>6.2f}"
+            f"{row['working_edge_intensity']:>8.2f}"
+            f"{row['model_input_pixel_delta']:>7.2f}{decision:>6}{row['reference_ms']:>9.1f}"
+            f"{row['predict_ms']:>9.1f}{row['reduced_ms']:>8.1f}"
+        )
+
+    failures = [
+        row["name"]
+        for row in rows
+        if row["passes_reduced"] != row["passes_reference"]
+        or row["pattern_reduced"] != row["pattern_reference"]
+        or row["predict_full_decode"]
+        or row["brightness_delta"] > options.tolerance
+        or row["edge_delta"] > options.tolerance
+    ]
+    if options.output is not None:
+        options.output.write_text(json.dumps({"rows": rows, "failures": failures}, indent=2) + "\n", encoding="utf-8")
+    if failures:
+        print(f"\nDecisions or statistics drifted for: {', '.join(failures)}")
+        return 1
+    print(
+        f"\n{len(rows)} image(s): quality and visual-pattern decisions unchanged; "
+        f"brightness/edge drift within {options.tolerance}; no full decode on the predict path."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from .corpus import SyntheticImage, build_corpus
+from .scenarios import API_KEY, IMAGES_PER_ITERATION, SCENARIOS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+ENGINES = ("checkpoint", "fallback")
+DEFAULT_RESOLUTIONS = "256,512,1024,2048"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# Points inference.py at a checkpoint that does not exist, which forces its fallback scores.
+_MISSING_CHECKPOINT = Path(__file__).resolve().parent / "no-such-checkpoint.pt"
+
+
+def engine_environment(engine: str, options: argparse.Namespace) -> dict[str, str]:
+    # Benchmarks never touch Supabase or on-disk caches, and each request pays for inference
+    # unless --cache is given.
+    env = {
+        "API_KEY": API_KEY,
+        "SUPABASE_URL": "",
+        "SUPABASE_SERVICE_ROLE_KEY": "",
+        "SESSION_BACKEND": "memory",
+        "SESSION_SPILL_DIR": "",
+        "BLOB_STORE_DIR": "",
+        "PREDICTION_CACHE_DIR": "",
+        "INFERENCE_BACKEND": options.backend,
+        "INFERENCE_WARMUP": "true",
+    }
+    if not options.cache:
+        env["PREDICTION_CACHE_MAX_BYTES"] = "0"
+    if engine == "fallback":
+        env["MODEL_PATH"] = str(_MISSING_CHECKPOINT)
+    return env
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def current_rss_mb() -> float | None:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    images: list[SyntheticImage],
+    options: argparse.Namespace,
+) -> dict[str, Any]:
+    scenario = SCENARIOS[name]
+    per_iteration = IMAGES_PER_ITERATION[name]
+
+    def images_for(iteration: int) -> list[SyntheticImage]:
+        start = iteration * per_iteration
+        return [images[(start + offset) % len(images)] for offset in range(per_iteration)]
+
+    for iteration in range(options.warmup):
+        try:
+            await scenario(client, images_for(iteration))
+        except Exception:
+            pass
+
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    iterations = iter(range(options.warmup, options.warmup + options.requests))
+
+    async def worker() -> None:
+        for iteration in iterations:
+            started = time.perf_counter()
+            try:
+                await scenario(client, images_for(iteration))
+            except httpx.HTTPStatusError as exc:
+                key = str(exc.response.status_code)
+                errors[key] = errors.get(key, 0) + 1
+                continue
+            except Exception as exc:
+                key = exc.__class__.__name__
+                errors[key] = errors.get(key, 0) + 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, options.concurrency))))
+    wall_seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": name,
+        "resolution": images[0].resolution,
+        "requests": options.requests,
+        "concurrency": options.concurrency,
+        "succeeded": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+        "wall_seconds": round(wall_seconds, 3),
+        "rss_before_mb": rss_before,
+        "rss_after_mb": current_rss_mb(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout_seconds: float) -> dict[str, Any]:
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        health = (await client.get("/health")).json()
+        if health["model"] != "warming" or time.monotonic() > deadline:
+            return health
+        await asyncio.sleep(0.2)
+
+
+async def run_engine(engine: str, options: argparse.Namespace) -> dict[str, Any]:
+    # Imported here: the engine's environment has to be in place before settings load.
+    from app.main import app
+
+    images_needed = max(2, options.images_per_resolution)
+    corpus = build_corpus(options.resolutions, images_needed, seed=options.seed)
+    results: list[dict[str, Any]] = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=300.0) as client:
+            health = await wait_until_ready(client, options.ready_timeout)
+            for name in options.scenarios:
+                for resolution in options.resolutions:
+                    results.append(await run_scenario(client, name, corpus[resolution], options))
+            health = (await client.get("/health")).json()
+    return {
+        "engine": engine,
+        # What actually answered, e.g. "fallback" when a checkpoint run has no torch installed.
+        "served_by": health.get("engine"),
+        "model_state": health.get("model"),
+        "warmup": health.get("warmup"),
+        "results": results,
+    }
+
+
+def run_engine_subprocess(
+    engine: str,
+    options: argparse.Namespace,
+    argv: list[str],
+    extra_env: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    # One interpreter per engine: the model module, settings and pools are process-global.
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = Path(temp_dir) / f"{engine}.json"
+        command = [sys.executable, "-m", "benchmarks.run", *argv, "--worker", engine, "--worker-output", str(output_path)]
+        subprocess.run(
+            command,
+            cwd=BACKEND_DIR,
+            env={**os.environ, **engine_environment(engine, options), **(extra_env or {})},
+            check=True,
+        )
+        return json.loads(output_path.read_text(encoding="utf-8"))
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    def index(data: dict[str, Any]) -> dict[tuple[str, str, int], dict[str, Any]]:
+        return {
+            (run["engine"], result["scenario"], result["resolution"]): result
+            for run in data.get("runs", [])
+            for result in run["results"]
+        }
+
+    baseline_results = index(baseline)
+    regressions: list[str] = []
+    for key, result in index(report).items():
+        previous = baseline_results.get(key)
+        if previous is None:
+            continue
+        result["baseline_p95_ms"] = previous["p95_ms"]
+        result["baseline_throughput_rps"] = previous["throughput_rps"]
+        label = "/".join(str(part) for part in key)
+        if previous["p95_ms"] and result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {result['p95_ms']}ms vs baseline {previous['p95_ms']}ms")
+        if previous["throughput_rps"] and result["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{label}: throughput {result['throughput_rps']}/s vs baseline {previous['throughput_rps']}/s"
+            )
+    return regressions
+
+
+def print_report(report: dict[str, Any]) -> None:
+    header = (
+        f"{'engine':<11}{'scenario':<18}{'res':>6}{'ok':>5}{'err':>5}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}{'rss MB':>9}{'vs base p95':>13}"
+    )
+    print(header)
+    print("-" * len(header))
+    for run in report["runs"]:
+        engine = run["engine"] if run["served_by"] in (None, run["engine"]) else f"{run['engine']}*"
+        for result in run["results"]:
+            versus = ""
+            if result.get("baseline_p95_ms"):
+                versus = f"{(result['p95_ms'] / result['baseline_p95_ms'] - 1) * 100:+.1f}%"
+            print(
+                f"{engine:<11}{result['scenario']:<18}{result['resolution']:>6}{result['succeeded']:>5}"
+                f"{sum(result['errors'].values()):>5}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+                f"{result['p99_ms']:>10.1f}{result['throughput_rps']:>9.2f}{result['rss_after_mb'] or 0:>9.1f}{versus:>13}"
+            )
+    if any(run["served_by"] not in (None, run["engine"]) for run in report["runs"]):
+        print("* served by a different engine than requested; see served_by in the JSON report")
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="In-process load benchmark for the screening API.")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="comma-separated: checkpoint,fallback")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenario names")
+    parser.add_argument("--resolutions", default=DEFAULT_RESOLUTIONS, help="comma-separated square image sizes")
+    parser.add_argument("--requests", type=int, default=20, help="measured iterations per scenario and resolution")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured iterations before each scenario")
+    parser.add_argument("--images-per-resolution", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=("thread", "process"), default="thread")
+    parser.add_argument("--cache", action="store_true", help="keep the prediction cache enabled")
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help=f"compare against a stored report (e.g. {DEFAULT_BASELINE.name})")
+    parser.add_argument("--save-baseline", type=Path, help="also store this run as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression vs. baseline")
+    parser.add_argument("--worker", choices=ENGINES, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", type=Path, help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    options.engines = [engine.strip() for engine in options.engines.split(",") if engine.strip()]
+    options.scenarios = [name.strip() for name in options.scenarios.split(",") if name.strip()]
+    options.resolutions = [int(size) for size in options.resolutions.split(",") if size.strip()]
+    unknown = [engine for engine in options.engines if engine not in ENGINES]
+    unknown += [name for name in options.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown engine or scenario: {', '.join(unknown)}")
+    return options
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    options = parse_args(argv)
+
+    if options.worker is not None:
+        result = asyncio.run(run_engine(options.worker, options))
+        options.worker_output.write_text(json.dumps(result), encoding="utf-8")
+        return 0
+
+    passthrough = [argument for argument in argv if not argument.startswith("--worker")]
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "backend": options.backend,
+            "cache": options.cache,
+            "requests": options.requests,
+            "concurrency": options.concurrency,
+            "seed": options.seed,
+        },
+        "runs": [run_engine_subprocess(engine, options, passthrough) for engine in options.engines],
+    }
+
+    regressions: list[str] = []
+    if options.baseline is not None:
+        baseline = json.loads(options.baseline.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, options.tolerance)
+
+    print_report(report)
+    for path in (options.output, options.save_baseline):
+        if path is not None:
+            path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {options.tolerance:.0%} of the baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from typing import Awaitable, Callable
+
+import httpx
+
+from .corpus import SyntheticImage
+
+API_KEY = "benchmark-key"
+HEADERS = {"X-API-Key": API_KEY}
+CONTEXT_TEXT = "itchy red patch on the forearm for about three weeks, slowly spreading"
+
+Scenario = Callable[[httpx.AsyncClient, list[SyntheticImage]], Awaitable[None]]
+
+
+def _file(field: str, image: SyntheticImage) -> tuple[str, tuple[str, bytes, str]]:
+    return field, (image.name, image.data, image.content_type)
+
+
+def _check(response: httpx.Response) -> httpx.Response:
+    # Anything but 2xx counts as an error, including 503 overload and 504 timeouts.
+    response.raise_for_status()
+    return response
+
+
+async def predict(client: httpx.AsyncClient, images: list[SyntheticImage]) -> None:
+    _check(await client.post("/predict", files=[_file("image", images[0])], headers=HEADERS))
+
+
+async def predict_enhanced(client: httpx.AsyncClient, images: list[SyntheticImage]) -> None:
+    _check(
+        await client.post(
+            "/predict/enhanced",
+            files=[_file("images", image) for image in images[:2]],
+            data={"context": json.dumps({"context_text": CONTEXT_TEXT})},
+            headers=HEADERS,
+        )
+    )
+
+
+async def screening_flow(client: httpx.AsyncClient, images: list[SyntheticImage]) -> None:
+    upload = _check(
+        await client.post(
+            "/upload",
+            files=[_file("images", image) for image in images[:2]],
+            data={"description": CONTEXT_TEXT},
+            headers=HEADERS,
+        )
+    )
+    session = {"session_id": upload.json()["session_id"]}
+    _check(await client.post("/analyze", json=session, headers=HEADERS))
+    questions = _check(await client.post("/questions", json=session, headers=HEADERS)).json()["questions"]
+    answers = {question["key"]: index % 2 == 0 for index, question in enumerate(questions)}
+    _check(await client.post("/submit-answers", json={**session, "answers": answers}, headers=HEADERS))
+    _check(await client.get("/result", params=session, headers=HEADERS))
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "predict": predict,
+    "predict_enhanced": predict_enhanced,
+    "screening_flow": screening_flow,
+}
+
+# Images consumed by one iteration of each scenario.
+IMAGES_PER_ITERATION = {"predict": 1, "predict_enhanced": 2, "screening_flow": 2}
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.batching import MicroBatcher
+from app.inference_pool import InferencePool
+
+
+@pytest.fixture
+def pool():
+    pool = InferencePool(max_workers=1, max_queue=4)
+    yield pool
+    pool.shutdown()
+
+
+def _echo_batch(payloads: list[int]) -> list[int]:
+    return [payload * 10 for payload in payloads]
+
+
+def test_flushes_as_soon_as_the_batch_is_full(pool):
+    batcher = MicroBatcher(_echo_batch, max_batch_size=3, max_wait_seconds=5.0, pool=pool)
+
+    async def scenario() -> list[int]:
+        try:
+            return await asyncio.wait_for(asyncio.gather(*(batcher.submit(n) for n in range(3))), timeout=2.0)
+        finally:
+            await batcher.close()
+
+    started = time.perf_counter()
+    assert asyncio.run(scenario()) == [0, 10, 20]
+    assert time.perf_counter() - started < 2.0
+    assert batcher.stats.snapshot()["batch_size_counts"] == {"3": 1}
+
+
+def test_flushes_a_partial_batch_when_the_wait_expires(pool):
+    batcher = MicroBatcher(_echo_batch, max_batch_size=8, max_wait_seconds=0.05, pool=pool)
+
+    async def scenario() -> list[int]:
+        try:
+            return await asyncio.gather(batcher.submit(1), batcher.submit(2))
+        finally:
+            await batcher.close()
+
+    started = time.perf_counter()
+    assert asyncio.run(scenario()) == [10, 20]
+    assert time.perf_counter() - started >= 0.05
+    snapshot = batcher.stats.snapshot()
+    assert snapshot["batch_size_counts"] == {"2": 1}
+    assert snapshot["average_queue_wait_seconds"] >= 0.04
+
+
+def test_partly_cancelled_batch_still_resolves_the_rest_and_frees_its_slot(pool):
+    release, started = threading.Event(), threading.Event()
+
+    def blocking_batch(payloads: list[int]) -> list[int]:
+        started.set()
+        release.wait(5)
+        return _echo_batch(payloads)
+
+    batcher = MicroBatcher(blocking_batch, max_batch_size=3, max_wait_seconds=0.05, pool=pool)
+
+    async def scenario() -> tuple[list[int], int]:
+        try:
+            tasks = [asyncio.create_task(batcher.submit(n)) for n in (1, 2, 3)]
+            await asyncio.to_thread(started.wait, 5)
+            tasks[1].cancel()
+            release.set()
+            results = [await tasks[0], await tasks[2]]
+            with pytest.raises(asyncio.CancelledError):
+                await tasks[1]
+            # One pool worker means one batch slot; a second batch only runs if it was released.
+            follow_up = await asyncio.wait_for(batcher.submit(4), timeout=2.0)
+            return results, follow_up
+        finally:
+            release.set()
+            await batcher.close()
+
+    results, follow_up = asyncio.run(scenario())
+    assert results == [10, 30]
+    assert follow_up == 40
+    snapshot = batcher.stats.snapshot()
+    assert snapshot["batches"] == 2
+    assert snapshot["failed_batches"] == 0
+    assert pool.stats()["orphaned"] == 0
+
+
+def test_items_cancelled_before_dispatch_are_skipped(pool):
+    calls: list[list[int]] = []
+
+    def recording_batch(payloads: list[int]) -> list[int]:
+        calls.append(list(payloads))
+        return _echo_batch(payloads)
+
+    batcher = MicroBatcher(recording_batch, max_batch_size=4, max_wait_seconds=0.1, pool=pool)
+
+    async def scenario() -> int:
+        try:
+            cancelled = asyncio.create_task(batcher.submit(1))
+            kept = asyncio.create_task(batcher.submit(2))
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            return await kept
+        finally:
+            await batcher.close()
+
+    assert asyncio.run(scenario()) == 20
+    assert calls == [[2]]
+    assert batcher.stats.snapshot()["skipped_items"] == 1
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.inference_pool import InferenceOverloaded, InferencePool
+
+
+def _blocked_job(release: threading.Event, started: threading.Event | None = None):
+    def job() -> str:
+        if started is not None:
+            started.set()
+        release.wait(5)
+        return "done"
+
+    return job
+
+
+def _wait_until(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_admit_rejects_with_retry_after_when_capacity_is_full():
+    pool = InferencePool(max_workers=1, max_queue=1)
+    try:
+        with pool.admit(), pool.admit():
+            with pytest.raises(InferenceOverloaded) as excinfo:
+                with pool.admit():
+                    pass
+        error = excinfo.value
+        assert error.status_code == 503
+        assert error.code == "MODEL_OVERLOADED"
+        assert int(error.headers["Retry-After"]) >= 1
+        assert pool.stats()["rejected"] == 1
+
+        # Leaving admit() frees the capacity again.
+        assert pool.stats()["in_flight"] == 0
+        with pool.admit():
+            pass
+    finally:
+        pool.shutdown()
+
+
+def test_timed_out_job_keeps_its_slot_until_the_worker_finishes():
+    pool = InferencePool(max_workers=1, max_queue=0)
+    release, started = threading.Event(), threading.Event()
+
+    async def timed_out_request() -> None:
+        with pool.admit():
+            await asyncio.wait_for(pool.run(_blocked_job(release, started)), timeout=0.05)
+
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(timed_out_request())
+        assert started.is_set()
+        stats = pool.stats()
+        assert stats["in_flight"] == 0
+        assert stats["orphaned"] == 1
+
+        # The worker is still busy, so a new request must not be admitted.
+        with pytest.raises(InferenceOverloaded):
+            with pool.admit():
+                pass
+
+        release.set()
+        _wait_until(lambda: pool.stats()["orphaned"] == 0)
+        with pool.admit():
+            assert asyncio.run(pool.run(lambda: "next")) == "next"
+        assert pool.stats()["completed"] == 2
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_cancelled_job_that_never_started_does_not_hold_capacity():
+    pool = InferencePool(max_workers=1, max_queue=1)
+    release, started = threading.Event(), threading.Event()
+    blocker = pool.submit(_blocked_job(release, started))
+
+    async def queued_request() -> None:
+        await asyncio.wait_for(pool.run(lambda: "queued"), timeout=0.05)
+
+    try:
+        assert started.wait(5)
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(queued_request())
+        stats = pool.stats()
+        assert stats["orphaned"] == 0
+        assert stats["cancelled_before_start"] == 1
+    finally:
+        release.set()
+        blocker.result(5)
+        pool.shutdown()
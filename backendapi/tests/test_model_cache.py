@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.config import get_settings
+from app.model import ModelService
+
+CALLS: list[bytes] = []
+ENGINE = {"name": "checkpoint"}
+
+
+def fake_predict(image_bytes: bytes) -> dict:
+    CALLS.append(image_bytes)
+    return {"risk_score": 0.4, "top_label": "Benign_lesion", "engine": ENGINE["name"]}
+
+
+def fake_fingerprint() -> str:
+    return "fixture"
+
+
+@pytest.fixture
+def service(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "MODEL_MODULE", __name__)
+    monkeypatch.setattr(settings, "MODEL_CALLABLE", "fake_predict")
+    monkeypatch.setattr(settings, "MODEL_BATCH_CALLABLE", "missing_batch_callable")
+    monkeypatch.setattr(settings, "MODEL_EXPLAIN_CALLABLE", "missing_explain_callable")
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "thread")
+    monkeypatch.setattr(settings, "INFERENCE_WARMUP", False)
+    monkeypatch.setattr(settings, "PREDICTION_CACHE_MAX_BYTES", 1024 * 1024)
+    monkeypatch.setattr(settings, "PREDICTION_CACHE_DIR", None)
+    CALLS.clear()
+    ENGINE["name"] = "checkpoint"
+    service = ModelService()
+    service.load()
+    yield service
+    asyncio.run(service.close())
+
+
+def _predict_twice(service: ModelService) -> list[str | None]:
+    async def scenario() -> list[str | None]:
+        first = await service.predict(b"same image")
+        second = await service.predict(b"same image")
+        return [first.engine, second.engine]
+
+    return asyncio.run(scenario())
+
+
+def test_checkpoint_predictions_are_served_from_the_cache(service):
+    assert _predict_twice(service) == ["checkpoint", "checkpoint"]
+    assert len(CALLS) == 1
+    assert service.cache_stats["hits"] == 1
+
+
+@pytest.mark.parametrize("engine", ["fallback", "heuristic"])
+def test_fallback_predictions_are_not_cached(service, engine):
+    ENGINE["name"] = engine
+    assert _predict_twice(service) == [engine, engine]
+    assert len(CALLS) == 2
+    assert service.cache_stats["entries"] == 0
+
+    # Once the checkpoint answers again, the same image is scored by it.
+    ENGINE["name"] = "checkpoint"
+    assert _predict_twice(service) == ["checkpoint", "checkpoint"]
+    assert len(CALLS) == 3
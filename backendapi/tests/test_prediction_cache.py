@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import os
+import time
+
+from app.prediction_cache import PredictionCache
+
+VALUE = {"risk_score": 0.4, "top_label": "Benign_lesion", "padding": "x" * 200}
+
+
+def _disk_files(path) -> list:
+    return sorted(path.glob("*.json"))
+
+
+def test_disk_tier_evicts_the_oldest_files_past_its_budget(tmp_path):
+    cache = PredictionCache(max_bytes=0, ttl_seconds=3600, disk_dir=str(tmp_path), max_disk_bytes=1000)
+    for index in range(10):
+        cache.put(f"key-{index}", VALUE)
+
+    stats = cache.stats()
+    assert 0 < stats["disk_bytes"] <= 1000
+    assert stats["disk_evictions"] > 0
+    assert sum(path.stat().st_size for path in _disk_files(tmp_path)) == stats["disk_bytes"]
+    assert cache.get("key-9") == VALUE
+    assert cache.get("key-0") is None
+
+
+def test_expired_files_are_swept_when_the_cache_starts(tmp_path):
+    cache = PredictionCache(max_bytes=0, ttl_seconds=60, disk_dir=str(tmp_path))
+    cache.put("stale", VALUE)
+    cache.put("fresh", VALUE)
+    stale_time = time.time() - 120
+    os.utime(cache._disk_path("stale"), (stale_time, stale_time))
+
+    restarted = PredictionCache(max_bytes=0, ttl_seconds=60, disk_dir=str(tmp_path))
+    assert _disk_files(tmp_path) == [restarted._disk_path("fresh")]
+    assert restarted.stats()["expirations"] == 1
+    assert restarted.stats()["disk_bytes"] == restarted._disk_path("fresh").stat().st_size
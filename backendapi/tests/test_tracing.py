@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+import logging
+
+import pytest
+
+from app.tracing import configure_trace_logging, end_trace, logger, start_trace
+
+
+@pytest.fixture
+def trace_logger():
+    level, handlers = logger.level, list(logger.handlers)
+    yield logger
+    logger.setLevel(level)
+    logger.handlers[:] = handlers
+
+
+def test_trace_lines_are_logged_once_configured(trace_logger, caplog):
+    configure_trace_logging()
+    trace, token = start_trace("req-1")
+    try:
+        trace.record("model_forward", trace.started + 0.001, 0.002)
+        trace.log("POST", "/predict", 200, 0.01)
+    finally:
+        end_trace(token)
+
+    records = [record for record in caplog.records if record.name == trace_logger.name]
+    assert len(records) == 1
+    assert records[0].levelno == logging.INFO
+    payload = json.loads(records[0].getMessage())
+    assert payload["request_id"] == "req-1"
+    assert payload["route"] == "/predict"
+    assert [span["stage"] for span in payload["spans"]] == ["model_forward"]
+
+
+def test_configuring_adds_a_handler_only_when_none_is_set_up(trace_logger, monkeypatch):
+    monkeypatch.setattr(logging.getLogger(), "handlers", [])
+    trace_logger.handlers[:] = []
+    configure_trace_logging()
+    configure_trace_logging()
+    assert len(trace_logger.handlers) == 1
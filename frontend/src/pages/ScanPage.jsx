@@ -11,7 +11,7 @@ import UploadProgress from "../components/scan/UploadProgress";
 import CancerQuestionnaire from "../components/scan/CancerQuestionnaire";
 import { dataUrlToFile, fileToDataUrl } from "../utils/cropImage";
 import { addScan, saveLastResult } from "../utils/storage";
-import { predictLesionEnhanced } from "../services/api";
+import { predictLesionEnhanced, resolveModelExplainability } from "../services/api";
 import { getRiskScore, normalizePredictionResponse } from "../utils/prediction";
 import { useToast } from "../context/ToastContext";
 import { useAuth } from "../context/AuthContext";
@@ -247,7 +247,10 @@ function ScanPage() {
     backendResponse,
     followupAnswerPayload = null
   ) => {
-    const persistentImages = await Promise.all(images.map((image) => fileToDataUrl(image.file)));
+    const [persistentImages, modelExplainability] = await Promise.all([
+      Promise.all(images.map((image) => fileToDataUrl(image.file))),
+      resolveModelExplainability(backendResponse?.model_explainability),
+    ]);
     const scan = {
       id: backendResponse?.scan_id || createId("scan"),
       createdAt: new Date().toISOString(),
@@ -271,7 +274,7 @@ function ScanPage() {
       backendStatus: backendResponse?.status || "success",
       topLabel: backendResponse?.top_label || normalized.predictedClass,
       backendDetails: normalized.backendDetails || backendResponse?.details || null,
-      modelExplainability: backendResponse?.model_explainability || null,
+      modelExplainability,
       aiImageBreakdown: perImageResults.map((entry, index) => ({
         imageNumber: index + 1,
         predictedClass: entry.predictedClass,
@@ -123,7 +123,7 @@ export async function predictLesionEnhanced(
 
   try {
     const response = await apiClient.post("/predict/enhanced", formData, {
-      params: buildScanParams(userId),
+      params: { ...buildScanParams(userId), explain: "heatmap" },
       onUploadProgress,
     });
     return response.data;
@@ -132,4 +132,42 @@ export async function predictLesionEnhanced(
   }
 }
 
+const HEATMAP_MAX_POLLS = 15;
+
+function blobToDataUrl(blob) {
+  return new Promise((resolve, reject) => {
+    const reader = new FileReader();
+    reader.onload = () => resolve(reader.result);
+    reader.onerror = () => reject(reader.error);
+    reader.readAsDataURL(blob);
+  });
+}
+
+// Heatmaps are rendered after the prediction returns: the URL answers 202 until it is ready.
+export async function fetchHeatmap(heatmapUrl) {
+  if (typeof heatmapUrl !== "string" || !heatmapUrl) return null;
+  if (heatmapUrl.startsWith("data:image")) return heatmapUrl;
+
+  try {
+    for (let attempt = 0; attempt < HEATMAP_MAX_POLLS; attempt += 1) {
+      const response = await apiClient.get(heatmapUrl, { responseType: "blob" });
+      if (response.status !== 202) {
+        return await blobToDataUrl(response.data);
+      }
+      const retryAfter = Number(response.headers?.["retry-after"]) || 1;
+      await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+    }
+  } catch {
+    return null;
+  }
+  return null;
+}
+
+export async function resolveModelExplainability(modelExplainability) {
+  if (!modelExplainability || typeof modelExplainability !== "object") return null;
+  if (modelExplainability.heatmap || !modelExplainability.heatmap_url) return modelExplainability;
+  const heatmap = await fetchHeatmap(modelExplainability.heatmap_url);
+  return { ...modelExplainability, heatmap };
+}
+
 export default apiClient;
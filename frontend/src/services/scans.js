@@ -87,6 +87,16 @@ function buildRecommendedSteps(metadata, riskLevel) {
   return fallback;
 }
 
+function normalizeModelExplainability(modelExplainability) {
+  if (!modelExplainability || typeof modelExplainability !== "object") return null;
+  const heatmapUrl = modelExplainability.heatmap_url;
+  // Stored rows carry the rendered heatmap inline or as a public URL; either can be shown directly.
+  if (!modelExplainability.heatmap && typeof heatmapUrl === "string" && heatmapUrl.startsWith("data:image")) {
+    return { ...modelExplainability, heatmap: heatmapUrl, heatmap_url: null };
+  }
+  return modelExplainability;
+}
+
 export function mapScanRowToScan(row) {
   const metadata = row?.metadata && typeof row.metadata === "object" ? row.metadata : {};
   const images = Array.isArray(metadata.image_previews)
@@ -126,7 +136,7 @@ export function mapScanRowToScan(row) {
     backendStatus: row?.status || "success",
     topLabel: predictedClass,
     backendDetails: metadata.backend_details || null,
-    modelExplainability: metadata.model_explainability || null,
+    modelExplainability: normalizeModelExplainability(metadata.model_explainability),
     aiImageBreakdown: normalizeAiImageBreakdown(metadata.ai_image_breakdown, predictedClass),
   };
 }
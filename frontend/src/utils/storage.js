@@ -44,6 +44,11 @@ function compactHeatmap(heatmap, aggressive = false) {
   return normalized;
 }
 
+function compactHeatmapUrl(heatmapUrl) {
+  // Only absolute URLs are kept: relative /heatmaps/ links expire with the server-side cache.
+  return typeof heatmapUrl === "string" && /^https?:\/\//i.test(heatmapUrl) ? heatmapUrl : null;
+}
+
 function compactModelExplainability(modelExplainability, aggressive = false) {
   if (!modelExplainability || typeof modelExplainability !== "object") {
     return null;
@@ -59,6 +64,7 @@ function compactModelExplainability(modelExplainability, aggressive = false) {
         : null,
     visual_pattern: modelExplainability.visual_pattern || null,
     heatmap: compactHeatmap(modelExplainability.heatmap, aggressive),
+    heatmap_url: compactHeatmapUrl(modelExplainability.heatmap_url),
   };
 
   return compact;